@@ -2,8 +2,10 @@
 import logging
 from fastapi import APIRouter, Request
 import asyncio
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from app.services.chatbot_service import ChatbotService
+from app.services.result_stream import ndjson, stream_results
+from app.services.session_store import session_store
 from app.services.utils import serialize_message
 from langchain_core.messages import AIMessage
 
@@ -24,41 +26,10 @@ async def chat(request: Request):
         }, status_code=400)
 
     try:
-        response = await chatbot_service.chat(user_input)
-
-        
-        if "recommendations" in response:
-            recommendations = response["recommendations"]
-            formatted_response = {
-                "type": "recommendation",
-                "response": recommendations,
-                "next_node": response.get("next_node", "END"),
-                "messages": [serialize_message(msg) for msg in response["messages"]]
-            }
-            return JSONResponse(content=formatted_response)
-        
-        if "messages" in response and response["messages"]:
-            first_message = response["messages"][0]
-            if isinstance(first_message, dict):
-                message_content = first_message.get("content", "")
-            else:
-                serialized = serialize_message(first_message)
-                message_content = serialized.get("content", "")
-            
-            formatted_response = {
-                "type": "response",  # Default type
-                "response": message_content,
-                "next_node": response.get("next_node", "END"),
-                "messages": [serialize_message(msg) for msg in response["messages"]]
-            }
-        else:
-            formatted_response = {
-                "type": "error",
-                "response": "No response generated",
-                "messages": []
-            }
-        
-        return JSONResponse(content=formatted_response)
+        # Agent state is per conversation; the reply carries the session id to send next time
+        async with session_store.session(data.get("session_id")) as session:
+            response = await chatbot_service.chat(user_input)
+        return JSONResponse(content={**format_chat_response(response), "session_id": session.session_id})
     except Exception as e:
         logging.error(f"Error in chat endpoint: {str(e)}")
         return JSONResponse(content={
@@ -67,6 +38,84 @@ async def chat(request: Request):
         }, status_code=500)
 
 
+@router.post("/chat/stream")
+async def chat_stream(request: Request):
+    """
+    NDJSON variant of /chat: a ``book`` event per recommended book as soon as
+    its lookup finishes, then one ``done`` event with the rest of the reply.
+    """
+    data = await request.json()
+    user_input = data.get("message")
+
+    if not user_input:
+        return JSONResponse(content={
+            "type": "error",
+            "response": "No message provided in the request."
+        }, status_code=400)
+
+    async def events():
+        sent = set()
+        try:
+            async with session_store.session(data.get("session_id")) as session:
+                async for kind, value in stream_results(chatbot_service.chat(user_input)):
+                    if kind == "item":
+                        sent.add(value.get("title"))
+                        yield ndjson({"type": "book", "book": value})
+                        continue
+
+                    formatted_response = format_chat_response(value)
+                    books = formatted_response["response"] if formatted_response["type"] == "recommendation" else []
+                    # Books that were not resolved one by one (cached or fallback picks) go out now
+                    for book in books:
+                        if book.get("title") not in sent:
+                            yield ndjson({"type": "book", "book": book})
+                    yield ndjson({
+                        "type": "done",
+                        "response_type": formatted_response["type"],
+                        "count": len(books),
+                        "response": None if books else formatted_response["response"],
+                        "next_node": formatted_response.get("next_node", "END"),
+                        "messages": formatted_response.get("messages", []),
+                        "session_id": session.session_id
+                    })
+        except Exception as e:
+            logging.error(f"Error in chat stream: {str(e)}")
+            yield ndjson({"type": "error", "response": f"An error occurred: {str(e)}"})
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+def format_chat_response(response: dict) -> dict:
+    if "recommendations" in response:
+        return {
+            "type": "recommendation",
+            "response": response["recommendations"],
+            "next_node": response.get("next_node", "END"),
+            "messages": [serialize_message(msg) for msg in response["messages"]]
+        }
+
+    if "messages" in response and response["messages"]:
+        first_message = response["messages"][0]
+        if isinstance(first_message, dict):
+            message_content = first_message.get("content", "")
+        else:
+            serialized = serialize_message(first_message)
+            message_content = serialized.get("content", "")
+
+        return {
+            "type": "response",  # Default type
+            "response": message_content,
+            "next_node": response.get("next_node", "END"),
+            "messages": [serialize_message(msg) for msg in response["messages"]]
+        }
+
+    return {
+        "type": "error",
+        "response": "No response generated",
+        "messages": []
+    }
+
+
 @router.post("/place-order")
 async def place_order(request: Request):
     data = await request.json()
@@ -1,12 +1,16 @@
 # recommendations.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import List, Optional
-from app.database.database import get_db
-from app.services.recommendation_service import get_recommendations
+from app.database.database import SessionLocal, get_db
+from app.services.recommendation_service import get_recommendations, stream_recommendations
 from app.services.recommendation_service import get_trending_books as get_trending_books_service
-from app.models.user import save_user_preferences, get_user_preferences
+from app.services.recommendation_service import get_similar_books, save_preferences as save_preferences_service
+from app.services.graphql_service import graphql_service
+from app.models.user import get_user_preferences
+from app.services.result_stream import ndjson
 
 router = APIRouter()
 
@@ -31,31 +35,65 @@ class BookRecommendation(BaseModel):
     pages: Optional[int] = None
     genres: Optional[List[str]] = None
     price: float
+    description: Optional[str] = None
+    headline: Optional[str] = None
+
+# "card" (default) omits descriptions; "full" includes them
+BookView = Query("card", pattern="^(card|full)$")
 
 @router.post("/initial-recommendations")
-async def initial_recommendations(request: dict, db: Session = Depends(get_db)):
+async def initial_recommendations(request: dict, view: str = BookView, db: Session = Depends(get_db)):
     try:
         user_id = request.get("userId")
         if not user_id:
             raise HTTPException(status_code=400, detail="userId is required")
 
-        recommendations = await get_recommendations(user_id, db)
+        recommendations = await get_recommendations(user_id, db, view)
         return recommendations
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.get("/trending-books", response_model=List[BookRecommendation])
-async def get_trending_book():
+@router.post("/initial-recommendations/stream")
+async def initial_recommendations_stream(request: dict):
+    """NDJSON: one ``book`` event per card as its lookup finishes, then a ``done`` summary."""
+    user_id = request.get("userId")
+    if not user_id:
+        raise HTTPException(status_code=400, detail="userId is required")
+
+    async def events():
+        # Depends(get_db) closes its session before a streamed body is sent
+        db = SessionLocal()
+        try:
+            async for event in stream_recommendations(user_id, db):
+                yield ndjson(event)
+        finally:
+            db.close()
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+@router.get("/trending-books", response_model=List[BookRecommendation], response_model_exclude_unset=True)
+async def get_trending_book(view: str = BookView):
     try:
-        trending_books = await get_trending_books_service()
+        trending_books = await get_trending_books_service(view)
         return trending_books
     except Exception as e:
         raise HTTPException(status_code=500, detail="Error fetching trending books")
 
+@router.get("/books/{book_id}")
+async def get_book_details(book_id: int):
+    book = await graphql_service.get_book_detail(book_id)
+    if not book:
+        raise HTTPException(status_code=404, detail="Book not found")
+    return book
+
+@router.get("/books/{book_id}/similar")
+async def get_similar_books_endpoint(book_id: int, limit: int = Query(10, ge=1, le=50)):
+    return await get_similar_books([book_id], limit)
+
 @router.post("/preferences")
 async def save_preferences(preferences: UserPreferencesInput, db: Session = Depends(get_db)):
     try:
-        save_user_preferences(preferences.user_id, preferences.dict(), db)
+        save_preferences_service(preferences.user_id, preferences.dict(), db)
         return {"message": "Preferences saved successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
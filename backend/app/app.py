@@ -5,6 +5,18 @@ from app.api.recommendations import router as recommendations_router
 from app.api.chatbot import router as chatbot_router
 from app.core.config import settings
 from app.database.database import create_tables
+from app.services.graphql_service import graphql_service
+from app.services.book_cache import book_cache
+from app.services.recommendation_cache import recommendation_cache
+from app.core.llm_cache import llm_cache
+from app.services.trending_snapshot import trending_snapshot
+from app.services.genre_pools import genre_pools
+from app.services.content_recommender import content_recommender
+from app.services.vector_index import vector_index
+from app.services.title_index import title_index
+from app.services.session_store import session_store
+from app.services.intent_classifier import intent_classifier
+from app.core.memory import conversation_memory
 
 app = FastAPI(title=settings.PROJECT_NAME, version=settings.PROJECT_VERSION)
 
@@ -38,6 +50,29 @@ async def startup_event():
     except Exception as e:
         print(f"❌ Error initializing database tables: {e}")
 
+    try:
+        await graphql_service.connect()
+    except Exception as e:
+        print(f"❌ Error opening Hardcover session: {e}")
+
+    trending_snapshot.start()
+    genre_pools.start()
+    title_index.start()
+    session_store.start()
+
+    if settings.RECOMMENDER_MODE != "llm":
+        content_recommender.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled connections held by long-lived clients."""
+    await trending_snapshot.stop()
+    await genre_pools.stop()
+    await session_store.stop()
+    await conversation_memory.stop()
+    await intent_classifier.stop()
+    await graphql_service.close()
+
 app.include_router(recommendations_router, prefix="/api/recommendations", tags=["recommendations"])
 app.include_router(chatbot_router, prefix="/api/chatbot", tags=["chatbot"])
 
@@ -60,7 +95,19 @@ async def health_check():
             "status": "healthy",
             "service": "Smart Retail Bookstore API",
             "version": settings.PROJECT_VERSION,
-            "database": "connected"
+            "database": "connected",
+            "book_cache": book_cache.stats(),
+            "title_index": title_index.status(),
+            "recommendation_cache": recommendation_cache.stats(),
+            "llm_cache": llm_cache.stats(),
+            "hardcover": graphql_service.resilience_status(),
+            "trending": trending_snapshot.status(),
+            "genre_pools": genre_pools.status(),
+            "content_recommender": content_recommender.status(),
+            "vector_index": vector_index.status(),
+            "chat_sessions": session_store.status(),
+            "intent_classifier": intent_classifier.status(),
+            "conversation_memory": conversation_memory.status()
         }
     except Exception as e:
         return {
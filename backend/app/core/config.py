@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
 
@@ -17,10 +18,102 @@ class Settings(BaseSettings):
     HARDCOVER_API_URL: str
     HARDCOVER_API_TOKEN: str
 
+    # "openai", or "fake" for the offline stand-in in app/stand_ins/llm.py
+    LLM_PROVIDER: str = "openai"
+    FAKE_LLM_LATENCY_MS: float = 300
+    # Per-attempt ceiling on an LLM call made while a request is waiting
+    LLM_TIMEOUT: float = 20
+    # Ceiling on each agent a chat message fans out to; a late agent's part of the reply becomes an apology
+    AGENT_TIMEOUT: float = 30
+
+    # Repeat prompts (same normalized text, model and temperature) answered locally; TTL 0 disables
+    LLM_CACHE_TTL: float = 86400
+    LLM_CACHE_MAX_ENTRIES: int = 5000
+    LLM_CACHE_SQLITE_PATH: Optional[str] = None
+
+    # Chat intent routing: keyword rules, then a local naive Bayes model, then the LLM below this confidence
+    INTENT_MIN_CONFIDENCE: float = 0.85
+    INTENT_MODEL_PATH: Optional[str] = None
+    # LLM-labelled messages are appended here as training data (scripts/train_intent_classifier.py)
+    INTENT_LOG_PATH: Optional[str] = None
+
+    # Conversation history in a chat prompt: recent turns plus a rolling summary, never more than this
+    MEMORY_MAX_TOKENS: int = 1500
+    MEMORY_SUMMARY_TOKENS: int = 250
+
+    # Cover shown when a book has no image; a static, cacheable asset rather than inline data
+    PLACEHOLDER_IMAGE_URL: str = "/placeholder-cover.svg"
+
+    # Hardcover client pool
+    HARDCOVER_MAX_CONCURRENCY: int = 8
+    HARDCOVER_REQUEST_TIMEOUT: float = 10.0
+    HARDCOVER_CONNECT_TIMEOUT: float = 5.0
+    HARDCOVER_BATCH_SIZE: int = 25
+
+    # Hardcover resilience
+    HARDCOVER_MIN_CONCURRENCY: int = 2
+    HARDCOVER_LATENCY_TARGET: float = 1.5
+    HARDCOVER_BREAKER_ERROR_RATE: float = 0.5
+    HARDCOVER_BREAKER_MIN_REQUESTS: int = 10
+    HARDCOVER_BREAKER_WINDOW: float = 30
+    HARDCOVER_BREAKER_COOLDOWN: float = 15
+    HARDCOVER_HEDGE_DELAY: Optional[float] = None
+
+    # Book metadata cache
+    BOOK_CACHE_MAX_ENTRIES: int = 5000
+    BOOK_CACHE_TTL: float = 86400
+    BOOK_CACHE_NEGATIVE_TTL: float = 3600
+    BOOK_CACHE_SQLITE_PATH: Optional[str] = None
+
+    # Fuzzy title resolution: matches below this confidence go to Hardcover instead
+    TITLE_MATCH_MIN_CONFIDENCE: float = 0.75
+    # Books fetched from Hardcover (not in the mirror) kept in the title index, least recently seen dropped first
+    TITLE_INDEX_MAX_RECENT: int = 5000
+
+    # Trending snapshot
+    TRENDING_REFRESH_INTERVAL: float = 3600
+    TRENDING_MAX_AGE: float = 7200
+    TRENDING_WINDOW_DAYS: int = 365
+    TRENDING_LIMIT: int = 50
+
+    # Per-genre candidate pools behind "show me more <genre>"
+    GENRE_POOL_SIZE: int = 200
+    GENRE_POOL_REFRESH_INTERVAL: float = 21600
+    GENRE_POOL_MAX_AGE: float = 43200
+
+    # "llm", "local" (TF-IDF similarity over the catalog mirror) or "hybrid"
+    # (local shortlist in the LLM prompt, local results if the LLM fails)
+    RECOMMENDER_MODE: str = "llm"
+    CONTENT_RECOMMENDER_FEATURES: int = 2 ** 18
+
+    # "More like this" ANN index directory (scripts/build_vector_index.py); None disables it
+    VECTOR_INDEX_PATH: Optional[str] = None
+    VECTOR_INDEX_DIM: int = 256
+    VECTOR_INDEX_NPROBE: int = 8
+
+    # Per-user recommendation lists (0 disables caching)
+    RECOMMENDATION_CACHE_TTL: float = 3600
+    RECOMMENDATION_CACHE_MAX_ENTRIES: int = 10000
+
+    # Batch-precomputed recommendations (scripts/precompute_recommendations.py)
+    PRECOMPUTED_RECOMMENDATIONS_MAX_AGE: float = 86400
+    PRECOMPUTE_CHUNK_SIZE: int = 100
+    PRECOMPUTE_CONCURRENCY: int = 4
+
+    # Chat sessions: idle ones are dropped, and past either cap the least recently used go first
+    CHAT_SESSION_MAX_SESSIONS: int = 10000
+    CHAT_SESSION_IDLE_TIMEOUT: float = 1800
+    CHAT_SESSION_MAX_MEMORY_MB: float = 256
+    # Shared session storage so any worker can serve any turn: sqlite:///path or redis://host:port/db
+    CHAT_SESSION_BACKEND_URL: Optional[str] = None
+
+    # Local catalog mirror
+    CATALOG_MIRROR_PATH: Optional[str] = None
+    CATALOG_SYNC_BATCH_SIZE: int = 500
+
     class Config:
         env_file = None
         env_file_encoding = "utf-8"
         case_sensitive = False
 
 settings = Settings()
-
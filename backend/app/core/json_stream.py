@@ -0,0 +1,95 @@
+"""
+Incremental parsing of JSON arrays streamed token by token from an LLM.
+
+The reply may wrap the array in an object (``{"recommendations": [...]}``),
+a code fence or prose; the first array found is the one parsed. Each object
+element is yielded as soon as its closing brace arrives, so a reply cut
+short still yields every complete leading element.
+"""
+import asyncio
+import json
+import time
+from contextlib import aclosing
+from typing import AsyncIterable, AsyncIterator, Dict, List, Optional
+
+
+class JsonArrayStream:
+    """Push parser: ``feed`` text as it arrives and get back the objects it completed."""
+
+    def __init__(self):
+        self.done = False
+        self._depth = 0
+        self._array_depth: Optional[int] = None
+        self._in_string = False
+        self._escaped = False
+        self._item: List[str] = []
+        self._item_open = False
+
+    def feed(self, text: str) -> List[Dict]:
+        items = []
+        for char in text:
+            if self.done:
+                break
+            if self._item_open:
+                self._item.append(char)
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "[{":
+                self._depth += 1
+                if char == "[" and self._array_depth is None:
+                    self._array_depth = self._depth
+                elif char == "{" and self._array_depth is not None and self._depth == self._array_depth + 1:
+                    self._item = [char]
+                    self._item_open = True
+            elif char in "]}":
+                if char == "}" and self._item_open and self._depth == self._array_depth + 1:
+                    self._item_open = False
+                    try:
+                        items.append(json.loads("".join(self._item)))
+                    except ValueError:
+                        # A malformed element is skipped; the ones around it still count
+                        pass
+                elif char == "]" and self._depth == self._array_depth:
+                    self.done = True
+                self._depth -= 1
+        return items
+
+
+async def iter_json_array(chunks: AsyncIterable, timeout: Optional[float] = None) -> AsyncIterator[Dict]:
+    """
+    Yield the objects of the first JSON array in a streamed reply as each completes.
+
+    ``chunks`` are strings or message chunks. ``timeout`` bounds the whole
+    stream; ``asyncio.TimeoutError`` is raised after yielding everything that
+    completed in time, so callers can keep the partial result. The few chunks
+    after the closing bracket are still read, so a caching wrapper around the
+    model sees the complete reply.
+    """
+    parser = JsonArrayStream()
+    deadline = time.monotonic() + timeout if timeout else None
+    async with aclosing(chunks.__aiter__()) as stream:
+        while True:
+            next_chunk = stream.__anext__()
+            try:
+                if deadline is None:
+                    chunk = await next_chunk
+                else:
+                    chunk = await asyncio.wait_for(next_chunk, timeout=max(0.0, deadline - time.monotonic()))
+            except StopAsyncIteration:
+                return
+            except asyncio.TimeoutError:
+                if parser.done:
+                    return
+                raise
+            for item in parser.feed(chunk if isinstance(chunk, str) else str(getattr(chunk, "content", chunk))):
+                yield item
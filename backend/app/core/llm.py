@@ -0,0 +1,25 @@
+from app.core.config import settings
+
+
+def create_chat_llm(temperature: float = 0.7, model: str = "gpt-4o-mini"):
+    """Chat model for the agents; ``LLM_PROVIDER=fake`` swaps in the offline stand-in."""
+    if settings.LLM_PROVIDER == "fake":
+        from app.stand_ins.llm import FakeChatModel
+        return FakeChatModel(latency_ms=settings.FAKE_LLM_LATENCY_MS)
+
+    from langchain.chat_models import ChatOpenAI
+    return ChatOpenAI(
+        model_name=model,
+        temperature=temperature,
+        openai_api_key=settings.OPENAI_API_KEY
+    )
+
+
+def create_completion_llm(temperature: float = 0.7):
+    """Completion model for the initial-recommendations prompt."""
+    if settings.LLM_PROVIDER == "fake":
+        from app.stand_ins.llm import FakeLLM
+        return FakeLLM(latency_ms=settings.FAKE_LLM_LATENCY_MS)
+
+    from langchain.llms import OpenAI
+    return OpenAI(api_key=settings.OPENAI_API_KEY, temperature=temperature)
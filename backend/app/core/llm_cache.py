@@ -0,0 +1,255 @@
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.runnables import Runnable
+
+from app.core.config import settings
+
+
+def prompt_text(prompt: Any) -> str:
+    """Flatten a string, prompt value or message list into one comparable string."""
+    if hasattr(prompt, "to_messages"):
+        prompt = prompt.to_messages()
+    if isinstance(prompt, list):
+        return "\n".join(f"{getattr(m, 'type', 'human')}: {getattr(m, 'content', m)}" for m in prompt)
+    return str(prompt)
+
+
+def normalize_prompt(text: str) -> str:
+    # Whitespace and case never change what the model is asked
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+def parses_as_json(text: str) -> bool:
+    """Validator for call sites that expect JSON, optionally inside a ```json fence."""
+    try:
+        json.loads(text.strip().strip("```json").strip("```").strip())
+        return True
+    except (ValueError, AttributeError):
+        return False
+
+
+class LLMCache:
+    """
+    Cache of LLM replies keyed on the normalized prompt, model and temperature bucket.
+
+    Like the book cache, tier one is an in-process LRU and tier two an optional
+    SQLite file shared by workers on the host. Hits and misses are counted per
+    call site so each prompt's reuse can be judged on its own.
+    """
+
+    def __init__(self, max_entries: int = 5000, ttl: float = 86400, sqlite_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes_since_purge = 0
+        self._sites: Dict[str, Dict[str, int]] = {}
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        if sqlite_path:
+            self._open_disk_tier(sqlite_path)
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def key(prompt: Any, model: str, temperature: Optional[float]) -> str:
+        # Temperatures within 0.1 of each other sample alike enough to share replies
+        bucket = "default" if temperature is None else f"{round(temperature, 1):.1f}"
+        payload = f"{model}|{bucket}|{normalize_prompt(prompt_text(prompt))}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _open_disk_tier(self, path: str) -> None:
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+        except sqlite3.Error as e:
+            logging.warning(f"LLM cache disk tier disabled: {e}")
+            self._db = None
+
+    def get(self, key: str, site: str) -> Optional[Dict]:
+        now = time.time()
+        with self._lock:
+            counters = self._site(site)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                counters["hits"] += 1
+                return entry[1]
+
+            if self._db is not None:
+                row = self._read_disk(key, now)
+                if row is not None:
+                    self._remember(key, row[1], row[0])
+                    self._counters["disk_hits"] += 1
+                    counters["hits"] += 1
+                    return row[1]
+
+            self._counters["misses"] += 1
+            counters["misses"] += 1
+            return None
+
+    def set(self, key: str, value: Dict, site: str) -> None:
+        if not self.enabled:
+            return
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._site(site)["stores"] += 1
+            self._remember(key, value, expires_at)
+            if self._db is not None:
+                self._write_disk(key, value, expires_at)
+
+    def reject(self, site: str) -> None:
+        """A reply the call site's validator refused; it is not cached."""
+        with self._lock:
+            self._site(site)["rejected"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            sites = {site: dict(site_counters) for site, site_counters in self._sites.items()}
+            size = len(self._entries)
+        for site_counters in sites.values():
+            lookups = site_counters["hits"] + site_counters["misses"]
+            site_counters["hit_rate"] = round(site_counters["hits"] / lookups, 4) if lookups else 0.0
+        return {
+            **counters,
+            "size": size,
+            "max_entries": self.max_entries,
+            "disk_tier": self._db is not None,
+            "sites": sites,
+        }
+
+    def _site(self, site: str) -> Dict[str, int]:
+        return self._sites.setdefault(site, {"hits": 0, "misses": 0, "stores": 0, "rejected": 0})
+
+    def _remember(self, key: str, value: Dict, expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _read_disk(self, key: str, now: float) -> Optional[Tuple[float, Dict]]:
+        try:
+            row = self._db.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logging.warning(f"LLM cache disk read failed: {e}")
+            return None
+        if row is None or row[1] <= now:
+            return None
+        return row[1], json.loads(row[0])
+
+    def _write_disk(self, key: str, value: Dict, expires_at: float) -> None:
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at),
+            )
+            self._writes_since_purge += 1
+            if self._writes_since_purge >= 1000:
+                self._db.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+                self._writes_since_purge = 0
+        except sqlite3.Error as e:
+            logging.warning(f"LLM cache disk write failed: {e}")
+
+
+llm_cache = LLMCache(
+    max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+    ttl=settings.LLM_CACHE_TTL,
+    sqlite_path=settings.LLM_CACHE_SQLITE_PATH,
+)
+
+
+class CachedLLM(Runnable):
+    """
+    Drop-in wrapper that answers repeat prompts from ``llm_cache``.
+
+    Works wherever the wrapped model did, including inside ``prompt | llm |
+    parser`` chains. ``validate`` sees the reply text; replies it rejects (bad
+    JSON, say) are returned but never cached, so a caller's retry still reaches
+    the model.
+    """
+
+    def __init__(self, llm, site: str, validate: Optional[Callable[[str], bool]] = None,
+                 cache: Optional[LLMCache] = None):
+        self.llm = llm
+        self.site = site
+        self.validate = validate
+        self.cache = cache or llm_cache
+        self.model = getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+        self.temperature = getattr(llm, "temperature", None)
+
+    def invoke(self, input: Any, config: Any = None, **kwargs: Any) -> Any:
+        key, cached = self._lookup(input)
+        if cached is not None:
+            return cached
+        output = self.llm.invoke(input, config, **kwargs)
+        self._store(key, output)
+        return output
+
+    async def ainvoke(self, input: Any, config: Any = None, **kwargs: Any) -> Any:
+        key, cached = self._lookup(input)
+        if cached is not None:
+            return cached
+        output = await self.llm.ainvoke(input, config, **kwargs)
+        self._store(key, output)
+        return output
+
+    async def astream(self, input: Any, config: Any = None, **kwargs: Any) -> AsyncIterator[Any]:
+        """Stream from the model on a miss; a hit arrives as one chunk. Only complete replies are cached."""
+        key, cached = self._lookup(input)
+        if cached is not None:
+            yield AIMessageChunk(content=cached.content) if isinstance(cached, AIMessage) else cached
+            return
+
+        chunks = []
+        async for chunk in self.llm.astream(input, config, **kwargs):
+            chunks.append(chunk)
+            yield chunk
+        if chunks:
+            if isinstance(chunks[0], str):
+                self._store(key, "".join(chunks))
+            else:
+                self._store(key, AIMessage(content="".join(str(chunk.content) for chunk in chunks)))
+
+    def _lookup(self, input: Any) -> Tuple[Optional[str], Any]:
+        if not self.cache.enabled:
+            return None, None
+        key = self.cache.key(input, self.model, self.temperature)
+        value = self.cache.get(key, self.site)
+        if value is None:
+            return key, None
+        # Chat models answer with a message, completion models with plain text
+        return key, AIMessage(content=value["content"]) if value["kind"] == "message" else value["content"]
+
+    def _store(self, key: Optional[str], output: Any) -> None:
+        if key is None:
+            return
+        is_message = isinstance(output, AIMessage)
+        content = output.content if is_message else output
+        if not isinstance(content, str) or (self.validate is not None and not self.validate(content)):
+            self.cache.reject(self.site)
+            return
+        self.cache.set(key, {"kind": "message" if is_message else "text", "content": content}, self.site)
@@ -1,9 +1,221 @@
+"""
+Conversation memory for prompts, under a hard token budget.
 
-from langchain.memory import ConversationSummaryMemory
+A prompt gets a rolling summary of the older turns plus as many recent
+messages as fit in ``MEMORY_MAX_TOKENS``. When the recent turns outgrow half
+of what is left after the summary, the older ones are folded into the
+summary by a background task, so summarizing never adds an LLM call to a
+request; until it lands those turns still fit in the other half.
+"""
+import asyncio
+import logging
+import math
+import time
+import uuid
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
 
-class ChatbotMemory:
-    def __init__(self):
-        self.memory = ConversationSummaryMemory()
+from langchain.schema.messages import BaseMessage, SystemMessage
 
-    def get_memory(self):
-        return self.memory
+from app.core.config import settings
+from app.core.llm import create_chat_llm
+
+# Applies a change to the stored summary and saves it; returns whether it was applied
+SummaryPersist = Callable[[Callable[[Dict[str, Any]], bool]], Awaitable[bool]]
+
+SUMMARY_PREFIX = "Summary of the earlier conversation: "
+
+SUMMARY_PROMPT = """Update the running summary of a conversation between a bookstore assistant and a user.
+Keep what matters for recommending books and handling orders: genres, authors, themes and books the user
+liked or disliked, reading level, books already recommended, order numbers and open requests.
+Drop greetings and small talk. Write at most {words} words of plain text.
+
+Current summary:
+{summary}
+
+New messages:
+{messages}
+
+Updated summary:"""
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    # tiktoken is optional; without it token counts are estimated from length
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    # About four characters per token in English, rounded up so the budget errs on the safe side
+    return math.ceil(len(text) / 4)
+
+
+def truncate_tokens(text: str, max_tokens: int, keep_end: bool = False) -> str:
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text)
+        return encoding.decode(tokens[-max_tokens:] if keep_end else tokens[:max_tokens])
+    chars = max_tokens * 4
+    return text[-chars:] if keep_end else text[:chars]
+
+
+def render_message(message: BaseMessage) -> str:
+    return f"{message.type}: {message.content}"
+
+
+def message_tokens(message: BaseMessage) -> int:
+    # One more for the separator between messages
+    return count_tokens(render_message(message)) + 1
+
+
+class BoundedMemory:
+    """
+    Token-budgeted prompt view of a conversation.
+
+    ``messages`` takes the full history and a small ``summary`` dict kept
+    in the chat session (``{"text": ..., "upto": n, "epoch": ...}``, ``upto``
+    counting the messages already folded into the text) and returns what fits
+    in the budget. A summary usually finishes after its turn has been saved,
+    so it is written through ``persist``, which reopens the session; without
+    one it only updates the dict in place.
+    """
+
+    def __init__(self, max_tokens: int = 1500, summary_tokens: int = 250, max_concurrent: int = 4):
+        self.max_tokens = max_tokens
+        self.summary_tokens = min(summary_tokens, max_tokens // 2)
+        self._llm = None
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._tasks: Set[asyncio.Task] = set()
+        # Epochs of the summaries being rebuilt, so a conversation never has two summaries in flight
+        self._pending: Set[int] = set()
+        self._counters = {"prompts": 0, "trimmed": 0, "summaries": 0, "summary_errors": 0}
+        self._summary_seconds = 0.0
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            self._llm = create_chat_llm(temperature=0)
+        return self._llm
+
+    def messages(self, history: List[BaseMessage], summary: Dict[str, Any],
+                 persist: Optional[SummaryPersist] = None) -> List[BaseMessage]:
+        self._counters["prompts"] += 1
+        upto = min(summary.get("upto", 0), len(history))
+        recent = history[upto:]
+
+        head: List[BaseMessage] = []
+        budget = self.max_tokens
+        if summary.get("text"):
+            head = [SystemMessage(content=SUMMARY_PREFIX + truncate_tokens(summary["text"], self.summary_tokens))]
+            budget -= message_tokens(head[0])
+
+        sizes = [message_tokens(message) for message in recent]
+        start, used = len(recent), 0
+        while start > 0 and used + sizes[start - 1] <= budget:
+            start -= 1
+            used += sizes[start]
+
+        if start > 0:
+            # Turns the summary hasn't caught up with yet; they leave the prompt rather than break the budget
+            self._counters["trimmed"] += 1
+        window = list(recent[start:])
+        if not window and recent:
+            # Even the newest message alone is over budget: keep its end
+            newest = recent[-1]
+            room = budget - message_tokens(type(newest)(content=""))
+            window = [type(newest)(content=truncate_tokens(newest.content, room, keep_end=True))]
+
+        half = (self.max_tokens - self.summary_tokens) // 2
+        if sum(sizes) > half:
+            # Fold everything but the newest quarter, so a summary is due every few turns rather than every turn
+            keep, kept = len(recent), 0
+            while keep > 0 and kept + sizes[keep - 1] <= half // 2:
+                keep -= 1
+                kept += sizes[keep]
+            if keep > 0:
+                self._schedule(history[upto:upto + keep], summary, upto, upto + keep, persist)
+
+        return head + window
+
+    def _schedule(self, messages: List[BaseMessage], summary: Dict[str, Any], upto: int, cut: int,
+                  persist: Optional[SummaryPersist]) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (the command-line chat); the window alone keeps the prompt in budget
+            return
+        # Tells this conversation's summary from the one a reset starts, which also begins at upto 0
+        epoch = summary.setdefault("epoch", uuid.uuid4().hex)
+        if epoch in self._pending:
+            return
+        self._pending.add(epoch)
+        task = loop.create_task(self._summarize(list(messages), summary, upto, cut, persist))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _summarize(self, messages: List[BaseMessage], summary: Dict[str, Any], upto: int, cut: int,
+                         persist: Optional[SummaryPersist]) -> None:
+        try:
+            async with self._semaphore:
+                started = time.perf_counter()
+                prompt = SUMMARY_PROMPT.format(
+                    words=int(self.summary_tokens * 0.75),
+                    summary=summary.get("text") or "(none yet)",
+                    messages="\n".join(render_message(message) for message in messages),
+                )
+                reply = await asyncio.wait_for(self.llm.ainvoke(prompt), timeout=settings.LLM_TIMEOUT)
+                self._summary_seconds += time.perf_counter() - started
+            text = truncate_tokens(str(getattr(reply, "content", reply)).strip(), self.summary_tokens)
+
+            def apply(current: Dict[str, Any]) -> bool:
+                # The conversation was reset, or another summary landed, while this one was being written
+                if current.get("epoch") != summary["epoch"] or current.get("upto", 0) != upto:
+                    return False
+                current["text"], current["upto"] = text, cut
+                return True
+
+            applied = await persist(apply) if persist is not None else apply(summary)
+            if applied:
+                self._counters["summaries"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._counters["summary_errors"] += 1
+            logging.warning(f"Conversation summary failed: {e}")
+        finally:
+            self._pending.discard(summary["epoch"])
+
+    async def stop(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def status(self) -> Dict[str, Any]:
+        summaries = self._counters["summaries"]
+        return {
+            **self._counters,
+            "max_tokens": self.max_tokens,
+            "summary_tokens": self.summary_tokens,
+            "in_flight": len(self._tasks),
+            "avg_summary_ms": round(self._summary_seconds / summaries * 1000, 1) if summaries else 0.0,
+            "tokenizer": "tiktoken" if _encoding() is not None else "estimate",
+        }
+
+
+conversation_memory = BoundedMemory(
+    max_tokens=settings.MEMORY_MAX_TOKENS,
+    summary_tokens=settings.MEMORY_SUMMARY_TOKENS,
+)
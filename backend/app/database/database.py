@@ -35,6 +35,7 @@ def get_db():
 def create_tables():
     from app.models.user import UserPreferences
     from app.models.orders import Order
+    from app.models.recommendations import UserRecommendations
     from sqlalchemy import text
     
     # Create tables if they don't exist
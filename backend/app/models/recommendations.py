@@ -0,0 +1,49 @@
+# recommendations.py
+import json
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import Column, DateTime, String, Text
+from sqlalchemy.orm import Session
+
+from app.database.database import Base
+
+
+class UserRecommendations(Base):
+    """Precomputed recommendation list per user, written by scripts/precompute_recommendations.py."""
+    __tablename__ = "user_recommendations"
+    user_id = Column(String, primary_key=True, index=True)
+    preference_fingerprint = Column(String(64))
+    books = Column(Text)
+    generated_at = Column(DateTime, default=datetime.utcnow)
+
+
+def save_user_recommendations(user_id: str, fingerprint: str, books: List[Dict], db: Session):
+    try:
+        row = db.query(UserRecommendations).filter(UserRecommendations.user_id == user_id).first()
+        if row is None:
+            row = UserRecommendations(user_id=user_id)
+            db.add(row)
+        row.preference_fingerprint = fingerprint
+        row.books = json.dumps(books)
+        row.generated_at = datetime.utcnow()
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error saving user recommendations: {str(e)}")
+        raise e
+
+
+def get_fresh_recommendations(user_id: str, fingerprint: str, db: Session,
+                              max_age: float) -> Optional[List[Dict]]:
+    """The stored list if it was built from these preferences less than ``max_age`` seconds ago."""
+    try:
+        row = db.query(UserRecommendations).filter(UserRecommendations.user_id == user_id).first()
+        if row is None or row.preference_fingerprint != fingerprint or not row.books:
+            return None
+        if row.generated_at < datetime.utcnow() - timedelta(seconds=max_age):
+            return None
+        return json.loads(row.books)
+    except Exception as e:
+        print(f"Error retrieving user recommendations: {str(e)}")
+        return None
@@ -46,22 +46,35 @@ def save_user_preferences(user_id: str, preferences: dict, db: Session):
         raise e
 
 
+def preferences_to_dict(user_preferences: UserPreferences) -> Dict:
+    def string_to_list(text: str) -> List[str]:
+        return [x.strip() for x in text.split(',')] if text else []
+
+    return {
+        "user_id": user_preferences.user_id,
+        "favorite_books": string_to_list(user_preferences.favorite_books),
+        "favorite_authors": string_to_list(user_preferences.favorite_authors),
+        "preferred_genres": string_to_list(user_preferences.preferred_genres),
+        "themes_of_interest": string_to_list(user_preferences.themes_of_interest),
+        "reading_level": user_preferences.reading_level
+    }
+
+
 def get_user_preferences(user_id: str, db: Session) -> Optional[Dict]:
     try:
         user_preferences = db.query(UserPreferences).filter(UserPreferences.user_id == user_id).first()
         if user_preferences:
-            def string_to_list(text: str) -> List[str]:
-                return [x.strip() for x in text.split(',')] if text else []
-
-            return {
-                "user_id": user_preferences.user_id,
-                "favorite_books": string_to_list(user_preferences.favorite_books),
-                "favorite_authors": string_to_list(user_preferences.favorite_authors),
-                "preferred_genres": string_to_list(user_preferences.preferred_genres),
-                "themes_of_interest": string_to_list(user_preferences.themes_of_interest),
-                "reading_level": user_preferences.reading_level
-            }
+            return preferences_to_dict(user_preferences)
         return None
     except Exception as e:
         print(f"Error retrieving user preferences: {str(e)}")
-        return None
\ No newline at end of file
+        return None
+
+
+def get_user_preferences_page(db: Session, after: Optional[str] = None, limit: int = 100) -> List[Dict]:
+    """Next ``limit`` preference rows ordered by user_id, starting after ``after`` (keyset paging)."""
+    query = db.query(UserPreferences)
+    if after is not None:
+        query = query.filter(UserPreferences.user_id > after)
+    rows = query.order_by(UserPreferences.user_id).limit(limit).all()
+    return [preferences_to_dict(row) for row in rows]
\ No newline at end of file
@@ -0,0 +1,65 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Set
+
+
+class BatchLoader:
+    """
+    DataLoader-style request coalescing.
+
+    Every key passed to ``load`` during the same event-loop tick is collected
+    and handed to ``batch_fn`` in a single call. ``batch_fn`` receives the list
+    of unique keys and returns a mapping of key -> value; keys missing from the
+    mapping resolve to ``None``.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]],
+                 max_batch_size: int = 25):
+        self._batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self._pending: Dict[Hashable, asyncio.Future] = {}
+        self._dispatch_scheduled = False
+        # Running batches; the loop only holds weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+
+    def load(self, key: Hashable) -> Awaitable[Optional[Any]]:
+        loop = asyncio.get_running_loop()
+        future = self._pending.get(key)
+        if future is None:
+            future = loop.create_future()
+            self._pending[key] = future
+            if not self._dispatch_scheduled:
+                self._dispatch_scheduled = True
+                loop.call_soon(self._dispatch)
+        # Several callers may share one future; don't let one cancellation fail the rest
+        return asyncio.shield(future)
+
+    async def load_many(self, keys: Iterable[Hashable]) -> List[Optional[Any]]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def _dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+        self._dispatch_scheduled = False
+
+        keys = list(pending)
+        for start in range(0, len(keys), self.max_batch_size):
+            chunk = {key: pending[key] for key in keys[start:start + self.max_batch_size]}
+            task = asyncio.ensure_future(self._run_batch(chunk))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, futures: Dict[Hashable, asyncio.Future]) -> None:
+        results: Dict[Hashable, Any] = {}
+        try:
+            results = await self._batch_fn(list(futures))
+        except asyncio.CancelledError:
+            # Shutdown or a timeout; the callers see the cancellation instead of waiting forever
+            for future in futures.values():
+                future.cancel()
+            raise
+        except Exception as e:
+            logging.warning(f"Batch load of {len(futures)} keys failed: {e}")
+        finally:
+            for key, future in futures.items():
+                if not future.done():
+                    future.set_result(results.get(key))
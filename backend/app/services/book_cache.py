@@ -0,0 +1,218 @@
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from app.core.config import settings
+
+
+def normalize_title_key(title: str) -> str:
+    """Case-, accent- and punctuation-insensitive form of a title used for cache keys."""
+    text = unicodedata.normalize("NFKD", title or "").encode("ASCII", "ignore").decode("ASCII")
+    return re.sub(r"[^a-z0-9]+", " ", text.lower()).strip()
+
+
+class BookCache:
+    """
+    Two-tier cache for Hardcover book metadata.
+
+    Tier one is an in-process LRU bounded by ``max_entries``; tier two is an
+    optional SQLite file that survives restarts and is shared by workers on the
+    same host. Entries are keyed ``id:<book id>`` or ``title:<normalized title>``.
+    A value of ``None`` is a negative entry ("Hardcover has no such book") and
+    uses the shorter ``negative_ttl``.
+    """
+
+    def __init__(self, max_entries: int = 5000, ttl: float = 86400, negative_ttl: float = 3600,
+                 sqlite_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._entries: "OrderedDict[str, Tuple[float, Optional[Dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._writes_since_purge = 0
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "stale_hits": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+        if sqlite_path:
+            self._open_disk_tier(sqlite_path)
+
+    @staticmethod
+    def id_key(book_id: int) -> str:
+        return f"id:{book_id}"
+
+    @staticmethod
+    def title_key(title: str) -> str:
+        return f"title:{normalize_title_key(title)}"
+
+    @staticmethod
+    def detail_key(book_id: int) -> str:
+        return f"detail:{book_id}"
+
+    def _open_disk_tier(self, path: str) -> None:
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS book_cache ("
+                "key TEXT PRIMARY KEY, value TEXT, expires_at REAL NOT NULL)"
+            )
+        except sqlite3.Error as e:
+            logging.warning(f"Book cache disk tier disabled: {e}")
+            self._db = None
+
+    def lookup(self, key: str, allow_stale: bool = False) -> Tuple[bool, Optional[Dict]]:
+        """
+        Return ``(found, value)``; ``found`` with ``value is None`` is a negative hit.
+
+        Expired entries stay in memory until the LRU evicts them so that
+        ``allow_stale`` can serve them while Hardcover is unavailable.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now or allow_stale:
+                    self._entries.move_to_end(key)
+                    self._record_hit("stale_hits" if expires_at <= now else "memory_hits", value)
+                    return True, self._copy(value)
+                self._counters["expirations"] += 1
+
+            if self._db is not None:
+                row = self._read_disk(key, now)
+                if row is not None:
+                    expires_at, value = row
+                    self._remember(key, value, expires_at)
+                    self._record_hit("disk_hits", value)
+                    return True, self._copy(value)
+
+            self._counters["misses"] += 1
+            return False, None
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self.lookup(key)[1]
+
+    def set(self, key: str, value: Optional[Dict], ttl: Optional[float] = None) -> None:
+        if ttl is None:
+            ttl = self.ttl if value is not None else self.negative_ttl
+        expires_at = time.time() + ttl
+        value = self._copy(value)
+        with self._lock:
+            self._remember(key, value, expires_at)
+            if self._db is not None:
+                self._write_disk(key, value, expires_at)
+
+    def set_book(self, book: Dict, title: Optional[str] = None) -> None:
+        """Store a book under its id and title (and the title it was looked up by)."""
+        if book.get("id") is not None:
+            self.set(self.id_key(book["id"]), book)
+        if book.get("title"):
+            self.set(self.title_key(book["title"]), book)
+        if title:
+            self.set(self.title_key(title), book)
+
+    def iter_books(self) -> Iterator[Dict]:
+        """Every unexpired book stored under an id key, memory tier first, then disk."""
+        now = time.time()
+        with self._lock:
+            entries = [(key, value) for key, (expires_at, value) in self._entries.items()
+                       if key.startswith("id:") and expires_at > now and value is not None]
+            rows = []
+            if self._db is not None:
+                try:
+                    rows = self._db.execute(
+                        "SELECT key, value FROM book_cache "
+                        "WHERE key LIKE 'id:%' AND expires_at > ? AND value IS NOT NULL", (now,)
+                    ).fetchall()
+                except sqlite3.Error as e:
+                    logging.warning(f"Book cache disk read failed: {e}")
+
+        seen = set()
+        for key, value in entries:
+            seen.add(key)
+            yield dict(value)
+        for key, value in rows:
+            if key not in seen:
+                yield json.loads(value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM book_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._entries)
+        lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        return {
+            **counters,
+            "size": size,
+            "max_entries": self.max_entries,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "disk_tier": self._db is not None,
+        }
+
+    def _record_hit(self, counter: str, value: Optional[Dict]) -> None:
+        self._counters[counter] += 1
+        if value is None:
+            self._counters["negative_hits"] += 1
+
+    def _remember(self, key: str, value: Optional[Dict], expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _read_disk(self, key: str, now: float) -> Optional[Tuple[float, Optional[Dict]]]:
+        try:
+            row = self._db.execute(
+                "SELECT value, expires_at FROM book_cache WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logging.warning(f"Book cache disk read failed: {e}")
+            return None
+        if row is None or row[1] <= now:
+            return None
+        return row[1], (json.loads(row[0]) if row[0] is not None else None)
+
+    def _write_disk(self, key: str, value: Optional[Dict], expires_at: float) -> None:
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO book_cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value) if value is not None else None, expires_at),
+            )
+            self._writes_since_purge += 1
+            if self._writes_since_purge >= 1000:
+                self._db.execute("DELETE FROM book_cache WHERE expires_at <= ?", (time.time(),))
+                self._writes_since_purge = 0
+        except sqlite3.Error as e:
+            logging.warning(f"Book cache disk write failed: {e}")
+
+    @staticmethod
+    def _copy(value: Optional[Dict]) -> Optional[Dict]:
+        return dict(value) if value is not None else None
+
+
+book_cache = BookCache(
+    max_entries=settings.BOOK_CACHE_MAX_ENTRIES,
+    ttl=settings.BOOK_CACHE_TTL,
+    negative_ttl=settings.BOOK_CACHE_NEGATIVE_TTL,
+    sqlite_path=settings.BOOK_CACHE_SQLITE_PATH,
+)
@@ -0,0 +1,251 @@
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+from app.core.config import settings
+from app.services.book_cache import normalize_title_key
+
+MIRROR_FIELDS = ("id", "title", "release_year", "pages", "rating", "image_url", "description", "author")
+
+
+class CatalogMirror:
+    """
+    Local SQLite copy of the Hardcover fields we actually serve, with an FTS5
+    index over title/author/description. Disabled when no path is configured.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.fts_enabled = False
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        if path:
+            self._open(path)
+
+    @property
+    def enabled(self) -> bool:
+        return self._db is not None
+
+    def _open(self, path: str) -> None:
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.row_factory = sqlite3.Row
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS books (
+                    id INTEGER PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    title_key TEXT NOT NULL,
+                    release_year INTEGER,
+                    pages INTEGER,
+                    rating REAL,
+                    image_url TEXT,
+                    description TEXT,
+                    author TEXT,
+                    synced_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS books_title_key ON books(title_key);
+                CREATE TABLE IF NOT EXISTS sync_state (name TEXT PRIMARY KEY, value TEXT);
+            """)
+        except sqlite3.Error as e:
+            logging.warning(f"Catalog mirror disabled: {e}")
+            self._db = None
+            return
+
+        try:
+            self._db.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5(
+                    title, author, description, content='books', content_rowid='id'
+                );
+                CREATE TRIGGER IF NOT EXISTS books_ai AFTER INSERT ON books BEGIN
+                    INSERT INTO books_fts(rowid, title, author, description)
+                    VALUES (new.id, new.title, new.author, new.description);
+                END;
+                CREATE TRIGGER IF NOT EXISTS books_ad AFTER DELETE ON books BEGIN
+                    INSERT INTO books_fts(books_fts, rowid, title, author, description)
+                    VALUES ('delete', old.id, old.title, old.author, old.description);
+                END;
+                CREATE TRIGGER IF NOT EXISTS books_au AFTER UPDATE ON books BEGIN
+                    INSERT INTO books_fts(books_fts, rowid, title, author, description)
+                    VALUES ('delete', old.id, old.title, old.author, old.description);
+                    INSERT INTO books_fts(rowid, title, author, description)
+                    VALUES (new.id, new.title, new.author, new.description);
+                END;
+            """)
+            self.fts_enabled = True
+        except sqlite3.Error as e:
+            logging.warning(f"Catalog mirror full-text index unavailable: {e}")
+
+    def upsert_books(self, books: List[Dict]) -> int:
+        if not self.enabled or not books:
+            return 0
+        now = time.time()
+        rows = [
+            (
+                book["id"], book["title"], normalize_title_key(book["title"]),
+                book.get("release_year"), book.get("pages"), book.get("rating"),
+                book.get("image_url"), book.get("description"), book.get("author"), now,
+            )
+            for book in books if book.get("id") is not None and book.get("title")
+        ]
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                # An explicit UPDATE (not INSERT OR REPLACE) so the FTS triggers see the old row
+                self._db.executemany("""
+                    INSERT INTO books (id, title, title_key, release_year, pages, rating,
+                                       image_url, description, author, synced_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(id) DO UPDATE SET
+                        title = excluded.title, title_key = excluded.title_key,
+                        release_year = excluded.release_year, pages = excluded.pages,
+                        rating = excluded.rating, image_url = excluded.image_url,
+                        description = excluded.description, author = excluded.author,
+                        synced_at = excluded.synced_at
+                """, rows)
+                self._db.execute("COMMIT")
+            except sqlite3.Error:
+                self._db.execute("ROLLBACK")
+                raise
+        return len(rows)
+
+    def get_by_id(self, book_id: int) -> Optional[Dict]:
+        return self.get_by_ids([book_id]).get(book_id)
+
+    def get_by_ids(self, book_ids: List[int]) -> Dict[int, Dict]:
+        if not self.enabled or not book_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in book_ids)
+        rows = self._query(
+            f"SELECT {', '.join(MIRROR_FIELDS)} FROM books WHERE id IN ({placeholders})",
+            list(book_ids),
+        )
+        return {row["id"]: self._to_book(row) for row in rows}
+
+    def find_by_title(self, title: str) -> Optional[Dict]:
+        """Exact (case/punctuation-insensitive) title match, then an FTS match on the main title."""
+        if not self.enabled:
+            return None
+        key = normalize_title_key(title)
+        if not key:
+            return None
+
+        rows = self._query(
+            f"SELECT {', '.join(MIRROR_FIELDS)} FROM books WHERE title_key = ? "
+            f"ORDER BY rating IS NULL, rating DESC LIMIT 1",
+            (key,),
+        )
+        if rows:
+            return self._to_book(rows[0])
+
+        # "Dune" should still resolve to "Dune: Deluxe Edition", but not to "Dune Messiah"
+        for row in self.search(f'title: "{key}"', limit=10, raw=True):
+            if normalize_title_key(row["title"].split(":")[0]) == key:
+                return self._to_book(row)
+        return None
+
+    def search(self, text: str, limit: int = 20, raw: bool = False) -> List:
+        """Full-text search ranked by bm25; ``text`` is a plain phrase unless ``raw``."""
+        if not self.enabled or not self.fts_enabled:
+            return []
+        match = text if raw else " ".join(f'"{token}"' for token in normalize_title_key(text).split())
+        if not match:
+            return []
+        columns = ", ".join(f"books.{field}" for field in MIRROR_FIELDS)
+        rows = self._query(
+            f"SELECT {columns} FROM books_fts JOIN books ON books.id = books_fts.rowid "
+            f"WHERE books_fts MATCH ? ORDER BY bm25(books_fts) LIMIT ?",
+            (match, limit),
+        )
+        return rows if raw else [self._to_book(row) for row in rows]
+
+    def iter_books(self, batch_size: int = 1000) -> Iterator[Dict]:
+        if not self.enabled:
+            return
+        last_id = -1
+        while True:
+            rows = self._query(
+                f"SELECT {', '.join(MIRROR_FIELDS)} FROM books WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_size),
+            )
+            if not rows:
+                return
+            for row in rows:
+                yield self._to_book(row)
+            last_id = rows[-1]["id"]
+
+    def count(self) -> int:
+        if not self.enabled:
+            return 0
+        return self._query("SELECT COUNT(*) AS n FROM books")[0]["n"]
+
+    def get_state(self, name: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        rows = self._query("SELECT value FROM sync_state WHERE name = ?", (name,))
+        return rows[0]["value"] if rows else None
+
+    def set_state(self, name: str, value: str) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO sync_state (name, value) VALUES (?, ?)", (name, value))
+
+    def _query(self, sql: str, params=()) -> List[sqlite3.Row]:
+        try:
+            with self._lock:
+                return self._db.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            logging.warning(f"Catalog mirror query failed: {e}")
+            return []
+
+    @staticmethod
+    def _to_book(row: sqlite3.Row) -> Dict:
+        book = {field: row[field] for field in MIRROR_FIELDS}
+        book["author"] = book["author"] or "Unknown Author"
+        return book
+
+
+def book_from_hardcover(book: Dict) -> Dict:
+    """Flatten a MirrorBooks row into the mirror's column layout."""
+    contributions = book.get("contributions") or []
+    author = (contributions[0].get("author") or {}).get("name") if contributions else None
+    image = book.get("image") or {}
+    return {
+        "id": book["id"],
+        "title": book.get("title"),
+        "release_year": book.get("release_year"),
+        "pages": book.get("pages"),
+        "rating": book.get("rating"),
+        "image_url": image.get("url"),
+        "description": book.get("description"),
+        "author": author,
+    }
+
+
+async def sync_id_range(start_id: int, end_id: int, batch_size: int = 500) -> int:
+    """Mirror books with ``start_id <= id < end_id``, recording progress after each batch."""
+    from app.services.graphql_service import graphql_service
+    from app.services.title_index import title_index
+    from app.services.vector_index import vector_index
+
+    synced = 0
+    for batch_start in range(start_id, end_id, batch_size):
+        batch_end = min(batch_start + batch_size, end_id)
+        result = await graphql_service.execute_query(
+            "MirrorBooks", {"from": batch_start, "to": batch_end}
+        )
+        if "books" not in result:
+            raise RuntimeError(f"Hardcover query failed for ids {batch_start}-{batch_end}")
+        books = [book_from_hardcover(b) for b in result["books"]]
+        synced += catalog_mirror.upsert_books(books)
+        # Keep "more like this" current; a no-op until the index has been built once
+        vector_index.upsert(books)
+        title_index.add_many(books, mirrored=True)
+        catalog_mirror.set_state("last_synced_id", str(batch_end))
+    return synced
+
+
+catalog_mirror = CatalogMirror(settings.CATALOG_MIRROR_PATH)
@@ -5,14 +5,14 @@ import asyncio
 from dotenv import load_dotenv
 from typing import Dict, Any, List
 from langchain.llms import OpenAI
-from langchain.chat_models import ChatOpenAI
-from langchain.memory import ConversationBufferMemory
 from langgraph.graph import StateGraph
 from langchain_core.messages import HumanMessage, AIMessage
 from pydantic import BaseModel
 import operator
 import logging
 
+from app.core.config import settings
+from app.core.llm import create_chat_llm
 from app.services.user_proxy_agent import UserProxyAgent
 from app.services.operator_agent import OperatorAgent
 from app.services.recommendation_agent import RecommendationAgent
@@ -30,26 +30,21 @@ class ChatbotService:
     def __init__(self):
         # Load API Key
         openai_api_key = os.getenv('OPENAI_API_KEY')
-        self.memory = ConversationBufferMemory(return_messages=True)
-        if not openai_api_key:
+        if not openai_api_key and settings.LLM_PROVIDER != "fake":
             raise ValueError("OpenAI API key not found.")
         
-        # Initialize LLM and memory
-        self.llm = ChatOpenAI(
-            temperature=0.7,
-            model_name="gpt-4o-mini",  # Use the correct model name
-            openai_api_key=openai_api_key
-        )
+        # Initialize LLM; conversation memory and agent state are per session (see session_store)
+        self.llm = create_chat_llm(temperature=0.7, model="gpt-4o-mini")
 
         # Initialize agents
         self.user_proxy_agent = UserProxyAgent()
-        self.recommendation_agent = RecommendationAgent(self.llm, self.memory)
+        self.recommendation_agent = RecommendationAgent(self.llm)
         self.order_query_agent = OrderQueryAgent(llm=self.llm)
         self.order_placement_agent = OrderPlacementAgent(llm=self.llm)
         self.fraudulent_transaction_agent = FraudulentTransactionAgent(llm=self.llm)
 
         # Register agents with the OperatorAgent
-        self.operator_agent = OperatorAgent("operator_agent", llm=self.llm, memory=self.memory)
+        self.operator_agent = OperatorAgent("operator_agent", llm=self.llm)
         self.operator_agent.set_agent_registry({
             "recommendation_agent": self.recommendation_agent,
             "order_query_agent": self.order_query_agent,
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from scipy import sparse
+
+from app.core.config import settings
+from app.services.book_cache import normalize_title_key
+from app.services.catalog_mirror import catalog_mirror
+from app.services.text_features import book_text, count_matrix, fit_idf, normalize_rows, text_vector, tfidf
+
+# Fields kept per indexed book; descriptions only live in the matrix
+INDEX_FIELDS = ("id", "title", "release_year", "pages", "rating", "image_url", "author")
+
+FAVORITE_BOOK_WEIGHT = 1.0
+PREFERENCE_TEXT_WEIGHT = 0.6
+AUTHOR_BOOST = 0.15
+
+
+class _ContentIndex:
+    """One build of the index; never modified after it is published, so readers need no lock."""
+
+    def __init__(self, books: List[Dict], matrix: sparse.csr_matrix, idf: np.ndarray):
+        self.books = [{field: book.get(field) for field in INDEX_FIELDS} for book in books]
+        self.matrix = matrix
+        # Column-major copy for scoring: a query only touches the columns of its own terms
+        self.columns = matrix.tocsc()
+        self.idf = idf
+        self.title_rows: Dict[str, int] = {}
+        self.author_rows: Dict[str, List[int]] = {}
+        for row, book in enumerate(books):
+            # Keep the best-rated edition when several share a title
+            self.title_rows.setdefault(normalize_title_key(book["title"]), row)
+            self.author_rows.setdefault(normalize_title_key(book.get("author") or ""), []).append(row)
+        self.built_at = time.time()
+
+    def profile(self, preferences: Dict) -> Optional[sparse.csr_matrix]:
+        parts = []
+        rows = self.favorite_rows(preferences)
+        if rows:
+            favorites = sparse.csr_matrix(self.matrix[rows].sum(axis=0))
+            parts.append(normalize_rows(favorites) * FAVORITE_BOOK_WEIGHT)
+
+        terms = (preferences.get("favorite_authors") or []) + (preferences.get("preferred_genres") or []) \
+            + (preferences.get("themes_of_interest") or [])
+        text = text_vector(" ".join(terms), self.idf)
+        if text is not None:
+            parts.append(text * PREFERENCE_TEXT_WEIGHT)
+
+        if not parts:
+            return None
+        return normalize_rows(sum(parts[1:], parts[0]).tocsr())
+
+    def favorite_rows(self, preferences: Dict) -> List[int]:
+        rows = []
+        for title in preferences.get("favorite_books") or []:
+            row = self.title_rows.get(normalize_title_key(title))
+            if row is not None:
+                rows.append(row)
+        return rows
+
+    def top_books(self, scores: np.ndarray, preferences: Dict, limit: int) -> List[Dict]:
+        scores = scores.copy()
+        for author in preferences.get("favorite_authors") or []:
+            key = normalize_title_key(author)
+            if key:
+                scores[self.author_rows.get(key, [])] += AUTHOR_BOOST
+        # Never recommend the books the user already told us they love
+        for row in self.favorite_rows(preferences):
+            scores[row] = -np.inf
+
+        k = min(limit, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [dict(self.books[row], score=round(float(scores[row]), 4)) for row in top if scores[row] > 0]
+
+
+class ContentRecommender:
+    """
+    LLM-free recommendations by cosine similarity over a hashed TF-IDF matrix.
+
+    The matrix is built from the local catalog mirror. A user's profile is the
+    sum of their favorite books' rows plus a vector for their authors, genres
+    and themes; every catalog row is scored against it in one sparse product.
+
+    A build produces a whole new index and publishes it in one assignment;
+    scoring is CPU-bound, so async callers run it in a thread.
+    """
+
+    def __init__(self, n_features: int = 2 ** 18):
+        self.n_features = n_features
+        self.build_seconds: Optional[float] = None
+        self._index: Optional[_ContentIndex] = None
+        self._build_lock = threading.Lock()
+        self._build_task: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        index = self._index
+        return index is not None and bool(index.books)
+
+    def build(self, books: Iterable[Dict]) -> int:
+        """Index ``books`` (dicts with at least a title); replaces any previous index."""
+        with self._build_lock:
+            started = time.monotonic()
+            books = [book for book in books if book.get("title")]
+            counts = count_matrix((book_text(book) for book in books), self.n_features)
+            idf = fit_idf(counts)
+            self._index = _ContentIndex(books, tfidf(counts, idf), idf)
+            self.build_seconds = round(time.monotonic() - started, 3)
+            return len(books)
+
+    def build_from_mirror(self) -> int:
+        books = sorted(catalog_mirror.iter_books(), key=lambda book: -(book.get("rating") or 0))
+        return self.build(books)
+
+    async def ensure_built(self) -> None:
+        """Build from the mirror in a worker thread the first time it is needed."""
+        if self.ready or not catalog_mirror.enabled:
+            return
+        if self._build_task is None or self._build_task.done():
+            self._build_task = asyncio.create_task(asyncio.to_thread(self.build_from_mirror))
+        try:
+            count = await asyncio.shield(self._build_task)
+            logging.info(f"Content recommender indexed {count} books in {self.build_seconds}s")
+        except Exception as e:
+            logging.error(f"Content recommender build failed: {e}")
+
+    def start(self) -> None:
+        """Warm the index in the background so the first request doesn't pay for the build."""
+        asyncio.create_task(self.ensure_built())
+
+    def profile(self, preferences: Dict) -> Optional[sparse.csr_matrix]:
+        index = self._index
+        return index.profile(preferences) if index is not None else None
+
+    def recommend_many(self, preferences_list: List[Dict], limit: int = 20) -> List[List[Dict]]:
+        """Top ``limit`` books per user; all users are scored in a single matrix product."""
+        # Every step below reads this one build, even if a rebuild is published meanwhile
+        index = self._index
+        if index is None or not index.books:
+            return [[] for _ in preferences_list]
+
+        profiles = [index.profile(preferences) for preferences in preferences_list]
+        scored = [i for i, profile in enumerate(profiles) if profile is not None]
+        results: List[List[Dict]] = [[] for _ in preferences_list]
+        if not scored:
+            return results
+
+        # (books x query terms) . (query terms x users) -> one column of cosine scores per user
+        queries = sparse.vstack([profiles[i] for i in scored]).tocsr()
+        terms = np.unique(queries.indices)
+        scores = np.asarray(index.columns[:, terms].dot(queries[:, terms].T).todense())
+        for column, i in enumerate(scored):
+            results[i] = index.top_books(scores[:, column], preferences_list[i], limit)
+        return results
+
+    def recommend(self, preferences: Dict, limit: int = 20) -> List[Dict]:
+        return self.recommend_many([preferences], limit)[0]
+
+    def status(self) -> Dict:
+        index = self._index
+        return {
+            "ready": self.ready,
+            "books": len(index.books) if index is not None else 0,
+            "built_at": index.built_at if index is not None else None,
+            "build_seconds": self.build_seconds,
+        }
+
+
+content_recommender = ContentRecommender(n_features=settings.CONTENT_RECOMMENDER_FEATURES)
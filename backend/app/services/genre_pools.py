@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import time
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.graphql_service import graphql_service
+
+# Search terms per genre; a single _or query matches any of them in the title or description
+GENRE_TERMS = {
+    "horror": ["horror", "haunted", "ghost", "terrifying"],
+    "fantasy": ["fantasy", "magic", "dragon", "wizard"],
+    "romance": ["romance", "love story", "romantic"],
+    "sci-fi": ["science fiction", "sci-fi", "space", "dystopian"],
+    "mystery": ["mystery", "detective", "murder"],
+    "thriller": ["thriller", "suspense", "conspiracy"],
+    "action": ["action", "adventure", "mission"],
+}
+GENRE_ALIASES = {"science fiction": "sci-fi", "scifi": "sci-fi", "adventure": "action", "suspense": "thriller"}
+
+
+def genre_key(genre: str) -> str:
+    key = (genre or "").strip().lower()
+    return GENRE_ALIASES.get(key, key)
+
+
+class GenrePool:
+    def __init__(self, books: List[Dict]):
+        # Stable order: best rated first, id breaks ties, so a cursor means the same thing after a rebuild
+        self.books = sorted(books, key=self.sort_key)
+        self.keys = [self.sort_key(book) for book in self.books]
+        self.built_at = time.time()
+
+    @staticmethod
+    def sort_key(book: Dict) -> Tuple[float, int]:
+        return -(book.get("rating") or 0), book["id"]
+
+    def page(self, cursor: Optional[str], limit: int) -> Tuple[List[Dict], Optional[str]]:
+        start = bisect_right(self.keys, decode_cursor(cursor)) if cursor else 0
+        books = self.books[start:start + limit]
+        next_cursor = encode_cursor(self.keys[start + limit - 1]) if start + limit < len(self.books) else None
+        return books, next_cursor
+
+
+def encode_cursor(key: Tuple[float, int]) -> str:
+    return f"{-key[0]}:{key[1]}"
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    rating, book_id = cursor.split(":")
+    return -float(rating), int(book_id)
+
+
+class GenrePools:
+    """
+    Per-genre candidate lists built in the background and paged from memory.
+
+    Each pool holds up to ``pool_size`` books matching the genre's terms,
+    ordered by rating. Pages are addressed by an opaque cursor (the sort key of
+    the last book served), so "show me more" never repeats a book and costs no
+    Hardcover call. Stale pools keep serving while one rebuild runs.
+    """
+
+    def __init__(self, pool_size: int = 200, refresh_interval: float = 21600, max_age: float = 43200):
+        self.pool_size = pool_size
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.pools: Dict[str, GenrePool] = {}
+        self.last_errors: Dict[str, str] = {}
+        self._build_tasks: Dict[str, asyncio.Task] = {}
+        self._loop_task: Optional[asyncio.Task] = None
+
+    async def page(self, genre: str, cursor: Optional[str] = None,
+                   limit: int = 15) -> Tuple[List[Dict], Optional[str]]:
+        """``(books, next_cursor)``; ``next_cursor`` is None once the pool is exhausted."""
+        key = genre_key(genre)
+        pool = self.pools.get(key)
+        if pool is None:
+            # Nothing to serve yet; wait for the first build, shielded since other requests share it
+            await asyncio.shield(self._ensure_build(key))
+            pool = self.pools.get(key)
+            if pool is None:
+                return [], None
+        elif time.time() - pool.built_at > self.max_age:
+            self._ensure_build(key)
+        try:
+            return pool.page(cursor, limit)
+        except ValueError:
+            logging.warning(f"Ignoring malformed genre cursor: {cursor!r}")
+            return pool.page(None, limit)
+
+    async def build(self, genre: str) -> bool:
+        key = genre_key(genre)
+        terms = GENRE_TERMS.get(key, [key])
+        try:
+            # Ranked by Hardcover before the cut, so the pool is the genre's best books, not its oldest rows
+            book_ids: List[int] = []
+            while len(book_ids) < self.pool_size:
+                page_size = min(100, self.pool_size - len(book_ids))
+                ids = await graphql_service.search_popular_books_by_genre(terms, page_size, len(book_ids))
+                book_ids.extend(ids)
+                if len(ids) < page_size:
+                    break
+            books = await graphql_service.get_book_details_by_ids(book_ids) if book_ids else []
+        except Exception as e:
+            books = []
+            self.last_errors[key] = str(e)
+
+        if not books:
+            self.last_errors.setdefault(key, "Hardcover returned no books for this genre")
+            logging.warning(f"Genre pool '{key}' build failed, serving previous pool: {self.last_errors[key]}")
+            return False
+
+        self.pools[key] = GenrePool([self._to_card(book) for book in books])
+        self.last_errors.pop(key, None)
+        return True
+
+    def start(self) -> None:
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        for task in [self._loop_task, *self._build_tasks.values()]:
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._loop_task = None
+        self._build_tasks.clear()
+
+    def status(self) -> Dict[str, Any]:
+        status = {genre: {"books": 0, "last_error": error} for genre, error in self.last_errors.items()}
+        for genre, pool in self.pools.items():
+            status[genre] = {
+                "books": len(pool.books),
+                "age_seconds": round(time.time() - pool.built_at, 1),
+                "last_error": self.last_errors.get(genre),
+            }
+        return status
+
+    def _ensure_build(self, key: str) -> asyncio.Task:
+        task = self._build_tasks.get(key)
+        if task is None or task.done():
+            task = self._build_tasks[key] = asyncio.create_task(self.build(key))
+        return task
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            # One genre at a time so the refresh never crowds out user traffic
+            for genre in GENRE_TERMS:
+                build = self._ensure_build(genre)
+                try:
+                    await asyncio.shield(build)
+                except asyncio.CancelledError:
+                    # Only the loop's own cancellation ends it
+                    if not build.cancelled():
+                        raise
+                except Exception as e:
+                    logging.error(f"Genre pool refresh error for '{genre}': {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    @staticmethod
+    def _to_card(book: Dict) -> Dict:
+        return {
+            "id": book["id"],
+            "title": book["title"],
+            "author": book.get("author") or "Unknown Author",
+            "release_year": book.get("release_year"),
+            "release_date": book.get("release_date"),
+            "image_url": book.get("image_url"),
+            "rating": book.get("rating"),
+            "pages": book.get("pages"),
+        }
+
+
+genre_pools = GenrePools(
+    pool_size=settings.GENRE_POOL_SIZE,
+    refresh_interval=settings.GENRE_POOL_REFRESH_INTERVAL,
+    max_age=settings.GENRE_POOL_MAX_AGE,
+)
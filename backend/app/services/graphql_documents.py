@@ -0,0 +1,171 @@
+"""
+Registry of every Hardcover GraphQL operation.
+
+Each operation is a named, parameterized document: user input only ever
+travels in ``variables``, never in query text. Documents are parsed once on
+first use and reused for the life of the process.
+"""
+from functools import lru_cache
+from typing import Dict
+
+from gql import gql
+from graphql import DocumentNode
+
+# List views only render cards; descriptions are fetched per book on demand
+CARD_FIELDS = """
+    id
+    title
+    release_year
+    release_date
+    rating
+    pages
+    images(limit: 1, where: {url: {_is_null: false}}) {
+      url
+    }
+    image {
+      url
+    }
+"""
+
+BOOK_FIELDS = CARD_FIELDS + """
+    description
+    headline
+"""
+
+DOCUMENTS: Dict[str, str] = {
+    "GetTrendingBooks": """
+        query GetTrendingBooks($from: date!, $to: date!, $limit: Int!) {
+            books_trending(from: $from, to: $to, limit: $limit, offset: 0) {
+                ids
+            }
+        }
+    """,
+    "BooksByIds": """
+        query BooksByIds($ids: [Int!]!) {
+            books(where: {id: {_in: $ids}}, distinct_on: title) {
+                %s
+            }
+        }
+    """ % CARD_FIELDS,
+    "BookDetails": """
+        query BookDetails($id: Int!) {
+            books(where: {id: {_eq: $id}}, limit: 1) {
+                %s
+                contributions(limit: 1) {
+                  author {
+                    name
+                  }
+                }
+            }
+        }
+    """ % BOOK_FIELDS,
+    "BooksByTitle": """
+        query BooksByTitle($title: String!) {
+            books(where: {title: {_ilike: $title}, image_id: {_is_null: false}}) {
+                %s
+            }
+        }
+    """ % BOOK_FIELDS,
+    "BookByTitleChatbot": """
+        query BookByTitleChatbot($title: String!) {
+            books(where: {title: {_ilike: $title, _is_null: false}}, limit: 1) {
+                title
+                release_year
+                pages
+                images(limit: 1, where: {url: {_is_null: false}}) {
+                  url
+                }
+                image {
+                  url
+                }
+            }
+        }
+    """,
+    "SearchBooksByGenre": """
+        query SearchBooksByGenre($where: books_bool_exp!, $limit: Int!) {
+            books(where: $where, order_by: {id: asc}, limit: $limit) {
+                id
+            }
+        }
+    """,
+    "SearchBooksByGenreRanked": """
+        query SearchBooksByGenreRanked($where: books_bool_exp!, $limit: Int!, $offset: Int!) {
+            books(
+                where: $where,
+                order_by: [{users_count: desc_nulls_last}, {rating: desc_nulls_last}, {id: asc}],
+                limit: $limit,
+                offset: $offset
+            ) {
+                id
+            }
+        }
+    """,
+    "GetPopularBooks": """
+        query GetPopularBooks($startYear: Int!, $endYear: Int!, $minRating: numeric!, $limit: Int!) {
+            books(where: {
+                release_year: {_gte: $startYear, _lte: $endYear},
+                rating: {_gte: $minRating},
+                image_id: {_is_null: false}
+            }, order_by: {rating: desc}, limit: $limit) {
+                id
+            }
+        }
+    """,
+    "MirrorBooks": """
+        query MirrorBooks($from: Int!, $to: Int!) {
+            books(where: {id: {_gte: $from, _lt: $to}}, order_by: {id: asc}) {
+                id
+                title
+                release_year
+                pages
+                rating
+                description
+                image {
+                  url
+                }
+                contributions(limit: 1) {
+                  author {
+                    name
+                  }
+                }
+            }
+        }
+    """,
+    "FixtureBooks": """
+        query FixtureBooks($ids: [Int!]!) {
+            books(where: {id: {_in: $ids}}) {
+                %s
+                contributions(limit: 1) {
+                  author {
+                    name
+                  }
+                }
+            }
+        }
+    """ % BOOK_FIELDS,
+}
+
+
+@lru_cache(maxsize=None)
+def get_document(name: str) -> DocumentNode:
+    return gql(DOCUMENTS[name])
+
+
+@lru_cache(maxsize=64)
+def books_by_titles_document(count: int) -> DocumentNode:
+    """Aliased ``t0..tN`` title lookups; one document per batch size, built once."""
+    aliases = [f"t{i}" for i in range(count)]
+    variable_defs = ", ".join(f"${alias}: String!" for alias in aliases)
+    fields = "\n".join(
+        f"""{alias}: books(where: {{title: {{_ilike: ${alias}}}, image_id: {{_is_null: false}}}}, limit: 1) {{
+            {CARD_FIELDS}
+        }}"""
+        for alias in aliases
+    )
+    return gql(f"query BooksByTitles({variable_defs}) {{\n{fields}\n}}")
+
+
+@lru_cache(maxsize=256)
+def compile_query(query: str) -> DocumentNode:
+    """Parse an ad-hoc query string once; prefer adding it to ``DOCUMENTS``."""
+    return gql(query)
@@ -1,35 +1,137 @@
-from typing import List, Dict
-from gql import gql, Client
+from typing import List, Dict, Optional, Tuple, Union
+from datetime import date, timedelta
+from gql import Client
+from graphql import DocumentNode
+from gql.client import AsyncClientSession
 from gql.transport.aiohttp import AIOHTTPTransport
 from app.core.config import settings
+from app.services.batch_loader import BatchLoader
+from app.services.book_cache import book_cache
+from app.services.catalog_mirror import catalog_mirror
+from app.services.title_index import title_index
+from app.services.resilience import AdaptiveLimiter, CircuitBreaker, hedged
+from app.services.graphql_documents import DOCUMENTS, books_by_titles_document, compile_query, get_document
+import aiohttp
 import asyncio
+import logging
+
+PLACEHOLDER_IMAGE_URL = settings.PLACEHOLDER_IMAGE_URL
 
 
 class GraphQLService:
-    def __init__(self, token: str):
+    def __init__(self, token: str, max_concurrency: int = None, request_timeout: float = None):
         self.token = token
         self.url = settings.HARDCOVER_API_URL
-        self._lock = asyncio.Lock()
-
-    async def execute_query(self, query: str, variables: Dict = None) -> Dict:
-        async with self._lock:
-            try:
-                transport = AIOHTTPTransport(
-                    url=self.url,
-                    headers={
-                        "Authorization": self.token,
-                        "Content-Type": "application/json"
-                    },
-                    timeout=60
-                )
-                async with Client(
-                        transport=transport,
-                        fetch_schema_from_transport=False
-                ) as session:
-                    result = await session.execute(gql(query), variable_values=variables)
-                    return result
-            except Exception as e:
-                return {}
+        self.max_concurrency = max_concurrency or settings.HARDCOVER_MAX_CONCURRENCY
+        self.request_timeout = request_timeout or settings.HARDCOVER_REQUEST_TIMEOUT
+        self._client: Optional[Client] = None
+        self._session: Optional[AsyncClientSession] = None
+        self._connect_lock = asyncio.Lock()
+        self.limiter = AdaptiveLimiter(
+            initial=self.max_concurrency,
+            min_limit=min(settings.HARDCOVER_MIN_CONCURRENCY, self.max_concurrency),
+            max_limit=self.max_concurrency,
+            latency_target=settings.HARDCOVER_LATENCY_TARGET
+        )
+        self.breaker = CircuitBreaker(
+            error_rate=settings.HARDCOVER_BREAKER_ERROR_RATE,
+            min_requests=settings.HARDCOVER_BREAKER_MIN_REQUESTS,
+            window=settings.HARDCOVER_BREAKER_WINDOW,
+            cooldown=settings.HARDCOVER_BREAKER_COOLDOWN
+        )
+        self.hedge_delay = settings.HARDCOVER_HEDGE_DELAY
+        self._title_loader = BatchLoader(self._fetch_books_by_titles, settings.HARDCOVER_BATCH_SIZE)
+        self._id_loader = BatchLoader(self._fetch_books_by_ids, settings.HARDCOVER_BATCH_SIZE)
+
+    async def connect(self) -> AsyncClientSession:
+        """Open the shared keep-alive session; safe to call more than once."""
+        async with self._connect_lock:
+            if self._session is not None:
+                return self._session
+
+            transport = AIOHTTPTransport(
+                url=self.url,
+                headers={
+                    "Authorization": self.token,
+                    "Content-Type": "application/json"
+                },
+                client_session_args={
+                    # Room for hedged duplicates on top of the adaptive limit
+                    "connector": aiohttp.TCPConnector(
+                        limit=self.max_concurrency * 2,
+                        keepalive_timeout=60
+                    ),
+                    "timeout": aiohttp.ClientTimeout(
+                        total=self.request_timeout,
+                        connect=settings.HARDCOVER_CONNECT_TIMEOUT
+                    ),
+                }
+            )
+            client = Client(
+                transport=transport,
+                fetch_schema_from_transport=False,
+                execute_timeout=self.request_timeout
+            )
+            self._session = await client.connect_async()
+            self._client = client
+            return self._session
+
+    async def close(self) -> None:
+        async with self._connect_lock:
+            if self._client is not None:
+                try:
+                    await self._client.close_async()
+                except Exception as e:
+                    logging.warning(f"Error closing Hardcover session: {e}")
+            self._client = None
+            self._session = None
+
+    async def execute_query(self, query: Union[str, DocumentNode], variables: Dict = None,
+                            hedge: bool = False) -> Dict:
+        """
+        Run a registered operation (by name), a parsed document, or raw query text.
+
+        Returns ``{}`` on failure, and immediately while the circuit breaker is
+        open so callers drop straight to their cached or fallback data.
+        ``hedge`` allows a duplicate request for slow idempotent lookups.
+        """
+        if isinstance(query, str):
+            document = get_document(query) if query in DOCUMENTS else compile_query(query)
+        else:
+            document = query
+
+        if not self.breaker.allow():
+            logging.debug("Hardcover circuit open, skipping query")
+            return {}
+
+        try:
+            session = self._session or await self.connect()
+
+            def run():
+                return session.execute(document, variable_values=variables)
+
+            async with self.limiter.slot():
+                if hedge and self.hedge_delay:
+                    call = hedged(run, self.hedge_delay)
+                else:
+                    call = run()
+                result = await asyncio.wait_for(call, timeout=self.request_timeout)
+            self.breaker.record_success()
+            return result
+        except asyncio.CancelledError:
+            # The caller gave up, which says nothing about Hardcover; free the probe slot
+            self.breaker.release()
+            raise
+        except Exception as e:
+            self.breaker.record_failure()
+            logging.warning(f"Hardcover query failed: {type(e).__name__}: {e}")
+            return {}
+
+    def resilience_status(self) -> Dict:
+        return {
+            "circuit": self.breaker.snapshot(),
+            "concurrency": self.limiter.snapshot(),
+        }
 
     def extract_author_from_dto(self, book: Dict) -> None:
         dto = book.get("dto")
@@ -42,78 +144,176 @@ class GraphQLService:
         else:
             book["author"] = "Unknown Author"
 
-    async def get_trending_books_ids(self) -> List[int]:
-        query = """
-        query GetTrendingBooks {
-            books_trending(from: "2024-01-01", to: "2024-12-31", limit: 50, offset: 0) {
-                ids
-            }
-        }
-        """
+    def attach_image_url(self, book: Dict) -> Dict:
+        if book.get("images"):
+            book["image_url"] = book["images"][0]["url"]
+        elif book.get("image") and book["image"].get("url"):
+            book["image_url"] = book["image"]["url"]
+        else:
+            book["image_url"] = PLACEHOLDER_IMAGE_URL
+        return book
+
+    async def load_book_by_title(self, title: str, author: Optional[str] = None) -> Optional[Dict]:
+        found, book = book_cache.lookup(book_cache.title_key(title))
+        if found:
+            return book
+        book = catalog_mirror.find_by_title(title)
+        if book is not None:
+            return self._from_mirror(book)
+
+        # A close local match beats an exact-title query that may well miss
+        match = title_index.resolve(title, author)
+        if match is not None:
+            book = await self.load_book_by_id(match["id"])
+            if book is not None:
+                book_cache.set(book_cache.title_key(title), book)
+                return book
+        return await self._title_loader.load(title)
+
+    async def load_books_by_titles(self, titles: List[str],
+                                   authors: Optional[List[Optional[str]]] = None) -> List[Optional[Dict]]:
+        """Resolve many titles in one round trip; results follow the input order."""
+        authors = authors or [None] * len(titles)
+        return list(await asyncio.gather(*(
+            self.load_book_by_title(title, author) for title, author in zip(titles, authors)
+        )))
+
+    async def load_book_by_id(self, book_id: int) -> Optional[Dict]:
+        found, book = book_cache.lookup(book_cache.id_key(book_id))
+        if found:
+            return book
+        book = catalog_mirror.get_by_id(book_id)
+        if book is not None:
+            return self._from_mirror(book)
+        return await self._id_loader.load(book_id)
+
+    async def load_books_by_ids(self, book_ids: List[int]) -> List[Optional[Dict]]:
+        return list(await asyncio.gather(*(self.load_book_by_id(book_id) for book_id in book_ids)))
+
+    def _from_mirror(self, book: Dict) -> Dict:
+        book["image_url"] = book.get("image_url") or PLACEHOLDER_IMAGE_URL
+        return book
+
+    async def _fetch_books_by_titles(self, titles: List[str]) -> Dict[str, Dict]:
+        aliases = [f"t{i}" for i in range(len(titles))]
+        result = await self.execute_query(
+            books_by_titles_document(len(titles)), dict(zip(aliases, titles)), hedge=True
+        )
+
+        found = {}
+        for alias, title in zip(aliases, titles):
+            if alias not in result:
+                # The request itself failed: no negative entry, but an expired hit beats nothing
+                found_stale, book = book_cache.lookup(book_cache.title_key(title), allow_stale=True)
+                if found_stale and book is not None:
+                    found[title] = book
+                continue
+            books = result[alias] or []
+            if books:
+                book = books[0]
+                self.extract_author_from_dto(book)
+                found[title] = self.attach_image_url(book)
+                book_cache.set_book(book, title)
+                title_index.add(book)
+            else:
+                book_cache.set(book_cache.title_key(title), None)
+        return found
+
+    async def _fetch_books_by_ids(self, book_ids: List[int]) -> Dict[int, Dict]:
+        books = await self.get_book_details_by_ids(book_ids)
+        return {book["id"]: book for book in books if "id" in book}
+
+    async def get_trending_books_ids(self, from_date: Optional[date] = None, to_date: Optional[date] = None,
+                                     limit: int = 50, random_fallback: bool = True) -> List[int]:
+        to_date = to_date or date.today()
+        from_date = from_date or (to_date - timedelta(days=365))
+        variables = {"from": from_date.isoformat(), "to": to_date.isoformat(), "limit": limit}
         try:
-            result = await self.execute_query(query)
+            result = await self.execute_query("GetTrendingBooks", variables)
             trending_ids = result.get("books_trending", {}).get("ids", [])
             if trending_ids:
                 return trending_ids
         except Exception:
             pass
-        
+
+        if not random_fallback:
+            return []
+
         import random
-        return random.sample(range(1, 5000), 50)
+        return random.sample(range(1, 5000), limit)
 
     async def get_book_details_by_ids(self, book_ids: List[int]) -> List[Dict]:
-        query = """
-        query MyQuery($ids: [Int!]!) {
-            books(where: {id: {_in: $ids}}, distinct_on: title) {
-                id
-                title
-                release_year
-                release_date
-                images(limit: 1, where: {url: {_is_null: false}}) {
-                    url
-                }
-                rating
-                pages
-                description
-            }
-        }
-        """
-        variables = {"ids": book_ids}
-        result = await self.execute_query(query, variables)
-        books = result.get("books", [])
- 
-        for book in books:
-            if not book.get("images") or not book["images"]:
-                book["image_url"] = "data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMzAwIiBoZWlnaHQ9IjQwMCIgdmlld0JveD0iMCAwIDMwMCA0MDAiIGZpbGw9Im5vbmUiIHhtbG5zPSJodHRwOi8vd3d3LnczLm9yZy8yMDAwL3N2ZyI+CiAgPGRlZnM+CiAgICA8bGluZWFyR3JhZGllbnQgaWQ9ImJnR3JhZGllbnQiIHgxPSIwJSIgeTE9IjAlIiB4Mj0iMTAwJSIgeTI9IjEwMCUiPgogICAgICA8c3RvcCBvZmZzZXQ9IjAlIiBzdHlsZT0ic3RvcC1jb2xvcjojNjY2Njk5O3N0b3Atb3BhY2l0eToxIiAvPgogICAgICA8c3RvcCBvZmZzZXQ9IjEwMCUiIHN0eWxlPSJzdG9wLWNvbG9yOiM5OTk5Y2M7c3RvcC1vcGFjaXR5OjEiIC8+CiAgICA8L2xpbmVhckdyYWRpZW50PgogICAgPGxpbmVhckdyYWRpZW50IGlkPSJib29rR3JhZGllbnQiIHgxPSIwJSIgeTE9IjAlIiB4Mj0iMTAwJSIgeTI9IjEwMCUiPgogICAgICA8c3RvcCBvZmZzZXQ9IjAlIiBzdHlsZT0ic3RvcC1jb2xvcjojNDA0NjhiO3N0b3Atb3BhY2l0eToxIiAvPgogICAgICA8c3RvcCBvZmZzZXQ9IjEwMCUiIHN0eWxlPSJzdG9wLWNvbG9yOiM2MjY2OWY7c3RvcC1vcGFjaXR5OjEiIC8+CiAgICA8L2xpbmVhckdyYWRpZW50PgogICAgPGZpbHRlciBpZD0iZHJvcFNoYWRvdyI+CiAgICAgIDxmZU9mZnNldCBkeD0iMyIgZHk9IjMiLz4KICAgICAgPGZlR2F1c3NpYW5CbHVyIHN0ZERldmlhdGlvbj0iMyIvPgogICAgICA8ZmVGbG9vZCBmbG9vZC1jb2xvcj0iIzAwMDAwMCIgZmxvb2Qtb3BhY2l0eT0iMC4zIi8+CiAgICAgIDxmZUNvbXBvc2l0ZSBvcGVyYXRvcj0ib3ZlciIvPgogICAgPC9maWx0ZXI+CiAgPC9kZWZzPgogIDxyZWN0IHdpZHRoPSIzMDAiIGhlaWdodD0iNDAwIiBmaWxsPSJ1cmwoI2JnR3JhZGllbnQpIi8+CiAgPGcgdHJhbnNmb3JtPSJ0cmFuc2xhdGUoNzUsIDgwKSI+CiAgICA8IS0tIEJvb2sgQ292ZXIgLS0+CiAgICA8cmVjdCB4PSIwIiB5PSIwIiB3aWR0aD0iMTUwIiBoZWlnaHQ9IjI0MCIgZmlsbD0idXJsKCNib29rR3JhZGllbnQpIiByeD0iMTAiIGZpbHRlcj0idXJsKCNkcm9wU2hhZG93KSIvPgogICAgPCEtLSBCb29rIFNwaW5lIC0tPgogICAgPHJlY3QgeD0iNSIgeT0iMCIgd2lkdGg9IjEwIiBoZWlnaHQ9IjI0MCIgZmlsbD0iIzJkMzc0OCIgcng9IjIiLz4KICAgIDwhLS0gQm9vayBQYWdlcyAtLT4KICAgIDxyZWN0IHg9IjE1IiB5PSI4IiB3aWR0aD0iMTI1IiBoZWlnaHQ9IjIyNCIgZmlsbD0iI2Y4ZjlmYSIgcng9IjUiLz4KICAgIDwhLS0gVGV4dCBMaW5lcyAtLT4KICAgIDxyZWN0IHg9IjI1IiB5PSIzMCIgd2lkdGg9IjEwNSIgaGVpZ2h0PSI0IiBmaWxsPSIjZTBlNmVkIiByeD0iMiIvPgogICAgPHJlY3QgeD0iMjUiIHk9IjQ1IiB3aWR0aD0iODAiIGhlaWdodD0iNCIgZmlsbD0iI2UwZTZlZCIgcng9IjIiLz4KICAgIDxyZWN0IHg9IjI1IiB5PSI2MCIgd2lkdGg9Ijk1IiBoZWlnaHQ9IjQiIGZpbGw9IiNlMGU2ZWQiIHJ4PSIyIi8+CiAgICA8cmVjdCB4PSIyNSIgeT0iNzUiIHdpZHRoPSI3MCIgaGVpZ2h0PSI0IiBmaWxsPSIjZTBlNmVkIiByeD0iMiIvPgogICAgPHJlY3QgeD0iMjUiIHk9IjkwIiB3aWR0aD0iMTAwIiBoZWlnaHQ9IjQiIGZpbGw9IiNlMGU2ZWQiIHJ4PSIyIi8+CiAgICA8IS0tIEJvb2sgSWNvbiAtLT4KICAgIDxjaXJjbGUgY3g9Ijc1IiBjeT0iMTYwIiByPSIyNSIgZmlsbD0iIzQwNDY4YiIgb3BhY2l0eT0iMC4xIi8+CiAgICA8dGV4dCB4PSI3NSIgeT0iMTcwIiBmb250LWZhbWlseT0iU2Vnb2UgVUksIEFyaWFsLCBzYW5zLXNlcmlmIiBmb250LXNpemU9IjMwIiBmaWxsPSIjNDA0NjhiIiB0ZXh0LWFuY2hvcj0ibWlkZGxlIj7wn5OWPC90ZXh0PgogIDwvZz4KPC9zdmc+"
+        cached = {}
+        missing_ids = []
+        for book_id in book_ids:
+            book = book_cache.get(book_cache.id_key(book_id))
+            if book is not None:
+                cached[book_id] = book
             else:
-                book["image_url"] = book["images"][0]["url"]
-        
+                missing_ids.append(book_id)
+
+        if missing_ids and catalog_mirror.enabled:
+            for book_id, book in catalog_mirror.get_by_ids(missing_ids).items():
+                cached[book_id] = self._from_mirror(book)
+            missing_ids = [book_id for book_id in missing_ids if book_id not in cached]
+
+        if missing_ids:
+            variables = {"ids": missing_ids}
+            result = await self.execute_query("BooksByIds", variables, hedge=True)
+            if "books" not in result:
+                for book_id in missing_ids:
+                    found_stale, book = book_cache.lookup(book_cache.id_key(book_id), allow_stale=True)
+                    if found_stale and book is not None:
+                        cached[book_id] = book
+
+            for book in result.get("books", []):
+                self.attach_image_url(book)
+                book_cache.set_book(book)
+                title_index.add(book)
+                cached[book["id"]] = book
+
+        books = []
+        seen_titles = set()
+        for book_id in book_ids:
+            book = cached.get(book_id)
+            if book and book.get("title") not in seen_titles:
+                seen_titles.add(book.get("title"))
+                books.append(book)
         return books
 
-    async def get_book_details_by_titles(self, title: str) -> List[Dict]:
+    async def get_book_detail(self, book_id: int) -> Optional[Dict]:
+        """Full record (description, headline, author) for the detail view."""
+        key = book_cache.detail_key(book_id)
+        found, book = book_cache.lookup(key)
+        if found:
+            return book
 
-        query = """
-        query MyQuery($title: String!) {
-            books(where: {title: {_ilike: $title}, image_id: {_is_null: false}}) {
-                id
-                title
-                release_year
-                release_date
-                rating
-                pages
-                images(limit: 1, where: {url: {_is_null: false}}) {
-                  url
-                }
-                image {
-                  url
-                }
-                description
-                headline
-            }
-        }
-        """
+        book = catalog_mirror.get_by_id(book_id)
+        if book is not None:
+            return self._from_mirror(book)
+
+        result = await self.execute_query("BookDetails", {"id": book_id}, hedge=True)
+        if "books" not in result:
+            found_stale, book = book_cache.lookup(key, allow_stale=True)
+            return book if found_stale else None
+
+        books = result["books"]
+        if not books:
+            book_cache.set(key, None)
+            return None
+
+        book = self.attach_image_url(books[0])
+        book.pop("images", None)
+        book.pop("image", None)
+        contributions = book.pop("contributions", None) or []
+        author = (contributions[0].get("author") or {}).get("name") if contributions else None
+        book["author"] = author or "Unknown Author"
+        book_cache.set(key, book)
+        return book
+
+    async def get_book_details_by_titles(self, title: str) -> List[Dict]:
         variables = {"title": title}
-        result = await self.execute_query(query, variables)
+        result = await self.execute_query("BooksByTitle", variables)
         books = result.get("books", [])
 
         for book in books:
@@ -123,29 +323,14 @@ class GraphQLService:
                 if book.get("image") and book["image"].get("url"):
                     book["image_url"] = book["image"]["url"]
                 else:
-                    book["image_url"] = "data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMzAwIiBoZWlnaHQ9IjQwMCIgdmlld0JveD0iMCAwIDMwMCA0MDAiIGZpbGw9Im5vbmUiIHhtbG5zPSJodHRwOi8vd3d3LnczLm9yZy8yMDAwL3N2ZyI+CiAgPGRlZnM+CiAgICA8bGluZWFyR3JhZGllbnQgaWQ9ImJnR3JhZGllbnQiIHgxPSIwJSIgeTE9IjAlIiB4Mj0iMTAwJSIgeTI9IjEwMCUiPgogICAgICA8c3RvcCBvZmZzZXQ9IjAlIiBzdHlsZT0ic3RvcC1jb2xvcjojNjY2Njk5O3N0b3Atb3BhY2l0eToxIiAvPgogICAgICA8c3RvcCBvZmZzZXQ9IjEwMCUiIHN0eWxlPSJzdG9wLWNvbG9yOiM5OTk5Y2M7c3RvcC1vcGFjaXR5OjEiIC8+CiAgICA8L2xpbmVhckdyYWRpZW50PgogICAgPGxpbmVhckdyYWRpZW50IGlkPSJib29rR3JhZGllbnQiIHgxPSIwJSIgeTE9IjAlIiB4Mj0iMTAwJSIgeTI9IjEwMCUiPgogICAgICA8c3RvcCBvZmZzZXQ9IjAlIiBzdHlsZT0ic3RvcC1jb2xvcjojNDA0NjhiO3N0b3Atb3BhY2l0eToxIiAvPgogICAgICA8c3RvcCBvZmZzZXQ9IjEwMCUiIHN0eWxlPSJzdG9wLWNvbG9yOiM2MjY2OWY7c3RvcC1vcGFjaXR5OjEiIC8+CiAgICA8L2xpbmVhckdyYWRpZW50PgogICAgPGZpbHRlciBpZD0iZHJvcFNoYWRvdyI+CiAgICAgIDxmZU9mZnNldCBkeD0iMyIgZHk9IjMiLz4KICAgICAgPGZlR2F1c3NpYW5CbHVyIHN0ZERldmlhdGlvbj0iMyIvPgogICAgICA8ZmVGbG9vZCBmbG9vZC1jb2xvcj0iIzAwMDAwMCIgZmxvb2Qtb3BhY2l0eT0iMC4zIi8+CiAgICAgIDxmZUNvbXBvc2l0ZSBvcGVyYXRvcj0ib3ZlciIvPgogICAgPC9maWx0ZXI+CiAgPC9kZWZzPgogIDxyZWN0IHdpZHRoPSIzMDAiIGhlaWdodD0iNDAwIiBmaWxsPSJ1cmwoI2JnR3JhZGllbnQpIi8+CiAgPGcgdHJhbnNmb3JtPSJ0cmFuc2xhdGUoNzUsIDgwKSI+CiAgICA8IS0tIEJvb2sgQ292ZXIgLS0+CiAgICA8cmVjdCB4PSIwIiB5PSIwIiB3aWR0aD0iMTUwIiBoZWlnaHQ9IjI0MCIgZmlsbD0idXJsKCNib29rR3JhZGllbnQpIiByeD0iMTAiIGZpbHRlcj0idXJsKCNkcm9wU2hhZG93KSIvPgogICAgPCEtLSBCb29rIFNwaW5lIC0tPgogICAgPHJlY3QgeD0iNSIgeT0iMCIgd2lkdGg9IjEwIiBoZWlnaHQ9IjI0MCIgZmlsbD0iIzJkMzc0OCIgcng9IjIiLz4KICAgIDwhLS0gQm9vayBQYWdlcyAtLT4KICAgIDxyZWN0IHg9IjE1IiB5PSI4IiB3aWR0aD0iMTI1IiBoZWlnaHQ9IjIyNCIgZmlsbD0iI2Y4ZjlmYSIgcng9IjUiLz4KICAgIDwhLS0gVGV4dCBMaW5lcyAtLT4KICAgIDxyZWN0IHg9IjI1IiB5PSIzMCIgd2lkdGg9IjEwNSIgaGVpZ2h0PSI0IiBmaWxsPSIjZTBlNmVkIiByeD0iMiIvPgogICAgPHJlY3QgeD0iMjUiIHk9IjQ1IiB3aWR0aD0iODAiIGhlaWdodD0iNCIgZmlsbD0iI2UwZTZlZCIgcng9IjIiLz4KICAgIDxyZWN0IHg9IjI1IiB5PSI2MCIgd2lkdGg9Ijk1IiBoZWlnaHQ9IjQiIGZpbGw9IiNlMGU2ZWQiIHJ4PSIyIi8+CiAgICA8cmVjdCB4PSIyNSIgeT0iNzUiIHdpZHRoPSI3MCIgaGVpZ2h0PSI0IiBmaWxsPSIjZTBlNmVkIiByeD0iMiIvPgogICAgPHJlY3QgeD0iMjUiIHk9IjkwIiB3aWR0aD0iMTAwIiBoZWlnaHQ9IjQiIGZpbGw9IiNlMGU2ZWQiIHJ4PSIyIi8+CiAgICA8IS0tIEJvb2sgSWNvbiAtLT4KICAgIDxjaXJjbGUgY3g9Ijc1IiBjeT0iMTYwIiByPSIyNSIgZmlsbD0iIzQwNDY4YiIgb3BhY2l0eT0iMC4xIi8+CiAgICA8dGV4dCB4PSI3NSIgeT0iMTcwIiBmb250LWZhbWlseT0iU2Vnb2UgVUksIEFyaWFsLCBzYW5zLXNlcmlmIiBmb250LXNpemU9IjMwIiBmaWxsPSIjNDA0NjhiIiB0ZXh0LWFuY2hvcj0ibWlkZGxlIj7wn5OWPC90ZXh0PgogIDwvZz4KPC9zdmc+"
+                    book["image_url"] = PLACEHOLDER_IMAGE_URL
             else:
                 book["image_url"] = book["images"][0]["url"]
         return books
 
     async def get_book_details_by_title_chatbot(self, title: str) -> List[Dict]:
-        query = """
-        query MyQuery($title: String!) {
-            books(where: {title: {_ilike: $title, _is_null: false}}, limit: 1) {
-                title
-                release_year
-                pages
-                images(limit: 1, where: {url: {_is_null: false}}) {
-                  url
-                }
-                image{
-                  url
-                }
-            }
-        }
-        """
         variables = {"title": title}
-        result = await self.execute_query(query, variables)
+        result = await self.execute_query("BookByTitleChatbot", variables)
         books = result.get("books", [])
 
         for book in books:
@@ -153,45 +338,57 @@ class GraphQLService:
         return books
 
 
-    async def get_books_by_genre_search(self, genre_terms: List[str], limit: int = 20) -> List[int]:
-        search_queries = []
-        for term in genre_terms:
-            query = f"""
-            query SearchBooks {{
-                books(where: {{
-                    _or: [
-                        {{description: {{_ilike: "%{term}%"}}}},
-                        {{title: {{_ilike: "%{term}%"}}}}
-                    ],
-                    image_id: {{_is_null: false}}
-                }}, limit: {limit//len(genre_terms)}) {{
-                    id
-                }}
-            }}
-            """
-            try:
-                result = await self.execute_query(query)
-                books = result.get("books", [])
-                search_queries.extend([book["id"] for book in books])
-            except Exception:
-                continue
-        
-        return search_queries[:limit] if search_queries else []
+    async def search_books_by_genre_page(self, genre_terms: List[str], limit: int = 20,
+                                         after: Optional[int] = None) -> Tuple[List[int], Optional[int]]:
+        """
+        One round trip for all terms: a single ``_or`` over title/description
+        matches, ordered by id so the last id doubles as the next-page cursor.
+        Returns ``(ids, next_cursor)``; ``next_cursor`` is None on the last page.
+        """
+        where = self._genre_where(genre_terms)
+        if where is None:
+            return [], None
+        if after is not None:
+            where["id"] = {"_gt": after}
+
+        result = await self.execute_query("SearchBooksByGenre", {"where": where, "limit": limit})
+        ids = [book["id"] for book in result.get("books", [])]
+        next_cursor = ids[-1] if len(ids) == limit else None
+        return ids, next_cursor
+
+    async def search_popular_books_by_genre(self, genre_terms: List[str], limit: int = 100,
+                                            offset: int = 0) -> List[int]:
+        """Genre matches most read first (users_count, then rating), so a truncated list keeps the best books."""
+        where = self._genre_where(genre_terms)
+        if where is None:
+            return []
+        result = await self.execute_query(
+            "SearchBooksByGenreRanked", {"where": where, "limit": limit, "offset": offset}
+        )
+        return [book["id"] for book in result.get("books", [])]
+
+    @staticmethod
+    def _genre_where(genre_terms: List[str]) -> Optional[Dict]:
+        terms = [term.strip() for term in genre_terms if term and term.strip()]
+        if not terms:
+            return None
+        matches = []
+        for term in terms:
+            pattern = f"%{term}%"
+            matches.append({"description": {"_ilike": pattern}})
+            matches.append({"title": {"_ilike": pattern}})
+        return {"_or": matches, "image_id": {"_is_null": False}}
+
+    async def get_books_by_genre_search(self, genre_terms: List[str], limit: int = 20,
+                                        after: Optional[int] = None) -> List[int]:
+        # A single _or query never repeats an id, so no de-duplication pass is needed
+        book_ids, _ = await self.search_books_by_genre_page(genre_terms, limit, after)
+        return book_ids
 
     async def get_popular_books_by_year_range(self, start_year: int, end_year: int, limit: int = 30) -> List[int]:
-        query = f"""
-        query GetPopularBooks {{
-            books(where: {{
-                release_year: {{_gte: {start_year}, _lte: {end_year}}},
-                rating: {{_gte: 3.5}},
-                image_id: {{_is_null: false}}
-            }}, order_by: {{rating: desc}}, limit: {limit}) {{
-                id
-            }}
-        }}
-        """
+        variables = {"startYear": start_year, "endYear": end_year, "minRating": 3.5, "limit": limit}
         try:
-            result = await self.execute_query(query)
+            result = await self.execute_query("GetPopularBooks", variables)
             books = result.get("books", [])
             return [book["id"] for book in books]
         except Exception:
@@ -0,0 +1,312 @@
+"""
+Local intent routing for chat messages, ahead of the LLM.
+
+Three tiers, cheapest first: compiled keyword rules that are only trusted
+when exactly one intent matches and the model sees no second one, a
+multinomial naive Bayes model over hashed word n-grams (never alone for
+order placement), and the LLM for whatever is left below the confidence
+threshold. Messages the LLM labels can be logged and fed back
+into the model with ``scripts/train_intent_classifier.py``.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+INTENTS = ["book_recommendation", "order_query", "order_placement", "fraudulent_transactions", "out_of_context"]
+N_FEATURES = 2 ** 15
+# Model share for another intent above which a single rule match may be half of a multi-intent message
+SECOND_INTENT_SHARE = 0.2
+# Intents whose agent acts on the user's behalf; the model alone is too loosely calibrated to route them
+RULE_REQUIRED = {"order_placement"}
+
+_GENRES = r"horror|fantasy|romance|romantic|sci-?fi|science fiction|mystery|thriller|action|adventure|classic"
+RULES = {
+    "fraudulent_transactions": re.compile(
+        r"\b(fraud\w*|unauthori[sz]ed|scam\w*|stolen (card|credit card)|charged twice|double[- ]charged|"
+        r"didn'?t (make|authori[sz]e) (this|that|the)|suspicious (charge|transaction|activity)|"
+        r"(arrived|came|is|was) damaged|damaged (book|item|package|product))\b"
+    ),
+    "order_query": re.compile(
+        r"\b(where('?s| is) my (order|package|delivery)|track(ing)? (my |the )?(order|package)|"
+        r"order (status|details|history|number)|status of (my|the) order|view order details|"
+        r"when will my (order|books?) (arrive|ship)|my past orders)\b"
+    ),
+    "order_placement": re.compile(
+        r"\b(place (an? |my |the )?order|check ?out|add (it |this |these |them )?to (my )?cart|"
+        r"(i('?d| would) like to|i want to|let me) (buy|purchase|order) (it|this|these|them|that)\b)"
+    ),
+    "book_recommendation": re.compile(
+        r"\b(recommend\w*|suggest\w*|more like (this|these|that)|what should i read|"
+        r"(some|any|good|great|similar|new|more) (books?|novels?|reads?)|"
+        rf"({_GENRES}) (books?|novels?|stories|reads?))\b"
+    ),
+}
+
+# Seed training set; extended with LLM-labelled messages from INTENT_LOG_PATH
+SEED_EXAMPLES = {
+    "book_recommendation": [
+        "give me some horror books", "show me fantasy books", "recommend books", "what books do you suggest?",
+        "I want action books", "looking for romance novels", "can you suggest a good mystery",
+        "I loved Dune, what else would I like", "something like Harry Potter please", "any good thrillers",
+        "I enjoy epic fantasy with dragons", "what should I read next", "suggest a classic novel",
+        "I like Stephen King", "books about space exploration", "show me more", "more like these",
+        "I'm into historical fiction", "a light read for the beach", "best sci-fi of all time",
+        "I prefer short books", "novels with strong female leads", "I read mostly mysteries",
+        "I want something scary", "give me a few more options", "something different this time",
+    ],
+    "order_query": [
+        "where is my order", "track my order", "what's the status of my order", "order status",
+        "view order details 123", "when will my books arrive", "has my order shipped",
+        "I haven't received my package", "show my order history", "check order 4521",
+        "my delivery is late", "what did I order last week", "is my package on the way",
+        "order number 8812 details", "did my order go through",
+    ],
+    "order_placement": [
+        "place an order", "I want to buy this book", "add this to my cart", "checkout",
+        "I'd like to purchase these", "order these books for me", "buy it now", "proceed to payment",
+        "I want to order The Hobbit", "purchase the first one", "add them to cart and checkout",
+        "how do I pay", "I'll take it", "complete my purchase",
+    ],
+    "fraudulent_transactions": [
+        "I see a charge I didn't make", "unauthorized transaction on my card", "I was charged twice",
+        "someone used my card", "this looks like fraud", "report a suspicious transaction",
+        "my book arrived damaged", "the package was damaged", "I want a refund for a damaged book",
+        "there's a charge I don't recognize", "my account was hacked and used to order",
+        "double charged for one order", "the cover was torn when it arrived",
+    ],
+    "out_of_context": [
+        "what's the weather today", "tell me a joke", "who won the game last night", "hello",
+        "how are you", "what time is it", "write me a poem", "what is the capital of France",
+        "can you help me with my homework", "thanks", "bye", "what's your name", "play some music",
+        "how do I cook pasta", "what's the stock price of Apple",
+    ],
+}
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def message_columns(message: str) -> List[int]:
+    """Hashed unigram and bigram columns; unlike book text, short words like "my" and "where" matter here."""
+    tokens = _TOKEN.findall((message or "").lower())
+    terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    return [zlib.crc32(term.encode("utf-8")) % N_FEATURES for term in terms]
+
+
+def match_rules(message: str) -> List[str]:
+    text = (message or "").lower()
+    return [intent for intent, pattern in RULES.items() if pattern.search(text)]
+
+
+class NaiveBayesIntentModel:
+    """Multinomial naive Bayes over hashed n-grams; keeps raw counts so it can be retrained incrementally."""
+
+    def __init__(self, counts: Optional[np.ndarray] = None, alpha: float = 0.5):
+        self.alpha = alpha
+        self.counts = counts if counts is not None else np.zeros((len(INTENTS), N_FEATURES), dtype=np.float32)
+        self.doc_counts = np.zeros(len(INTENTS), dtype=np.float32)
+        self._fit()
+
+    def add(self, examples: Iterable[Tuple[str, str]]) -> int:
+        added = 0
+        for message, intent in examples:
+            if intent not in INTENTS:
+                continue
+            row = INTENTS.index(intent)
+            np.add.at(self.counts[row], message_columns(message), 1)
+            self.doc_counts[row] += 1
+            added += 1
+        self._fit()
+        return added
+
+    def _fit(self) -> None:
+        totals = self.counts.sum(axis=1, keepdims=True)
+        self.log_likelihood = np.log((self.counts + self.alpha) / (totals + self.alpha * N_FEATURES))
+        docs = self.doc_counts + 1
+        self.log_prior = np.log(docs / docs.sum())
+        self.seen = self.counts.sum(axis=0) > 0
+
+    def probabilities(self, message: str) -> Optional[np.ndarray]:
+        """Posterior per intent (in ``INTENTS`` order), or None when no n-gram was seen in training."""
+        columns = message_columns(message)
+        if not columns or not self.seen[columns].any():
+            return None
+        scores = self.log_prior + self.log_likelihood[:, columns].sum(axis=1)
+        probabilities = np.exp(scores - scores.max())
+        return probabilities / probabilities.sum()
+
+    def predict(self, message: str) -> Optional[Tuple[str, float]]:
+        """Most likely intent and its posterior, or None when no n-gram was seen in training."""
+        probabilities = self.probabilities(message)
+        if probabilities is None:
+            return None
+        best = int(probabilities.argmax())
+        return INTENTS[best], float(probabilities[best])
+
+    def save(self, path: str) -> None:
+        np.savez_compressed(path, counts=self.counts, doc_counts=self.doc_counts, intents=np.array(INTENTS))
+
+    @classmethod
+    def load(cls, path: str) -> "NaiveBayesIntentModel":
+        with np.load(path) as data:
+            if list(data["intents"]) != INTENTS:
+                raise ValueError("intent model was trained for a different intent list")
+            model = cls(counts=data["counts"].astype(np.float32))
+            model.doc_counts = data["doc_counts"].astype(np.float32)
+        model._fit()
+        return model
+
+    @classmethod
+    def from_seed(cls) -> "NaiveBayesIntentModel":
+        model = cls()
+        model.add((message, intent) for intent, messages in SEED_EXAMPLES.items() for message in messages)
+        return model
+
+
+def read_logged_examples(path: str) -> List[Tuple[str, str]]:
+    examples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+                examples.append((record["message"], record["intent"]))
+            except (ValueError, KeyError):
+                continue
+    return examples
+
+
+class IntentClassifier:
+    """
+    Routes a message to intents locally when it can; ``classify`` returns
+    ``None`` when the caller should ask the LLM. Counters per tier show how
+    much traffic each one absorbs.
+    """
+
+    def __init__(self, min_confidence: float = 0.85, model_path: Optional[str] = None,
+                 log_path: Optional[str] = None):
+        self.min_confidence = min_confidence
+        self.model_path = model_path
+        self.log_path = log_path
+        self._model: Optional[NaiveBayesIntentModel] = None
+        self._lock = threading.Lock()
+        # Logged examples wait here for a flush in a worker thread; the write lock keeps flushes in order
+        self._log_queue: List[str] = []
+        self._write_lock = threading.Lock()
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self._counters = {"rules": 0, "model": 0, "llm": 0, "logged": 0}
+        self._local_seconds = 0.0
+
+    @property
+    def model(self) -> NaiveBayesIntentModel:
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._load_model()
+        return self._model
+
+    def _load_model(self) -> NaiveBayesIntentModel:
+        if self.model_path and os.path.exists(self.model_path):
+            try:
+                return NaiveBayesIntentModel.load(self.model_path)
+            except Exception as e:
+                logging.error(f"Intent model unreadable, using the seed model: {e}")
+        return NaiveBayesIntentModel.from_seed()
+
+    def classify(self, message: str) -> Optional[Tuple[List[str], str]]:
+        """``(intents, tier)`` from the rules or the model, or None below ``min_confidence``."""
+        model = self.model
+        started = time.perf_counter()
+        try:
+            matches = match_rules(message)
+            probabilities = model.probabilities(message)
+            if len(matches) == 1 and not self._second_intent(matches[0], probabilities):
+                self._counters["rules"] += 1
+                return matches, "rules"
+
+            # A rule match that got here looks multi-intent, which the model can't express; the LLM can
+            if not matches and probabilities is not None:
+                best = int(probabilities.argmax())
+                intent = INTENTS[best]
+                if probabilities[best] >= self.min_confidence and intent not in RULE_REQUIRED:
+                    self._counters["model"] += 1
+                    return [intent], "model"
+            self._counters["llm"] += 1
+            return None
+        finally:
+            self._local_seconds += time.perf_counter() - started
+
+    @staticmethod
+    def _second_intent(matched: str, probabilities: Optional[np.ndarray]) -> bool:
+        """Whether the model sees another actionable intent the single matching rule would drop."""
+        if probabilities is None:
+            return False
+        return any(
+            probabilities[i] >= SECOND_INTENT_SHARE
+            for i, intent in enumerate(INTENTS) if intent not in (matched, "out_of_context")
+        )
+
+    def record(self, message: str, intents: List[str]) -> None:
+        """Keep an LLM-labelled message as training data; multi-intent labels are skipped."""
+        known = [intent for intent in intents if intent in INTENTS]
+        if not self.log_path or len(known) != 1:
+            return
+        line = json.dumps({"message": message, "intent": known[0], "at": time.time()}) + "\n"
+        with self._lock:
+            self._log_queue.append(line)
+            # Lines queued behind this one ride along with its flush
+            first = len(self._log_queue) == 1
+        if not first:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts); nothing to block
+            self._flush_log()
+            return
+        task = loop.create_task(asyncio.to_thread(self._flush_log))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    def _flush_log(self) -> None:
+        with self._write_lock:
+            with self._lock:
+                lines, self._log_queue = self._log_queue, []
+            if not lines:
+                return
+            try:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.writelines(lines)
+                self._counters["logged"] += len(lines)
+            except OSError as e:
+                logging.warning(f"Could not log {len(lines)} intent example(s): {e}")
+
+    async def stop(self) -> None:
+        """Wait for queued examples to reach the log."""
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+
+    def status(self) -> Dict:
+        counters = dict(self._counters)
+        routed = counters["rules"] + counters["model"] + counters["llm"]
+        return {
+            **counters,
+            "local_rate": round((counters["rules"] + counters["model"]) / routed, 4) if routed else 0.0,
+            "avg_local_ms": round(self._local_seconds / routed * 1000, 3) if routed else 0.0,
+            "model_path": self.model_path if self.model_path and os.path.exists(self.model_path) else None,
+        }
+
+
+intent_classifier = IntentClassifier(
+    min_confidence=settings.INTENT_MIN_CONFIDENCE,
+    model_path=settings.INTENT_MODEL_PATH,
+    log_path=settings.INTENT_LOG_PATH,
+)
@@ -6,10 +6,14 @@ from .order_placement_agent import OrderPlacementAgent
 from .fraudulent_transaction_agent import FraudulentTransactionAgent
 from .user_proxy_agent import UserProxyAgent
 from langchain.llms import OpenAI
-from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.messages import AIMessage
 from langgraph.graph import StateGraph
-from langchain.memory import ConversationBufferMemory
 from app.services.utils import serialize_message
+from app.core.config import settings
+from app.core.llm import create_chat_llm
+from app.core.llm_cache import CachedLLM
+from app.services.session_store import SessionMemory
+from app.services.intent_classifier import intent_classifier
 import logging
 import os
 import asyncio
@@ -17,19 +21,26 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# What the user is told when an agent misses its deadline or fails
+AGENT_TASKS = {
+    "recommendation_agent": "finding book recommendations",
+    "order_query_agent": "looking up your order",
+    "order_placement_agent": "placing your order",
+    "fraudulent_transaction_agent": "reviewing the transaction",
+}
+
 class OperatorAgent:
-    def __init__(self, name: str, llm, memory):
+    # The conversation the recommendation agent reads; replies from the other agents land here too
+    memory = SessionMemory("conversation")
+
+    def __init__(self, name: str, llm):
         self.name = name
 
-        self.llm = ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0.7,
-            openai_api_key=os.getenv("OPENAI_API_KEY"),
-        )
-        self.memory = ConversationBufferMemory(return_messages=True)
+        self.llm = llm if llm is not None else create_chat_llm(temperature=0.7, model="gpt-4o-mini")
+        self.intent_llm = CachedLLM(self.llm, site="intent")
 
         self.agent_registry = {
-            "recommendation_agent": RecommendationAgent(self.llm, self.memory),
+            "recommendation_agent": RecommendationAgent(self.llm),
             "order_query_agent": OrderQueryAgent(llm=self.llm),
             "order_placement_agent": OrderPlacementAgent(llm=self.llm),
             "fraudulent_transaction_agent": FraudulentTransactionAgent(llm=self.llm),
@@ -52,7 +63,14 @@ class OperatorAgent:
         self.agent_registry = registry
 
 
-    def determine_intent(self, message: str) -> List[str]:
+    async def determine_intent(self, message: str) -> List[str]:
+        # Keyword rules and the local model settle most messages without an LLM round trip
+        local = intent_classifier.classify(message)
+        if local is not None:
+            intents, tier = local
+            logging.info(f"Intents {intents} from {tier} for message: {message}")
+            return intents
+
         prompt = (
             f"Classify the user's message into one or more of the following intents: "
             f"book_recommendation, order_query, order_placement, "
@@ -69,9 +87,10 @@ class OperatorAgent:
         )
 
         try:
-            response = self.llm.invoke(prompt)
+            response = await asyncio.wait_for(self.intent_llm.ainvoke(prompt), timeout=settings.LLM_TIMEOUT)
             response_content = response.content if hasattr(response, 'content') else str(response)
             predicted_intents = [intent.strip().lower() for intent in response_content.split(",")]
+            intent_classifier.record(message, predicted_intents)
             return predicted_intents
         except Exception as e:
             logging.error(f"Error during intent determination: {e}")
@@ -80,7 +99,7 @@ class OperatorAgent:
 
 
     async def on_message(self, message: str) -> Dict:
-        intents = self.determine_intent(message)
+        intents = await self.determine_intent(message)
         
         book_keywords = ["book", "books", "horror", "fantasy", "romance", "sci-fi", "mystery", "thriller", "action", "adventure", "recommend", "suggest", "show me", "give me"]
         if not any(intent in intents for intent in ["book_recommendation"]):
@@ -107,21 +126,18 @@ class OperatorAgent:
             )
             return {"next_node": "END", "messages": [AIMessage(content=fallback_response)]}
 
+        # Each agent once, in the order its intent was given, so the merged reply doesn't depend on timing
+        agent_keys = list(dict.fromkeys(
+            intent_to_agent_map[intent] for intent in intents
+            if intent_to_agent_map.get(intent) in self.agent_registry
+        ))
+        agent_responses = await asyncio.gather(*[self.run_agent(key, message) for key in agent_keys])
+
         combined_responses = []
         response_set = set()
+        recommendations = None
 
-        for intent in intents:
-            agent_key = intent_to_agent_map.get(intent)
-            if not agent_key or agent_key not in self.agent_registry:
-                continue
-
-            agent = self.agent_registry[agent_key]
-
-            if asyncio.iscoroutinefunction(agent.on_message):
-                agent_response = await agent.on_message(message)
-            else:
-                agent_response = agent.on_message(message)
-
+        for agent_response in agent_responses:
             if "messages" in agent_response:
                 for msg in agent_response["messages"]:
                     if isinstance(msg, AIMessage) and msg.content not in response_set:
@@ -130,14 +146,35 @@ class OperatorAgent:
                     elif isinstance(msg, dict) and msg.get("content") and msg.get("content") not in response_set:
                         combined_responses.append(msg)
                         response_set.add(msg.get("content"))
-            
-            if "recommendations" in agent_response:
-                result = {"next_node": "END", "messages": combined_responses, "recommendations": agent_response["recommendations"]}
-                return result
 
-        curated_response = " ".join(msg["content"] for msg in combined_responses)
-        self.memory.chat_memory.add_message(HumanMessage(content=curated_response))
+            if "recommendations" in agent_response and recommendations is None:
+                recommendations = agent_response["recommendations"]
+
+        if recommendations is not None:
+            return {"next_node": "END", "messages": combined_responses, "recommendations": recommendations}
+
+        # Agents that keep the conversation (the recommendation agent) have recorded their replies already
+        recorded = {msg.content for msg in self.memory.chat_memory.messages[-2 * len(combined_responses) - 2:]}
+        for msg in combined_responses:
+            if msg["content"] not in recorded:
+                self.memory.chat_memory.add_message(AIMessage(content=msg["content"]))
         return {"next_node": "END", "messages": combined_responses}
 
+    async def run_agent(self, agent_key: str, message: str) -> Dict:
+        """One agent's reply, or an apology if it fails or misses AGENT_TIMEOUT; the other agents carry on."""
+        agent = self.agent_registry[agent_key]
+        try:
+            if asyncio.iscoroutinefunction(agent.on_message):
+                call = agent.on_message(message)
+            else:
+                call = asyncio.to_thread(agent.on_message, message)
+            return await asyncio.wait_for(call, timeout=settings.AGENT_TIMEOUT)
+        except asyncio.TimeoutError:
+            logging.warning(f"{agent_key} timed out after {settings.AGENT_TIMEOUT}s for message: {message}")
+        except Exception as e:
+            logging.error(f"{agent_key} failed: {e}")
+        task = AGENT_TASKS.get(agent_key, "handling part of your request")
+        return {"messages": [AIMessage(content=f"Sorry, I couldn't finish {task} just now. Please try again.")]}
+
     async def __call__(self, input: str) -> Dict:
         return await self.on_message(input)
@@ -8,13 +8,15 @@ from sqlalchemy.exc import SQLAlchemyError
 
 from app.database.database import SessionLocal
 from app.models.orders import Order
+from app.services.session_store import SessionField
 
 class OrderPlacementAgent:
+    state = SessionField("INIT")
+    order_data = SessionField(factory=dict)
+    cart_items = SessionField(factory=list)
+
     def __init__(self, llm):
         self.llm = llm
-        self.state = "INIT"
-        self.order_data = {}
-        self.cart_items = []
 
     async def process_order(self, user_input: Any = None):
         from app.database.database import SessionLocal
@@ -6,12 +6,14 @@ import re
 from typing import Dict, Any
 
 from app.models.orders import Order
+from app.services.session_store import SessionField
 
 class OrderQueryAgent:
+    state = SessionField("INIT")
+    user_id = SessionField(None)
+
     def __init__(self, llm):
         self.llm = llm
-        self.state = "INIT"
-        self.user_id = None
 
     async def on_message(self, user_input: str) -> Dict[str, Any]:
         """Handle messages from the operator agent"""
@@ -1,33 +1,39 @@
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.runnables import RunnablePassthrough
 from langchain_core.output_parsers import StrOutputParser
-from langchain.memory import ConversationBufferMemory
 from langchain.llms import OpenAI
 from langchain_core.messages import AIMessage
 import asyncio
 import logging
-import re
-import json
 from typing import List, Dict, Any
 
-def normalize_title(title: str) -> str:
-    return re.split(r":|–|-", title)[-1].strip()
-
-from app.services.graphql_service import graphql_service
+from app.services.graphql_service import graphql_service, PLACEHOLDER_IMAGE_URL
+from app.services.title_index import normalize_title
+from app.services.result_stream import emit
+from app.core.llm_cache import CachedLLM, parses_as_json
+from app.core.json_stream import iter_json_array
+from app.core.memory import conversation_memory
+from app.core.config import settings
+from app.services.session_store import SessionField, SessionMemory, current_session, session_store
 
 class RecommendationAgent:
-    def __init__(self, llm, memory):
+    # Conversation state lives in the chat session; the agent itself is shared
+    memory = SessionMemory("conversation")
+    recommendation_provided = SessionField(False)
+    ready_for_recommendations = SessionField(False)
+    recommended_books = SessionField(factory=set)
+    question_count = SessionField(0)
+    out_of_context_count = SessionField(0)
+    current_user_input = SessionField("")
+    genre_request_count = SessionField(factory=dict)
+    genre_cursors = SessionField(factory=dict)
+    last_recommended_genre = SessionField(None)
+    last_recommended_ids = SessionField(factory=list)
+    conversation_summary = SessionField(factory=dict)
+
+    def __init__(self, llm):
         self.llm = llm
-        self.memory = memory
-        self.recommendation_provided = False
-        self.ready_for_recommendations = False
-        self.recommended_books = set()
-        self.question_count = 0
         self.MIN_QUESTIONS = 4
-        self.out_of_context_count = 0
-        self.current_user_input = ""
-        self.genre_request_count = {}
-        self.last_recommended_genre = None
 
         self.conversation_prompt = ChatPromptTemplate.from_messages(
             [
@@ -76,17 +82,30 @@ class RecommendationAgent:
 
         self.conversation = (
             RunnablePassthrough.assign(
-                agent_scratchpad=lambda x: self.memory.chat_memory.messages
+                agent_scratchpad=lambda x: self.prompt_history()
             )
             | self.conversation_prompt
             | self.llm
             | StrOutputParser()
         )
 
+        # The exclusion list and history are part of the prompt, so a cached reply never repeats a shown book
         self.recommendation_chain = (
-            self.recommendation_prompt | self.llm | StrOutputParser()
+            self.recommendation_prompt
+            | CachedLLM(self.llm, site="chat_recommendations", validate=parses_as_json)
+            | StrOutputParser()
         )
 
+    def prompt_history(self) -> List:
+        """The conversation as it goes into a prompt: summary plus recent turns, within MEMORY_MAX_TOKENS."""
+        session_id = current_session().session_id
+
+        async def persist(apply) -> bool:
+            # The summary lands after this turn was saved; write it to the session as it is by then
+            return await session_store.update(session_id, lambda: apply(self.conversation_summary))
+
+        return conversation_memory.messages(self.memory.chat_memory.messages, self.conversation_summary, persist)
+
     async def chat(self, user_input: str):
         self.current_user_input = user_input
         
@@ -122,6 +141,13 @@ class RecommendationAgent:
             self.memory.chat_memory.add_ai_message(response)
             return {"type": "question", "response": response}
 
+        # "More like these" after a recommendation is answered from the vector index, no LLM call
+        if self.recommendation_provided and self.detect_refresh_request(user_input) and not self.detect_genre(user_input):
+            recommendations = await self.recommend_similar()
+            if recommendations:
+                self.memory.chat_memory.add_user_message(user_input)
+                return {"type": "recommendation", "response": recommendations}
+
         if self.ready_for_recommendations or self.check_readiness(user_input):
             self.memory.chat_memory.add_user_message(user_input)
             self.ready_for_recommendations = True
@@ -186,6 +212,55 @@ class RecommendationAgent:
         user_lower = user_input.lower()
         return any(keyword in user_lower for keyword in refresh_keywords)
 
+    def detect_genre(self, user_input: str):
+        genre_keywords = {
+            "horror": ["horror", "scary", "frightening", "spooky"],
+            "fantasy": ["fantasy", "magic", "dragon", "wizard"],
+            "romance": ["romance", "love", "romantic"],
+            "sci-fi": ["sci-fi", "science fiction", "space", "futuristic"],
+            "mystery": ["mystery", "detective", "crime"],
+            "thriller": ["thriller", "suspense", "action"],
+            "action": ["action", "adventure", "thriller"]
+        }
+        user_request = user_input.lower() if user_input else ""
+        for genre, keywords in genre_keywords.items():
+            if any(keyword in user_request for keyword in keywords):
+                return genre
+        return None
+
+    async def recommend_similar(self) -> List[Dict[str, Any]]:
+        if not self.last_recommended_ids:
+            return []
+        from app.services.recommendation_service import get_similar_books
+        try:
+            similar_books = await get_similar_books(self.last_recommended_ids, 24)
+        except Exception as e:
+            logging.error(f"Error in similar recommendations: {str(e)}")
+            return []
+
+        processed_books = []
+        for book in similar_books:
+            normalized_title = normalize_title(book["title"])
+            if normalized_title in self.recommended_books:
+                continue
+            processed_books.append({
+                "id": book["id"],
+                "title": book["title"],
+                "release_year": book.get("release_year"),
+                "image_url": book.get("image_url") or PLACEHOLDER_IMAGE_URL,
+                "rating": book.get("rating"),
+                "pages": book.get("pages"),
+                "ReasonForRecommendation": "Similar to books you were just shown",
+                "Price": book.get("price", "9.99"),
+            })
+            self.recommended_books.add(normalized_title)
+            if len(processed_books) >= 8:
+                break
+
+        if processed_books:
+            self.last_recommended_ids = [book["id"] for book in processed_books]
+        return processed_books
+
     def check_readiness(self, user_input: str) -> bool:
         # Check if user is directly requesting recommendations
         direct_request_keywords = [
@@ -234,14 +309,14 @@ class RecommendationAgent:
         if not self.ready_for_recommendations and not self.check_readiness(user_input):
             return []
 
-        chat_history = self.memory.chat_memory.messages
+        chat_history = self.prompt_history()
         conversation_summary = "\n".join(
             [f"{msg.type}: {msg.content}" for msg in chat_history]
         )
 
         try:
             previously_recommended = "\n".join(self.recommended_books)
-            response = await self.recommendation_chain.ainvoke(
+            stream = self.recommendation_chain.astream(
                 {
                     "input": f"""Based on this conversation: 
 
@@ -263,72 +338,76 @@ class RecommendationAgent:
                 }
             )
 
-            cleaned_response = response.strip().strip("```json").strip("```").strip()
-            recommendations = json.loads(cleaned_response)
+            async def resolve(rank: int, normalized_title: str):
+                return rank, await graphql_service.load_book_by_title(normalized_title)
 
-            if not isinstance(recommendations, list):
-                raise ValueError("Response is not a JSON array")
-
-            processed_books = []
-            for rec in recommendations:
-                normalized_title = normalize_title(rec["Title"])
-
-                if normalized_title in self.recommended_books:
-                    continue
-
-                book_details = await graphql_service.get_book_details_by_title_chatbot(
-                    normalized_title
-                )
-
-                if book_details:
-                    book = book_details[0]
-                    processed_book = {
-                        "title": book["title"],
-                        "release_year": book.get("release_year"),
-                        "image_url": (
-                            book["images"][0]["url"]
-                            if book.get("images")
-                            else (book["image"]["url"] if book.get("image") else None)
-                        ),
-                        "rating": book.get("rating"),
-                        "pages": book.get("pages"),
-                        "ReasonForRecommendation": rec["ReasonForRecommendation"],
-                        "Price": rec["Price"],
-                    }
-                    self.recommended_books.add(normalized_title)
-                    processed_books.append(processed_book)
-                else:
-                    continue
+            # Each recommendation goes to title resolution the moment its object is complete
+            # in the token stream; a reply cut short keeps the objects that completed
+            candidates = []
+            lookups = []
+            parsed = 0
+            try:
+                try:
+                    async for rec in iter_json_array(stream, settings.LLM_TIMEOUT):
+                        parsed += 1
+                        if not all(key in rec for key in ("Title", "ReasonForRecommendation", "Price")):
+                            continue
+                        normalized_title = normalize_title(str(rec["Title"]))
+                        if normalized_title not in self.recommended_books:
+                            lookups.append(asyncio.ensure_future(resolve(len(candidates), normalized_title)))
+                            candidates.append((rec, normalized_title))
+                except asyncio.TimeoutError:
+                    logging.warning(f"Chat recommendations timed out after {settings.LLM_TIMEOUT}s, keeping {parsed}")
+
+                if not parsed:
+                    raise ValueError("Response is not a JSON array")
+
+                # Books are emitted to streaming clients as they resolve and kept in the LLM's order
+                ranked_books = {}
+                for resolved in asyncio.as_completed(lookups):
+                    rank, book = await resolved
+                    rec, normalized_title = candidates[rank]
+                    if normalized_title in self.recommended_books:
+                        continue
+
+                    if book:
+                        processed_book = {
+                            "id": book.get("id"),
+                            "title": book["title"],
+                            "release_year": book.get("release_year"),
+                            "image_url": book.get("image_url"),
+                            "rating": book.get("rating"),
+                            "pages": book.get("pages"),
+                            "ReasonForRecommendation": rec["ReasonForRecommendation"],
+                            "Price": rec["Price"],
+                        }
+                        self.recommended_books.add(normalized_title)
+                        ranked_books[rank] = processed_book
+                        emit(processed_book)
+            finally:
+                # A failed or cancelled turn mustn't leave title lookups running, or errors unretrieved
+                for lookup in lookups:
+                    if not lookup.done():
+                        lookup.cancel()
+                    elif not lookup.cancelled():
+                        lookup.exception()
+
+            processed_books = [ranked_books[rank] for rank in sorted(ranked_books)]
 
             if len(processed_books) < 3:
                 from app.services.recommendation_service import get_trending_books, get_genre_specific_books
                 try:
-                    user_request = user_input.lower() if user_input else ""
-                    
-                    detected_genre = None
-                    genre_keywords = {
-                        "horror": ["horror", "scary", "frightening", "spooky"],
-                        "fantasy": ["fantasy", "magic", "dragon", "wizard"],
-                        "romance": ["romance", "love", "romantic"],
-                        "sci-fi": ["sci-fi", "science fiction", "space", "futuristic"],
-                        "mystery": ["mystery", "detective", "crime"],
-                        "thriller": ["thriller", "suspense", "action"],
-                        "action": ["action", "adventure", "thriller"]
-                    }
-                    
-                    for genre, keywords in genre_keywords.items():
-                        if any(keyword in user_request for keyword in keywords):
-                            detected_genre = genre
-                            break
+                    detected_genre = self.detect_genre(user_input)
                     
                     if detected_genre:
                         if detected_genre not in self.genre_request_count:
                             self.genre_request_count[detected_genre] = 0
-                        
-                        offset = self.genre_request_count[detected_genre] * 15
                         self.genre_request_count[detected_genre] += 1
-                        
-                        fallback_books = await get_genre_specific_books(detected_genre, 15, offset)
+
+                        # Each page continues where the last one stopped; an exhausted pool starts over
+                        fallback_books, self.genre_cursors[detected_genre] = await get_genre_specific_books(
+                            detected_genre, 15, self.genre_cursors.get(detected_genre)
+                        )
                         self.last_recommended_genre = detected_genre
                     else:
                         fallback_books = await get_trending_books()
@@ -339,21 +418,22 @@ class RecommendationAgent:
                         if len(processed_books) >= 12:
                             break
                         processed_book = {
+                            "id": book.get("id"),
                             "title": book.get("title", "Unknown Title"),
                             "author": book.get("author", "Unknown Author"),
                             "Price": book.get("price", "9.99"),
                             "ReasonForRecommendation": book.get("reason", self.get_recommendation_reason(detected_genre, book)),
                             "pages": book.get("pages", "N/A"),
                             "release_year": book.get("release_year", "N/A"),
-                            "image_url": book.get("image_url", "https://via.placeholder.com/100x150?text=No+Image"),
-                            "rating": book.get("rating", "N/A"),
-                            "description": book.get("description", "No description available.")
+                            "image_url": book.get("image_url") or PLACEHOLDER_IMAGE_URL,
+                            "rating": book.get("rating", "N/A")
                         }
                         processed_books.append(processed_book)
                         
                 except Exception as e:
                     logging.error(f"Error in fallback recommendation: {str(e)}")
 
+            self.last_recommended_ids = [book["id"] for book in processed_books if book.get("id")]
             return processed_books
         
         except Exception as e:
@@ -370,9 +450,8 @@ class RecommendationAgent:
                         "ReasonForRecommendation": "Popular book that matches your reading interests",
                         "pages": book.get("pages", "N/A"),
                         "release_year": book.get("release_year", "N/A"),
-                        "image_url": book.get("image_url", "https://via.placeholder.com/100x150?text=No+Image"),
-                        "rating": book.get("rating", "N/A"),
-                        "description": book.get("description", "No description available.")
+                        "image_url": book.get("image_url") or PLACEHOLDER_IMAGE_URL,
+                        "rating": book.get("rating", "N/A")
                     }
                     processed_books.append(processed_book)
                 return processed_books
@@ -397,9 +476,11 @@ class RecommendationAgent:
 
     def reset_state(self):
         self.memory.clear()
+        self.conversation_summary = {}
         self.recommendation_provided = False
         self.ready_for_recommendations = False
         self.recommended_books.clear()
+        self.last_recommended_ids = []
         self.question_count = 0
 
     async def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
@@ -0,0 +1,79 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+
+def preference_fingerprint(preferences: Dict) -> str:
+    """Stable hash of the stored preferences; any edit produces a new fingerprint."""
+    fields = {key: value for key, value in preferences.items() if key != "user_id"}
+    payload = json.dumps(fields, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RecommendationCache:
+    """
+    In-process LRU of personalized recommendation lists, one entry per user.
+
+    An entry only answers for the preference fingerprint it was built from, so
+    an edit saved through another worker still misses here; saving through
+    this process also drops the entry outright via ``invalidate``.
+    """
+
+    def __init__(self, ttl: float = 3600, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[str, float, List[Dict]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "invalidations": 0,
+            "evictions": 0,
+        }
+
+    def get(self, user_id: str, fingerprint: str) -> Optional[List[Dict]]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] != fingerprint or entry[1] <= time.time():
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self._counters["hits"] += 1
+            return [dict(book) for book in entry[2]]
+
+    def set(self, user_id: str, fingerprint: str, books: List[Dict]) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[user_id] = (fingerprint, time.time() + self.ttl, [dict(book) for book in books])
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            if self._entries.pop(user_id, None) is not None:
+                self._counters["invalidations"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            size = len(self._entries)
+        lookups = counters["hits"] + counters["misses"]
+        return {
+            **counters,
+            "size": size,
+            "hit_rate": round(counters["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+recommendation_cache = RecommendationCache(
+    ttl=settings.RECOMMENDATION_CACHE_TTL,
+    max_entries=settings.RECOMMENDATION_CACHE_MAX_ENTRIES,
+)
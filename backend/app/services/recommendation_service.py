@@ -1,40 +1,76 @@
 import logging
-import os
 import random
-import json
+import time
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from app.models.user import get_user_preferences
-from app.services.graphql_service import graphql_service
-from typing import List, Dict
-import re
-from dotenv import load_dotenv
+from app.core.config import settings
+from app.models.user import get_user_preferences, save_user_preferences
+from app.models.recommendations import get_fresh_recommendations, save_user_recommendations
+from app.services.graphql_service import graphql_service, PLACEHOLDER_IMAGE_URL
+from app.services.trending_snapshot import trending_snapshot
+from app.services.genre_pools import genre_pools
+from app.services.recommendation_cache import recommendation_cache, preference_fingerprint
+from app.services.content_recommender import content_recommender
+from app.services.vector_index import vector_index
+from app.services.result_stream import emit, stream_results
+from app.services.title_index import normalize_title
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+import asyncio
 from langchain.prompts import PromptTemplate
-from langchain.llms import OpenAI
+from app.core.llm import create_completion_llm
+from app.core.llm_cache import CachedLLM, parses_as_json
+from app.core.json_stream import iter_json_array
+from contextlib import aclosing
 
-dotenv_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '.env'))
-load_dotenv(dotenv_path)
-openai_api_key = os.getenv("OPENAI_API_KEY")
-llm = OpenAI(api_key=openai_api_key, temperature=0.7)
-
-def normalize_title(title: str) -> str:
-    return re.split(r':|–|-', title)[-1].strip()
+llm = CachedLLM(create_completion_llm(temperature=0.7), site="initial_recommendations", validate=parses_as_json)
 
 def generate_random_price():
     return round(random.uniform(9.99, 29.99), 2)
 
 
-def generate_llm_recommendations(preferences: dict) -> List[Dict]:
+# What a list view needs to render a book card; the description is fetched per book on demand
+CARD_FIELDS = ("id", "title", "release_year", "release_date", "image_url", "rating", "pages")
+
+
+def to_book_card(book: Dict, **extra) -> Dict:
+    card = {field: book.get(field) for field in CARD_FIELDS}
+    card["image_url"] = card["image_url"] or PLACEHOLDER_IMAGE_URL
+    card["price"] = generate_random_price()
+    card.update(extra)
+    return card
+
+
+async def attach_descriptions(books: List[Dict]) -> List[Dict]:
+    """Upgrade cards to the full view by merging in each book's description and headline."""
+    details = await asyncio.gather(*(
+        graphql_service.get_book_detail(book["id"]) if book.get("id") else asyncio.sleep(0)
+        for book in books
+    ))
+    for book, detail in zip(books, details):
+        detail = detail or {}
+        book["description"] = detail.get("description") or "No description available."
+        book["headline"] = detail.get("headline")
+    return books
+
+
+async def stream_llm_recommendations(preferences: dict, shortlist: List[str] = None) -> AsyncIterator[Dict]:
+    """
+    Validated ``{"title", "author"}`` picks, each yielded as soon as its JSON
+    object is complete in the token stream. A reply cut short (bad JSON
+    further on, or the timeout) keeps the picks that completed; only a reply
+    with none is retried.
+    """
     favorite_books = preferences.get("favorite_books", [])
     favorite_authors = preferences.get("favorite_authors", [])
     preferred_genres = preferences.get("preferred_genres", [])
 
     prompt_template = PromptTemplate(
-        input_variables=["favorite_books", "favorite_authors", "preferred_genres"],
+        input_variables=["favorite_books", "favorite_authors", "preferred_genres", "shortlist"],
         template="""You are a book recommendation system. Based on these preferences:
         - Favorite Books: {favorite_books}
         - Favorite Authors: {favorite_authors}
         - Preferred Genres: {preferred_genres}
+        {shortlist}
 
         Return ONLY a valid JSON object containing 20 book recommendations in exactly this format:
         {{
@@ -53,49 +89,136 @@ def generate_llm_recommendations(preferences: dict) -> List[Dict]:
         4. All brackets and braces must be properly closed"""
     )
 
+    prompt = prompt_template.format(
+        favorite_books=", ".join(favorite_books) if favorite_books else "various books",
+        favorite_authors=", ".join(favorite_authors) if favorite_authors else "various authors",
+        preferred_genres=", ".join(preferred_genres) if preferred_genres else "various genres",
+        shortlist=f"- Good matches in our catalog (prefer these when they fit): {', '.join(shortlist)}"
+        if shortlist else ""
+    )
+
     max_retries = 3
     for attempt in range(max_retries):
+        validated = 0
         try:
-            generated_response = llm.invoke(
-                prompt_template.format(
-                    favorite_books=", ".join(favorite_books) if favorite_books else "various books",
-                    favorite_authors=", ".join(favorite_authors) if favorite_authors else "various authors",
-                    preferred_genres=", ".join(preferred_genres) if preferred_genres else "various genres"
-                )
-            )
+            # Streamed, so a slow completion never blocks other requests on the event loop
+            async with aclosing(iter_json_array(llm.astream(prompt), settings.LLM_TIMEOUT)) as recommendations:
+                async for rec in recommendations:
+                    # Extra picks are read but not used, so the reply still reaches the cache whole
+                    if validated < 20 and isinstance(rec.get("title"), str) and isinstance(rec.get("author"), str):
+                        yield {
+                            "title": rec["title"].strip(),
+                            "author": rec["author"].strip()
+                        }
+                        validated += 1
 
-            # Clean up the response
-            cleaned_response = generated_response.strip()
-
-            # Parse the JSON
-            recommendations_data = json.loads(cleaned_response)
-            recommendations = recommendations_data.get("recommendations", [])
-
-            validated_recommendations = []
-            for rec in recommendations:
-                if all(key in rec for key in ["title", "author"]):
-                    cleaned_rec = {
-                        "title": rec["title"].strip(),
-                        "author": rec["author"].strip()
-                    }
-                    validated_recommendations.append(cleaned_rec)
-
-            if len(validated_recommendations) == 8:
-                return validated_recommendations
-
-            continue
-
-        except json.JSONDecodeError:
-            continue
+        except asyncio.TimeoutError:
+            # A retry would most likely time out too; keep what arrived or let the caller fall back
+            logging.warning(f"LLM recommendations timed out after {settings.LLM_TIMEOUT}s")
+            if validated:
+                return
+            break
         except Exception:
-            continue
+            pass
+
+        if validated:
+            return
 
     raise HTTPException(
         status_code=500,
         detail="Unable to generate valid recommendations after multiple attempts. Please try again."
     )
 
-async def get_recommendations(user_id: str, db: Session) -> List[Dict]:
+
+async def generate_llm_recommendations(preferences: dict, shortlist: List[str] = None) -> List[Dict]:
+    return [rec async for rec in stream_llm_recommendations(preferences, shortlist)]
+
+async def build_llm_recommendations(preferences: dict, shortlist: List[str] = None) -> List[Dict]:
+    """LLM picks resolved to book cards, in the order the LLM returned them."""
+    async def resolve(book: Dict) -> Optional[Dict]:
+        b = await graphql_service.load_book_by_title(normalize_title(book['title']), book['author'])
+        if not b:
+            return None
+        card = to_book_card(b, author=book["author"])
+        # Streaming clients get each card as soon as it resolves (cache and mirror hits first)
+        emit(card)
+        return card
+
+    # Each title goes to resolution the moment its object is complete in the LLM stream;
+    # titles arriving together still share one batched query, and the Hardcover client's
+    # adaptive limiter caps how many of those queries run at once
+    lookups = [asyncio.ensure_future(resolve(book))
+               async for book in stream_llm_recommendations(preferences, shortlist)]
+    return [card for card in await asyncio.gather(*lookups) if card]
+
+
+async def build_local_recommendations(preferences: dict, limit: int = 20) -> List[Dict]:
+    """Catalog similarity only; no LLM call, so it also works while OpenAI is slow or down."""
+    await content_recommender.ensure_built()
+    # Scoring a large catalog takes milliseconds of CPU; keep it off the event loop
+    books = await asyncio.to_thread(content_recommender.recommend, preferences, limit)
+    return [to_book_card(book, author=book.get("author") or "Unknown Author") for book in books]
+
+
+async def build_recommendations(preferences: dict) -> List[Dict]:
+    """Personalized cards according to RECOMMENDER_MODE; empty when nothing could be built."""
+    mode = settings.RECOMMENDER_MODE
+    local_books = []
+    if mode in ("local", "hybrid"):
+        local_books = await build_local_recommendations(preferences)
+        if mode == "local":
+            return local_books
+
+    try:
+        # In hybrid mode the local ranking pre-selects candidates for the LLM
+        shortlist = [book["title"] for book in local_books[:30]]
+        llm_books = await build_llm_recommendations(preferences, shortlist)
+    except Exception:
+        if not local_books:
+            raise
+        llm_books = []
+    return llm_books or local_books
+
+
+def save_preferences(user_id: str, preferences: dict, db: Session) -> None:
+    """Store a user's preferences and drop the recommendations built from the old ones."""
+    save_user_preferences(user_id, preferences, db)
+    recommendation_cache.invalidate(user_id)
+
+
+async def get_recommendations(user_id: str, db: Session, view: str = "card") -> List[Dict]:
+    books = await get_recommendation_cards(user_id, db)
+    if view == "full":
+        await attach_descriptions(books)
+    return books
+
+
+async def stream_recommendations(user_id: str, db: Session) -> AsyncIterator[Dict]:
+    """
+    Events for the streaming endpoint: a ``book`` event per card as soon as it
+    resolves, then ``done`` with the final order. Cached lists arrive in one go.
+    """
+    started = time.monotonic()
+    sent = set()
+    try:
+        async for kind, value in stream_results(get_recommendation_cards(user_id, db)):
+            for book in ([value] if kind == "item" else value):
+                key = book.get("id") or book.get("title")
+                if key not in sent:
+                    sent.add(key)
+                    yield {"type": "book", "book": book}
+        yield {
+            "type": "done",
+            "count": len(value),
+            "ids": [book.get("id") for book in value],
+            "elapsed_ms": round((time.monotonic() - started) * 1000)
+        }
+    except Exception as e:
+        logging.error(f"Error streaming recommendations: {str(e)}")
+        yield {"type": "error", "detail": "Unable to generate recommendations"}
+
+
+async def get_recommendation_cards(user_id: str, db: Session) -> List[Dict]:
     user_preferences = get_user_preferences(user_id, db)
 
     if not user_preferences:
@@ -104,73 +227,34 @@ async def get_recommendations(user_id: str, db: Session) -> List[Dict]:
         
         try:
             random_books = await graphql_service.get_book_details_by_ids(random_ids)
-            processed_books = []
-            for book in random_books:
-                processed_book = {
-                    "id": book.get("id"),
-                    "title": book["title"],
-                    "release_year": book.get("release_year"),
-                    "release_date": book.get("release_date"),
-                    "image_url": book.get("image_url", "data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMzAwIiBoZWlnaHQ9IjQwMCIgdmlld0JveD0iMCAwIDMwMCA0MDAiIGZpbGw9Im5vbmUiIHhtbG5zPSJodHRwOi8vd3d3LnczLm9yZy8yMDAwL3N2ZyI+CiAgPGRlZnM+CiAgICA8bGluZWFyR3JhZGllbnQgaWQ9ImJnR3JhZGllbnQiIHgxPSIwJSIgeTE9IjAlIiB4Mj0iMTAwJSIgeTI9IjEwMCUiPgogICAgICA8c3RvcCBvZmZzZXQ9IjAlIiBzdHlsZT0ic3RvcC1jb2xvcjojNjY2Njk5O3N0b3Atb3BhY2l0eToxIiAvPgogICAgICA8c3RvcCBvZmZzZXQ9IjEwMCUiIHN0eWxlPSJzdG9wLWNvbG9yOiM5OTk5Y2M7c3RvcC1vcGFjaXR5OjEiIC8+CiAgICA8L2xpbmVhckdyYWRpZW50PgogICAgPGxpbmVhckdyYWRpZW50IGlkPSJib29rR3JhZGllbnQiIHgxPSIwJSIgeTE9IjAlIiB4Mj0iMTAwJSIgeTI9IjEwMCUiPgogICAgICA8c3RvcCBvZmZzZXQ9IjAlIiBzdHlsZT0ic3RvcC1jb2xvcjojNDA0NjhiO3N0b3Atb3BhY2l0eToxIiAvPgogICAgICA8c3RvcCBvZmZzZXQ9IjEwMCUiIHN0eWxlPSJzdG9wLWNvbG9yOiM2MjY2OWY7c3RvcC1vcGFjaXR5OjEiIC8+CiAgICA8L2xpbmVhckdyYWRpZW50PgogICAgPGZpbHRlciBpZD0iZHJvcFNoYWRvdyI+CiAgICAgIDxmZU9mZnNldCBkeD0iMyIgZHk9IjMiLz4KICAgICAgPGZlR2F1c3NpYW5CbHVyIHN0ZERldmlhdGlvbj0iMyIvPgogICAgICA8ZmVGbG9vZCBmbG9vZC1jb2xvcj0iIzAwMDAwMCIgZmxvb2Qtb3BhY2l0eT0iMC4zIi8+CiAgICAgIDxmZUNvbXBvc2l0ZSBvcGVyYXRvcj0ib3ZlciIvPgogICAgPC9maWx0ZXI+CiAgPC9kZWZzPgogIDxyZWN0IHdpZHRoPSIzMDAiIGhlaWdodD0iNDAwIiBmaWxsPSJ1cmwoI2JnR3JhZGllbnQpIi8+CiAgPGcgdHJhbnNmb3JtPSJ0cmFuc2xhdGUoNzUsIDgwKSI+CiAgICA8IS0tIEJvb2sgQ292ZXIgLS0+CiAgICA8cmVjdCB4PSIwIiB5PSIwIiB3aWR0aD0iMTUwIiBoZWlnaHQ9IjI0MCIgZmlsbD0idXJsKCNib29rR3JhZGllbnQpIiByeD0iMTAiIGZpbHRlcj0idXJsKCNkcm9wU2hhZG93KSIvPgogICAgPCEtLSBCb29rIFNwaW5lIC0tPgogICAgPHJlY3QgeD0iNSIgeT0iMCIgd2lkdGg9IjEwIiBoZWlnaHQ9IjI0MCIgZmlsbD0iIzJkMzc0OCIgcng9IjIiLz4KICAgIDwhLS0gQm9vayBQYWdlcyAtLT4KICAgIDxyZWN0IHg9IjE1IiB5PSI4IiB3aWR0aD0iMTI1IiBoZWlnaHQ9IjIyNCIgZmlsbD0iI2Y4ZjlmYSIgcng9IjUiLz4KICAgIDwhLS0gVGV4dCBMaW5lcyAtLT4KICAgIDxyZWN0IHg9IjI1IiB5PSIzMCIgd2lkdGg9IjEwNSIgaGVpZ2h0PSI0IiBmaWxsPSIjZTBlNmVkIiByeD0iMiIvPgogICAgPHJlY3QgeD0iMjUiIHk9IjQ1IiB3aWR0aD0iODAiIGhlaWdodD0iNCIgZmlsbD0iI2UwZTZlZCIgcng9IjIiLz4KICAgIDxyZWN0IHg9IjI1IiB5PSI2MCIgd2lkdGg9Ijk1IiBoZWlnaHQ9IjQiIGZpbGw9IiNlMGU2ZWQiIHJ4PSIyIi8+CiAgICA8cmVjdCB4PSIyNSIgeT0iNzUiIHdpZHRoPSI3MCIgaGVpZ2h0PSI0IiBmaWxsPSIjZTBlNmVkIiByeD0iMiIvPgogICAgPHJlY3QgeD0iMjUiIHk9IjkwIiB3aWR0aD0iMTAwIiBoZWlnaHQ9IjQiIGZpbGw9IiNlMGU2ZWQiIHJ4PSIyIi8+CiAgICA8IS0tIEJvb2sgSWNvbiAtLT4KICAgIDxjaXJjbGUgY3g9Ijc1IiBjeT0iMTYwIiByPSIyNSIgZmlsbD0iIzQwNDY4YiIgb3BhY2l0eT0iMC4xIi8+CiAgICA8dGV4dCB4PSI3NSIgeT0iMTcwIiBmb250LWZhbWlseT0iU2Vnb2UgVUksIEFyaWFsLCBzYW5zLXNlcmlmIiBmb250LXNpemU9IjMwIiBmaWxsPSIjNDA0NjhiIiB0ZXh0LWFuY2hvcj0ibWlkZGxlIj7wn5OWPC90ZXh0PgogIDwvZz4KPC9zdmc+"),
-                    "rating": book.get("rating"),
-                    "pages": book.get("pages"),
-                    "description": book.get("description", "No description available."),
-                    "price": generate_random_price()
-                }
-                processed_books.append(processed_book)
+            processed_books = [to_book_card(book) for book in random_books]
             
             return processed_books
         except Exception:
             return []
-    
-    try:
-        recommended_books = generate_llm_recommendations(user_preferences)
-        if not recommended_books:
-            import random
-            random_ids = random.sample(range(1, 2000), 20)
-            random_books = await graphql_service.get_book_details_by_ids(random_ids)
-            
-            processed_books = []
-            for book in random_books:
-                processed_book = {
-                    "id": book.get("id"),
-                    "title": book["title"],
-                    "release_year": book.get("release_year"),
-                    "release_date": book.get("release_date"),
-                    "image_url": book.get("image_url", "data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMzAwIiBoZWlnaHQ9IjQwMCIgdmlld0JveD0iMCAwIDMwMCA0MDAiIGZpbGw9Im5vbmUiIHhtbG5zPSJodHRwOi8vd3d3LnczLm9yZy8yMDAwL3N2ZyI+CiAgPGRlZnM+CiAgICA8bGluZWFyR3JhZGllbnQgaWQ9ImJnR3JhZGllbnQiIHgxPSIwJSIgeTE9IjAlIiB4Mj0iMTAwJSIgeTI9IjEwMCUiPgogICAgICA8c3RvcCBvZmZzZXQ9IjAlIiBzdHlsZT0ic3RvcC1jb2xvcjojNjY2Njk5O3N0b3Atb3BhY2l0eToxIiAvPgogICAgICA8c3RvcCBvZmZzZXQ9IjEwMCUiIHN0eWxlPSJzdG9wLWNvbG9yOiM5OTk5Y2M7c3RvcC1vcGFjaXR5OjEiIC8+CiAgICA8L2xpbmVhckdyYWRpZW50PgogICAgPGxpbmVhckdyYWRpZW50IGlkPSJib29rR3JhZGllbnQiIHgxPSIwJSIgeTE9IjAlIiB4Mj0iMTAwJSIgeTI9IjEwMCUiPgogICAgICA8c3RvcCBvZmZzZXQ9IjAlIiBzdHlsZT0ic3RvcC1jb2xvcjojNDA0NjhiO3N0b3Atb3BhY2l0eToxIiAvPgogICAgICA8c3RvcCBvZmZzZXQ9IjEwMCUiIHN0eWxlPSJzdG9wLWNvbG9yOiM2MjY2OWY7c3RvcC1vcGFjaXR5OjEiIC8+CiAgICA8L2xpbmVhckdyYWRpZW50PgogICAgPGZpbHRlciBpZD0iZHJvcFNoYWRvdyI+CiAgICAgIDxmZU9mZnNldCBkeD0iMyIgZHk9IjMiLz4KICAgICAgPGZlR2F1c3NpYW5CbHVyIHN0ZERldmlhdGlvbj0iMyIvPgogICAgICA8ZmVGbG9vZCBmbG9vZC1jb2xvcj0iIzAwMDAwMCIgZmxvb2Qtb3BhY2l0eT0iMC4zIi8+CiAgICAgIDxmZUNvbXBvc2l0ZSBvcGVyYXRvcj0ib3ZlciIvPgogICAgPC9maWx0ZXI+CiAgPC9kZWZzPgogIDxyZWN0IHdpZHRoPSIzMDAiIGhlaWdodD0iNDAwIiBmaWxsPSJ1cmwoI2JnR3JhZGllbnQpIi8+CiAgPGcgdHJhbnNmb3JtPSJ0cmFuc2xhdGUoNzUsIDgwKSI+CiAgICA8IS0tIEJvb2sgQ292ZXIgLS0+CiAgICA8cmVjdCB4PSIwIiB5PSIwIiB3aWR0aD0iMTUwIiBoZWlnaHQ9IjI0MCIgZmlsbD0idXJsKCNib29rR3JhZGllbnQpIiByeD0iMTAiIGZpbHRlcj0idXJsKCNkcm9wU2hhZG93KSIvPgogICAgPCEtLSBCb29rIFNwaW5lIC0tPgogICAgPHJlY3QgeD0iNSIgeT0iMCIgd2lkdGg9IjEwIiBoZWlnaHQ9IjI0MCIgZmlsbD0iIzJkMzc0OCIgcng9IjIiLz4KICAgIDwhLS0gQm9vayBQYWdlcyAtLT4KICAgIDxyZWN0IHg9IjE1IiB5PSI4IiB3aWR0aD0iMTI1IiBoZWlnaHQ9IjIyNCIgZmlsbD0iI2Y4ZjlmYSIgcng9IjUiLz4KICAgIDwhLS0gVGV4dCBMaW5lcyAtLT4KICAgIDxyZWN0IHg9IjI1IiB5PSIzMCIgd2lkdGg9IjEwNSIgaGVpZ2h0PSI0IiBmaWxsPSIjZTBlNmVkIiByeD0iMiIvPgogICAgPHJlY3QgeD0iMjUiIHk9IjQ1IiB3aWR0aD0iODAiIGhlaWdodD0iNCIgZmlsbD0iI2UwZTZlZCIgcng9IjIiLz4KICAgIDxyZWN0IHg9IjI1IiB5PSI2MCIgd2lkdGg9Ijk1IiBoZWlnaHQ9IjQiIGZpbGw9IiNlMGU2ZWQiIHJ4PSIyIi8+CiAgICA8cmVjdCB4PSIyNSIgeT0iNzUiIHdpZHRoPSI3MCIgaGVpZ2h0PSI0IiBmaWxsPSIjZTBlNmVkIiByeD0iMiIvPgogICAgPHJlY3QgeD0iMjUiIHk9IjkwIiB3aWR0aD0iMTAwIiBoZWlnaHQ9IjQiIGZpbGw9IiNlMGU2ZWQiIHJ4PSIyIi8+CiAgICA8IS0tIEJvb2sgSWNvbiAtLT4KICAgIDxjaXJjbGUgY3g9Ijc1IiBjeT0iMTYwIiByPSIyNSIgZmlsbD0iIzQwNDY4YiIgb3BhY2l0eT0iMC4xIi8+CiAgICA8dGV4dCB4PSI3NSIgeT0iMTcwIiBmb250LWZhbWlseT0iU2Vnb2UgVUksIEFyaWFsLCBzYW5zLXNlcmlmIiBmb250LXNpemU9IjMwIiBmaWxsPSIjNDA0NjhiIiB0ZXh0LWFuY2hvcj0ibWlkZGxlIj7wn5OWPC90ZXh0PgogIDwvZz4KPC9zdmc+"),
-                    "rating": book.get("rating"),
-                    "pages": book.get("pages"),
-                    "description": book.get("description", "No description available."),
-                    "price": generate_random_price()
-                }
-                processed_books.append(processed_book)
-            
-            return processed_books
 
-        processed_books = []
-        
-        for book in recommended_books:
+    # Unchanged preferences get the same list back without another LLM call
+    fingerprint = preference_fingerprint(user_preferences)
+    cached_books = recommendation_cache.get(user_id, fingerprint)
+    if cached_books is not None:
+        return cached_books
+
+    # Then a list written by the precompute job (or another worker) for the same preferences
+    stored_books = get_fresh_recommendations(
+        user_id, fingerprint, db, settings.PRECOMPUTED_RECOMMENDATIONS_MAX_AGE
+    )
+    if stored_books:
+        recommendation_cache.set(user_id, fingerprint, stored_books)
+        return stored_books
+
+    try:
+        processed_books = await build_recommendations(user_preferences)
+        if processed_books:
+            recommendation_cache.set(user_id, fingerprint, processed_books)
             try:
-                normalized_title = normalize_title(book['title'])
-                book_details = await graphql_service.get_book_details_by_titles(normalized_title)
-                if book_details:
-                    b = book_details[0]
-                    processed_book = {
-                        "title": b["title"],
-                        "release_year": b.get("release_year"),
-                        "image_url": b.get("image_url", "data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMzAwIiBoZWlnaHQ9IjQwMCIgdmlld0JveD0iMCAwIDMwMCA0MDAiIGZpbGw9Im5vbmUiIHhtbG5zPSJodHRwOi8vd3d3LnczLm9yZy8yMDAwL3N2ZyI+CiAgPGRlZnM+CiAgICA8bGluZWFyR3JhZGllbnQgaWQ9ImJnR3JhZGllbnQiIHgxPSIwJSIgeTE9IjAlIiB4Mj0iMTAwJSIgeTI9IjEwMCUiPgogICAgICA8c3RvcCBvZmZzZXQ9IjAlIiBzdHlsZT0ic3RvcC1jb2xvcjojNjY2Njk5O3N0b3Atb3BhY2l0eToxIiAvPgogICAgICA8c3RvcCBvZmZzZXQ9IjEwMCUiIHN0eWxlPSJzdG9wLWNvbG9yOiM5OTk5Y2M7c3RvcC1vcGFjaXR5OjEiIC8+CiAgICA8L2xpbmVhckdyYWRpZW50PgogICAgPGxpbmVhckdyYWRpZW50IGlkPSJib29rR3JhZGllbnQiIHgxPSIwJSIgeTE9IjAlIiB4Mj0iMTAwJSIgeTI9IjEwMCUiPgogICAgICA8c3RvcCBvZmZzZXQ9IjAlIiBzdHlsZT0ic3RvcC1jb2xvcjojNDA0NjhiO3N0b3Atb3BhY2l0eToxIiAvPgogICAgICA8c3RvcCBvZmZzZXQ9IjEwMCUiIHN0eWxlPSJzdG9wLWNvbG9yOiM2MjY2OWY7c3RvcC1vcGFjaXR5OjEiIC9+CiAgICA8L2xpbmVhckdyYWRpZW50PgogICAgPGZpbHRlciBpZD0iZHJvcFNoYWRvdyI+CiAgICAgIDxmZU9mZnNldCBkeD0iMyIgZHk9IjMiLz4KICAgICAgPGZlR2F1c3NpYW5CbHVyIHN0ZERldmlhdGlvbj0iMyIvPgogICAgICA8ZmVGbG9vZCBmbG9vZC1jb2xvcj0iIzAwMDAwMCIgZmxvb2Qtb3BhY2l0eT0iMC4zIi8+CiAgICAgIDxmZUNvbXBvc2l0ZSBvcGVyYXRvcj0ib3ZlciIvPgogICAgPC9maWx0ZXI+CiAgPC9kZWZzPgogIDxyZWN0IHdpZHRoPSIzMDAiIGhlaWdodD0iNDAwIiBmaWxsPSJ1cmwoI2JnR3JhZGllbnQpIi8+CiAgPGcgdHJhbnNmb3JtPSJ0cmFuc2xhdGUoNzUsIDgwKSI+CiAgICA8IS0tIEJvb2sgQ292ZXIgLS0+CiAgICA8cmVjdCB4PSIwIiB5PSIwIiB3aWR0aD0iMTUwIiBoZWlnaHQ9IjI0MCIgZmlsbD0idXJsKCNib29rR3JhZGllbnQpIiByeD0iMTAiIGZpbHRlcj0idXJsKCNkcm9wU2hhZG93KSIvPgogICAgPCEtLSBCb29rIFNwaW5lIC0tPgogICAgPHJlY3QgeD0iNSIgeT0iMCIgd2lkdGg9IjEwIiBoZWlnaHQ9IjI0MCIgZmlsbD0iIzJkMzc0OCIgcng9IjIiLz4KICAgIDwhLS0gQm9vayBQYWdlcyAtLT4KICAgIDxyZWN0IHg9IjE1IiB5PSI4IiB3aWR0aD0iMTI1IiBoZWlnaHQ9IjIyNCIgZmlsbD0iI2Y4ZjlmYSIgcng9IjUiLz4KICAgIDwhLS0gVGV4dCBMaW5lcyAtLT4KICAgIDxyZWN0IHg9IjI1IiB5PSIzMCIgd2lkdGg9IjEwNSIgaGVpZ2h0PSI0IiBmaWxsPSIjZTBlNmVkIiByeD0iMiIvPgogICAgPHJlY3QgeD0iMjUiIHk9IjQ1IiB3aWR0aD0iODAiIGhlaWdodD0iNCIgZmlsbD0iI2UwZTZlZCIgcng9IjIiLz4KICAgIDxyZWN0IHg9IjI1IiB5PSI2MCIgd2lkdGg9Ijk1IiBoZWlnaHQ9IjQiIGZpbGw9IiNlMGU2ZWQiIHJ4PSIyIi8+CiAgICA8cmVjdCB4PSIyNSIgeT0iNzUiIHdpZHRoPSI3MCIgaGVpZ2h0PSI0IiBmaWxsPSIjZTBlNmVkIiByeD0iMiIvPgogICAgPHJlY3QgeD0iMjUiIHk9IjkwIiB3aWR0aD0iMTAwIiBoZWlnaHQ9IjQiIGZpbGw9IiNlMGU2ZWQiIHJ4PSIyIi8+CiAgICA8IS0tIEJvb2sgSWNvbiAtLT4KICAgIDxjaXJjbGUgY3g9Ijc1IiBjeT0iMTYwIiByPSIyNSIgZmlsbD0iIzQwNDY4YiIgb3BhY2l0eT0iMC4xIi8+CiAgICA8dGV4dCB4PSI3NSIgeT0iMTcwIiBmb250LWZhbWlseT0iU2Vnb2UgVUksIEFyaWFsLCBzYW5zLXNlcmlmIiBmb250LXNpemU9IjMwIiBmaWxsPSIjNDA0NjhiIiB0ZXh0LWFuY2hvcj0ibWlkZGxlIj7wn5OWPC90ZXh0PgogIDwvZz4KPC9zdmc+"),
-                        "rating": b.get("rating"),
-                        "pages": b.get("pages"),
-                        "author": book["author"],
-                        "price": generate_random_price(),
-                        "description": b.get("description"),
-                        "headline": b.get("headline")
-                    }
-                    processed_books.append(processed_book)
+                save_user_recommendations(user_id, fingerprint, processed_books, db)
             except Exception:
-                continue
-        
-        if processed_books:
+                pass
             return processed_books
             
     except Exception:
@@ -180,36 +264,16 @@ async def get_recommendations(user_id: str, db: Session) -> List[Dict]:
     random_ids = random.sample(range(1, 2000), 20)
     try:
         random_books = await graphql_service.get_book_details_by_ids(random_ids)
-        processed_books = []
-        for book in random_books:
-            processed_book = {
-                "id": book.get("id"),
-                "title": book["title"],
-                "release_year": book.get("release_year"),
-                "release_date": book.get("release_date"),
-                "image_url": book.get("image_url", "data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMzAwIiBoZWlnaHQ9IjQwMCIgdmlld0JveD0iMCAwIDMwMCA0MDAiIGZpbGw9Im5vbmUiIHhtbG5zPSJodHRwOi8vd3d3LnczLm9yZy8yMDAwL3N2ZyI+CiAgPGRlZnM+CiAgICA8bGluZWFyR3JhZGllbnQgaWQ9ImJnR3JhZGllbnQiIHgxPSIwJSIgeTE9IjAlIiB4Mj0iMTAwJSIgeTI9IjEwMCUiPgogICAgICA8c3RvcCBvZmZzZXQ9IjAlIiBzdHlsZT0ic3RvcC1jb2xvcjojNjY2Njk5O3N0b3Atb3BhY2l0eToxIiAvPgogICAgICA8c3RvcCBvZmZzZXQ9IjEwMCUiIHN0eWxlPSJzdG9wLWNvbG9yOiM5OTk5Y2M7c3RvcC1vcGFjaXR5OjEiIC8+CiAgICA8L2xpbmVhckdyYWRpZW50PgogICAgPGxpbmVhckdyYWRpZW50IGlkPSJib29rR3JhZGllbnQiIHgxPSIwJSIgeTE9IjAlIiB4Mj0iMTAwJSIgeTI9IjEwMCUiPgogICAgICA8c3RvcCBvZmZzZXQ9IjAlIiBzdHlsZT0ic3RvcC1jb2xvcjojNDA0NjhiO3N0b3Atb3BhY2l0eToxIiAvPgogICAgICA8c3RvcCBvZmZzZXQ9IjEwMCUiIHN0eWxlPSJzdG9wLWNvbG9yOiM2MjY2OWY7c3RvcC1vcGFjaXR5OjEiIC8+CiAgICA8L2xpbmVhckdyYWRpZW50PgogICAgPGZpbHRlciBpZD0iZHJvcFNoYWRvdyI+CiAgICAgIDxmZU9mZnNldCBkeD0iMyIgZHk9IjMiLz4KICAgICAgPGZlR2F1c3NpYW5CbHVyIHN0ZERldmlhdGlvbj0iMyIvPgogICAgICA8ZmVGbG9vZCBmbG9vZC1jb2xvcj0iIzAwMDAwMCIgZmxvb2Qtb3BhY2l0eT0iMC4zIi8+CiAgICAgIDxmZUNvbXBvc2l0ZSBvcGVyYXRvcj0ib3ZlciIvPgogICAgPC9maWx0ZXI+CiAgPC9kZWZzPgogIDxyZWN0IHdpZHRoPSIzMDAiIGhlaWdodD0iNDAwIiBmaWxsPSJ1cmwoI2JnR3JhZGllbnQpIi8+CiAgPGcgdHJhbnNmb3JtPSJ0cmFuc2xhdGUoNzUsIDgwKSI+CiAgICA8IS0tIEJvb2sgQ292ZXIgLS0+CiAgICA8cmVjdCB4PSIwIiB5PSIwIiB3aWR0aD0iMTUwIiBoZWlnaHQ9IjI0MCIgZmlsbD0idXJsKCNib29rR3JhZGllbnQpIiByeD0iMTAiIGZpbHRlcj0idXJsKCNkcm9wU2hhZG93KSIvPgogICAgPCEtLSBCb29rIFNwaW5lIC0tPgogICAgPHJlY3QgeD0iNSIgeT0iMCIgd2lkdGg9IjEwIiBoZWlnaHQ9IjI0MCIgZmlsbD0iIzJkMzc0OCIgcng9IjIiLz4KICAgIDwhLS0gQm9vayBQYWdlcyAtLT4KICAgIDxyZWN0IHg9IjE1IiB5PSI4IiB3aWR0aD0iMTI1IiBoZWlnaHQ9IjIyNCIgZmlsbD0iI2Y4ZjlmYSIgcng9IjUiLz4KICAgIDwhLS0gVGV4dCBMaW5lcyAtLT4KICAgIDxyZWN0IHg9IjI1IiB5PSIzMCIgd2lkdGg9IjEwNSIgaGVpZ2h0PSI0IiBmaWxsPSIjZTBlNmVkIiByeD0iMiIvPgogICAgPHJlY3QgeD0iMjUiIHk9IjQ1IiB3aWR0aD0iODAiIGhlaWdodD0iNCIgZmlsbD0iI2UwZTZlZCIgcng9IjIiLz4KICAgIDxyZWN0IHg9IjI1IiB5PSI2MCIgd2lkdGg9Ijk1IiBoZWlnaHQ9IjQiIGZpbGw9IiNlMGU2ZWQiIHJ4PSIyIi8+CiAgICA8cmVjdCB4PSIyNSIgeT0iNzUiIHdpZHRoPSI3MCIgaGVpZ2h0PSI0IiBmaWxsPSIjZTBlNmVkIiByeD0iMiIvPgogICAgPHJlY3QgeD0iMjUiIHk9IjkwIiB3aWR0aD0iMTAwIiBoZWlnaHQ9IjQiIGZpbGw9IiNlMGU2ZWQiIHJ4PSIyIi8+CiAgICA8IS0tIEJvb2sgSWNvbiAtLT4KICAgIDxjaXJjbGUgY3g9Ijc1IiBjeT0iMTYwIiByPSIyNSIgZmlsbD0iIzQwNDY4YiIgb3BhY2l0eT0iMC4xIi8+CiAgICA8dGV4dCB4PSI3NSIgeT0iMTcwIiBmb250LWZhbWlseT0iU2Vnb2UgVUksIEFyaWFsLCBzYW5zLXNlcmlmIiBmb250LXNpemU9IjMwIiBmaWxsPSIjNDA0NjhiIiB0ZXh0LWFuY2hvcj0ibWlkZGxlIj7wn5OWPC90ZXh0PgogIDwvZz4KPC9zdmc+"),
-                "rating": book.get("rating"),
-                "pages": book.get("pages"),
-                "description": book.get("description", "No description available."),
-                "price": generate_random_price()
-            }
-            processed_books.append(processed_book)
+        processed_books = [to_book_card(book) for book in random_books]
 
         return processed_books
     except Exception:
         return []
 
 
-async def get_trending_books() -> List[Dict]:
-    trending_ids = await graphql_service.get_trending_books_ids()
-
-    if not trending_ids:
-        raise HTTPException(
-            status_code=404,
-            detail="No trending books found"
-        )
-
-    trending_books = await graphql_service.get_book_details_by_ids(trending_ids)
+async def get_trending_books(view: str = "card") -> List[Dict]:
+    # Served from the background-refreshed snapshot; only the price is per request
+    trending_books = await trending_snapshot.get()
 
     if not trending_books:
         raise HTTPException(
@@ -217,82 +281,56 @@ async def get_trending_books() -> List[Dict]:
             detail="Could not fetch trending books details"
         )
 
-    processed_books = []
-    for book in trending_books:
-        processed_book = {
-            "id": book["id"],
-            "title": book["title"],
-            "release_year": book.get("release_year"),
-            "release_date": book.get("release_date"),
-            "image_url": book.get("image_url", "data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMzAwIiBoZWlnaHQ9IjQwMCIgdmlld0JveD0iMCAwIDMwMCA0MDAiIGZpbGw9Im5vbmUiIHhtbG5zPSJodHRwOi8vd3d3LnczLm9yZy8yMDAwL3N2ZyI+CiAgPGRlZnM+CiAgICA8bGluZWFyR3JhZGllbnQgaWQ9ImJnR3JhZGllbnQiIHgxPSIwJSIgeTE9IjAlIiB4Mj0iMTAwJSIgeTI9IjEwMCUiPgogICAgICA8c3RvcCBvZmZzZXQ9IjAlIiBzdHlsZT0ic3RvcC1jb2xvcjojNjY2Njk5O3N0b3Atb3BhY2l0eToxIiAvPgogICAgICA8c3RvcCBvZmZzZXQ9IjEwMCUiIHN0eWxlPSJzdG9wLWNvbG9yOiM5OTk5Y2M7c3RvcC1vcGFjaXR5OjEiIC8+CiAgICA8L2xpbmVhckdyYWRpZW50PgogICAgPGxpbmVhckdyYWRpZW50IGlkPSJib29rR3JhZGllbnQiIHgxPSIwJSIgeTE9IjAlIiB4Mj0iMTAwJSIgeTI9IjEwMCUiPgogICAgICA8c3RvcCBvZmZzZXQ9IjAlIiBzdHlsZT0ic3RvcC1jb2xvcjojNDA0NjhiO3N0b3Atb3BhY2l0eToxIiAvPgogICAgICA8c3RvcCBvZmZzZXQ9IjEwMCUiIHN0eWxlPSJzdG9wLWNvbG9yOiM2MjY2OWY7c3RvcC1vcGFjaXR5OjEiIC8+CiAgICA8L2xpbmVhckdyYWRpZW50PgogICAgPGZpbHRlciBpZD0iZHJvcFNoYWRvdyI+CiAgICAgIDxmZU9mZnNldCBkeD0iMyIgZHk9IjMiLz4KICAgICAgPGZlR2F1c3NpYW5CbHVyIHN0ZERldmlhdGlvbj0iMyIvPgogICAgICA8ZmVGbG9vZCBmbG9vZC1jb2xvcj0iIzAwMDAwMCIgZmxvb2Qtb3BhY2l0eT0iMC4zIi8+CiAgICAgIDxmZUNvbXBvc2l0ZSBvcGVyYXRvcj0ib3ZlciIvPgogICAgPC9maWx0ZXI+CiAgPC9kZWZzPgogIDxyZWN0IHdpZHRoPSIzMDAiIGhlaWdodD0iNDAwIiBmaWxsPSJ1cmwoI2JnR3JhZGllbnQpIi8+CiAgPGcgdHJhbnNmb3JtPSJ0cmFuc2xhdGUoNzUsIDgwKSI+CiAgICA8IS0tIEJvb2sgQ292ZXIgLS0+CiAgICA8cmVjdCB4PSIwIiB5PSIwIiB3aWR0aD0iMTUwIiBoZWlnaHQ9IjI0MCIgZmlsbD0idXJsKCNib29rR3JhZGllbnQpIiByeD0iMTAiIGZpbHRlcj0idXJsKCNkcm9wU2hhZG93KSIvPgogICAgPCEtLSBCb29rIFNwaW5lIC0tPgogICAgPHJlY3QgeD0iNSIgeT0iMCIgd2lkdGg9IjEwIiBoZWlnaHQ9IjI0MCIgZmlsbD0iIzJkMzc0OCIgcng9IjIiLz4KICAgIDwhLS0gQm9vayBQYWdlcyAtLT4KICAgIDxyZWN0IHg9IjE1IiB5PSI4IiB3aWR0aD0iMTI1IiBoZWlnaHQ9IjIyNCIgZmlsbD0iI2Y4ZjlmYSIgcng9IjUiLz4KICAgIDwhLS0gVGV4dCBMaW5lcyAtLT4KICAgIDxyZWN0IHg9IjI1IiB5PSIzMCIgd2lkdGg9IjEwNSIgaGVpZ2h0PSI0IiBmaWxsPSIjZTBlNmVkIiByeD0iMiIvPgogICAgPHJlY3QgeD0iMjUiIHk9IjQ1IiB3aWR0aD0iODAiIGhlaWdodD0iNCIgZmlsbD0iI2UwZTZlZCIgcng9IjIiLz4KICAgIDxyZWN0IHg9IjI1IiB5PSI2MCIgd2lkdGg9Ijk1IiBoZWlnaHQ9IjQiIGZpbGw9IiNlMGU2ZWQiIHJ4PSIyIi8+CiAgICA8cmVjdCB4PSIyNSIgeT0iNzUiIHdpZHRoPSI3MCIgaGVpZ2h0PSI0IiBmaWxsPSIjZTBlNmVkIiByeD0iMiIvPgogICAgPHJlY3QgeD0iMjUiIHk9IjkwIiB3aWR0aD0iMTAwIiBoZWlnaHQ9IjQiIGZpbGw9IiNlMGU2ZWQiIHJ4PSIyIi8+CiAgICA8IS0tIEJvb2sgSWNvbiAtLT4KICAgIDxjaXJjbGUgY3g9Ijc1IiBjeT0iMTYwIiByPSIyNSIgZmlsbD0iIzQwNDY4YiIgb3BhY2l0eT0iMC4xIi8+CiAgICA8dGV4dCB4PSI3NSIgeT0iMTcwIiBmb250LWZhbWlseT0iU2Vnb2UgVUksIEFyaWFsLCBzYW5zLXNlcmlmIiBmb250LXNpemU9IjMwIiBmaWxsPSIjNDA0NjhiIiB0ZXh0LWFuY2hvcj0ibWlkZGxlIj7wn5OWPC90ZXh0PgogIDwvZz4KPC9zdmc+"),
-            "rating": book.get("rating"),
-            "pages": book.get("pages"),
-            "description": book.get("description", "No description available."),
-            "price": generate_random_price()
-        }
-        processed_books.append(processed_book)
+    books = [{**book, "price": generate_random_price()} for book in trending_books]
+    if view == "full":
+        await attach_descriptions(books)
+    return books
+
+
+async def get_similar_books(book_ids: List[int], limit: int = 10) -> List[Dict]:
+    """"More like this" from the vector index: nearest neighbours of ``book_ids``, no LLM call."""
+    neighbours = vector_index.similar_to(book_ids, limit)
+    if not neighbours:
+        return []
 
-    return processed_books
+    similarity = dict(neighbours)
+    books = await graphql_service.get_book_details_by_ids([book_id for book_id, _ in neighbours])
+    similar_books = []
+    for book in books:
+        card = to_book_card(book, similarity=round(similarity.get(book["id"], 0.0), 4))
+        if book.get("author"):
+            card["author"] = book["author"]
+        similar_books.append(card)
+    return similar_books
 
 
-async def get_genre_specific_books(genre: str, limit: int = 15, offset: int = 0) -> List[Dict]:
-    """Get books specific to a genre using multiple search strategies"""
+async def get_genre_specific_books(genre: str, limit: int = 15,
+                                   cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+    """
+    One page of the genre's precomputed pool and the cursor for the next page
+    (None once the pool is exhausted). Falls back to trending books.
+    """
     try:
-        # First try to get recent popular books
-        recent_ids = await graphql_service.get_popular_books_by_year_range(2020, 2024, 30)
-        
-        # Get some classic books too
-        classic_ids = await graphql_service.get_popular_books_by_year_range(2010, 2020, 30)
-        
-        # Combine and shuffle the IDs
-        all_ids = list(set(recent_ids + classic_ids))
-        
-        if all_ids:
-            import random
-            random.shuffle(all_ids)
-            
-            # Calculate pagination
-            total_available = len(all_ids)
-            start_idx = offset % total_available
-            books_to_fetch = min(limit * 2, total_available)  # Fetch more to filter from
-            end_idx = min(start_idx + books_to_fetch, total_available)
-            
-            # Handle wraparound if needed
-            if end_idx - start_idx < books_to_fetch and start_idx > 0:
-                selected_ids = all_ids[start_idx:] + all_ids[:books_to_fetch - (end_idx - start_idx)]
-            else:
-                selected_ids = all_ids[start_idx:end_idx]
-                
-            # Get book details
-            books = await graphql_service.get_book_details_by_ids(selected_ids)
-            
-            if books:
-                processed_books = []
-                for book in books[:limit]:
-                    # Generate a more appropriate recommendation reason based on genre
-                    reason = generate_genre_reason(genre, book.get("title", ""), book.get("description", ""))
-                    
-                    processed_book = {
-                        "id": book.get("id"),
-                        "title": book["title"],
-                        "release_year": book.get("release_year"),
-                        "release_date": book.get("release_date"),
-                        "image_url": book.get("image_url", "data:image/svg+xml;base64,PHN2ZyB3aWR0aD0iMzAwIiBoZWlnaHQ9IjQwMCIgdmlld0JveD0iMCAwIDMwMCA0MDAiIGZpbGw9Im5vbmUiIHhtbG5zPSJodHRwOi8vd3d3LnczLm9yZy8yMDAwL3N2ZyI+CiAgPGRlZnM+CiAgICA8bGluZWFyR3JhZGllbnQgaWQ9ImJnR3JhZGllbnQiIHgxPSIwJSIgeTE9IjAlIiB4Mj0iMTAwJSIgeTI9IjEwMCUiPgogICAgICA8c3RvcCBvZmZzZXQ9IjAlIiBzdHlsZT0ic3RvcC1jb2xvcjojNjY2Njk5O3N0b3Atb3BhY2l0eToxIiAvPgogICAgICA8c3RvcCBvZmZzZXQ9IjEwMCUiIHN0eWxlPSJzdG9wLWNvbG9yOiM5OTk5Y2M7c3RvcC1vcGFjaXR5OjEiIC8+CiAgICA8L2xpbmVhckdyYWRpZW50PgogICAgPGxpbmVhckdyYWRpZW50IGlkPSJib29rR3JhZGllbnQiIHgxPSIwJSIgeTE9IjAlIiB4Mj0iMTAwJSIgeTI9IjEwMCUiPgogICAgICA8c3RvcCBvZmZzZXQ9IjAlIiBzdHlsZT0ic3RvcC1jb2xvcjojNDA0NjhiO3N0b3Atb3BhY2l0eToxIiAvPgogICAgICA8c3RvcCBvZmZzZXQ9IjEwMCUiIHN0eWxlPSJzdG9wLWNvbG9yOiM2MjY2OWY7c3RvcC1vcGFjaXR5OjEiIC8+CiAgICA8L2xpbmVhckdyYWRpZW50PgogICAgPGZpbHRlciBpZD0iZHJvcFNoYWRvdyI+CiAgICAgIDxmZU9mZnNldCBkeD0iMyIgZHk9IjMiLz4KICAgICAgPGZlR2F1c3NpYW5CbHVyIHN0ZERldmlhdGlvbj0iMyIvPgogICAgICA8ZmVGbG9vZCBmbG9vZC1jb2xvcj0iIzAwMDAwMCIgZmxvb2Qtb3BhY2l0eT0iMC4zIi8+CiAgICAgIDxmZUNvbXBvc2l0ZSBvcGVyYXRvcj0ib3ZlciIvPgogICAgPC9maWx0ZXI+CiAgPC9kZWZzPgogIDxyZWN0IHdpZHRoPSIzMDAiIGhlaWdodD0iNDAwIiBmaWxsPSJ1cmwoI2JnR3JhZGllbnQpIi8+CiAgPGcgdHJhbnNmb3JtPSJ0cmFuc2xhdGUoNzUsIDgwKSI+CiAgICA8IS0tIEJvb2sgQ292ZXIgLS0+CiAgICA8cmVjdCB4PSIwIiB5PSIwIiB3aWR0aD0iMTUwIiBoZWlnaHQ9IjI0MCIgZmlsbD0idXJsKCNib29rR3JhZGllbnQpIiByeD0iMTAiIGZpbHRlcj0idXJsKCNkcm9wU2hhZG93KSIvPgogICAgPCEtLSBCb29rIFNwaW5lIC0tPgogICAgPHJlY3QgeD0iNSIgeT0iMCIgd2lkdGg9IjEwIiBoZWlnaHQ9IjI0MCIgZmlsbD0iIzJkMzc0OCIgcng9IjIiLz4KICAgIDwhLS0gQm9vayBQYWdlcyAtLT4KICAgIDxyZWN0IHg9IjE1IiB5PSI4IiB3aWR0aD0iMTI1IiBoZWlnaHQ9IjIyNCIgZmlsbD0iI2Y4ZjlmYSIgcng9IjUiLz4KICAgIDwhLS0gVGV4dCBMaW5lcyAtLT4KICAgIDxyZWN0IHg9IjI1IiB5PSIzMCIgd2lkdGg9IjEwNSIgaGVpZ2h0PSI0IiBmaWxsPSIjZTBlNmVkIiByeD0iMiIvPgogICAgPHJlY3QgeD0iMjUiIHk9IjQ1IiB3aWR0aD0iODAiIGhlaWdodD0iNCIgZmlsbD0iI2UwZTZlZCIgcng9IjIiLz4KICAgIDxyZWN0IHg9IjI1IiB5PSI2MCIgd2lkdGg9Ijk1IiBoZWlnaHQ9IjQiIGZpbGw9IiNlMGU2ZWQiIHJ4PSIyIi8+CiAgICA8cmVjdCB4PSIyNSIgeT0iNzUiIHdpZHRoPSI3MCIgaGVpZ2h0PSI0IiBmaWxsPSIjZTBlNmVkIiByeD0iMiIvPgogICAgPHJlY3QgeD0iMjUiIHk9IjkwIiB3aWR0aD0iMTAwIiBoZWlnaHQ9IjQiIGZpbGw9IiNlMGU2ZWQiIHJ4PSIyIi8+CiAgICA8IS0tIEJvb2sgSWNvbiAtLT4KICAgIDxjaXJjbGUgY3g9Ijc1IiBjeT0iMTYwIiByPSIyNSIgZmlsbD0iIzQwNDY4YiIgb3BhY2l0eT0iMC4xIi8+CiAgICA8dGV4dCB4PSI3NSIgeT0iMTcwIiBmb250LWZhbWlseT0iU2Vnb2UgVUksIEFyaWFsLCBzYW5zLXNlcmlmIiBmb250LXNpemU9IjMwIiBmaWxsPSIjNDA0NjhiIiB0ZXh0LWFuY2hvcj0ibWlkZGxlIj7wn5OWPC90ZXh0PgogIDwvZz4KPC9zdmc+"),
-                        "rating": book.get("rating"),
-                        "pages": book.get("pages"),
-                        "description": book.get("description", "No description available."),
-                        "price": generate_random_price(),
-                        "author": book.get("author", "Unknown Author"),
-                        "reason": reason
-                    }
-                    processed_books.append(processed_book)
-                
-                return processed_books
-                
+        books, next_cursor = await genre_pools.page(genre, cursor, limit)
+        if books:
+            processed_books = []
+            for book in books:
+                # Generate a more appropriate recommendation reason based on genre
+                reason = generate_genre_reason(genre, book.get("title", ""), book.get("description", ""))
+
+                processed_book = to_book_card(
+                    book,
+                    author=book.get("author", "Unknown Author"),
+                    reason=reason
+                )
+                processed_books.append(processed_book)
+
+            return processed_books, next_cursor
+
     except Exception:
         pass
-    
-    return await get_trending_books()
+
+    return await get_trending_books(), None
 
 
 def generate_genre_reason(genre: str, title: str, description: str) -> str:
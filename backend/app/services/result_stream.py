@@ -0,0 +1,51 @@
+"""
+Hand partial results from deep inside a request to a streaming endpoint.
+
+Code that resolves books one by one calls ``emit(book)``; outside a stream it
+is a no-op. A streaming endpoint wraps the usual coroutine in
+``stream_results`` and forwards each emitted item as soon as it arrives.
+"""
+import asyncio
+import json
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+_sink: ContextVar[Optional[Callable[[Dict], None]]] = ContextVar("result_sink", default=None)
+
+
+def emit(item: Dict) -> None:
+    sink = _sink.get()
+    if sink is not None:
+        sink(item)
+
+
+async def stream_results(work: Awaitable) -> AsyncIterator[Tuple[str, Any]]:
+    """Run ``work``, yielding ``("item", x)`` for everything it emits, then ``("result", value)``."""
+    queue: asyncio.Queue = asyncio.Queue()
+    token = _sink.set(queue.put_nowait)
+    try:
+        # The task copies the current context, so it (and everything it awaits) sees the sink
+        task = asyncio.ensure_future(work)
+    finally:
+        _sink.reset(token)
+
+    try:
+        while True:
+            getter = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in done:
+                yield "item", getter.result()
+                continue
+            getter.cancel()
+            break
+        while not queue.empty():
+            yield "item", queue.get_nowait()
+        yield "result", task.result()
+    finally:
+        # The client went away mid-stream
+        if not task.done():
+            task.cancel()
+
+
+def ndjson(event: Dict) -> bytes:
+    return (json.dumps(event, default=str) + "\n").encode("utf-8")
@@ -0,0 +1,246 @@
+"""
+Storage for chat sessions shared by every worker, so any worker can serve any turn.
+
+A session is stored as one small state blob (agent flags, recommended
+books, cursors) plus one append-only list per conversation memory. The
+state is read at the start of every turn; a memory's messages are only
+read when an agent actually looks at the history, and a turn writes just
+the messages it added.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain.schema.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+# Blobs larger than this are zlib-compressed; the first byte says which
+COMPRESS_OVER = 512
+
+# Per history key: (cleared this turn, messages added this turn)
+HistoryWrites = Dict[str, Tuple[bool, List[bytes]]]
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (set, frozenset)):
+        return {"$set": list(value)}
+    return str(value)
+
+
+def _hook(value: Dict) -> Any:
+    return set(value["$set"]) if len(value) == 1 and "$set" in value else value
+
+
+def encode_state(version: int, state: Dict[str, Any], history_keys: List[str]) -> bytes:
+    payload = json.dumps(
+        {"v": version, "s": state, "h": history_keys}, separators=(",", ":"), default=_default
+    ).encode("utf-8")
+    if len(payload) > COMPRESS_OVER:
+        return b"z" + zlib.compress(payload)
+    return b"j" + payload
+
+
+def decode_state(blob: bytes) -> Tuple[int, Dict[str, Any], List[str]]:
+    payload = zlib.decompress(blob[1:]) if blob[:1] == b"z" else blob[1:]
+    data = json.loads(payload, object_hook=_hook)
+    return data["v"], data["s"], data["h"]
+
+
+_MESSAGE_CODES = {"human": b"h", "ai": b"a", "system": b"s"}
+_MESSAGE_TYPES = {b"h": HumanMessage, b"a": AIMessage, b"s": SystemMessage}
+
+
+def encode_message(message: Any) -> bytes:
+    """One type byte followed by the UTF-8 content."""
+    code = _MESSAGE_CODES.get(getattr(message, "type", None), b"h")
+    return code + str(getattr(message, "content", message)).encode("utf-8")
+
+
+def decode_message(blob: bytes) -> BaseMessage:
+    return _MESSAGE_TYPES.get(blob[:1], HumanMessage)(content=blob[1:].decode("utf-8"))
+
+
+class SessionBackend:
+    """
+    Interface for shared session storage. Calls are blocking; the session
+    store runs the per-turn ones in a thread. ``ttl`` is the idle timeout, so
+    a conversation nobody touches expires on its own.
+    """
+
+    def load_state(self, session_id: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def load_history(self, session_id: str, key: str) -> List[bytes]:
+        raise NotImplementedError
+
+    def load_histories(self, session_id: str, keys: List[str]) -> Dict[str, List[bytes]]:
+        return {key: self.load_history(session_id, key) for key in keys}
+
+    def save(self, session_id: str, state: bytes, history_keys: List[str],
+             history: HistoryWrites, ttl: float) -> None:
+        raise NotImplementedError
+
+    def status(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__}
+
+
+class SQLiteSessionBackend(SessionBackend):
+    """Sessions in a SQLite file, shared by the workers on one host."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._writes_since_purge = 0
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA busy_timeout=5000")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chat_sessions ("
+            "id TEXT PRIMARY KEY, state BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chat_history ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+            "key TEXT NOT NULL, message BLOB NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS chat_history_session ON chat_history (session_id, key)")
+
+    def load_state(self, session_id: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT state FROM chat_sessions WHERE id = ? AND expires_at > ?", (session_id, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def load_history(self, session_id: str, key: str) -> List[bytes]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT message FROM chat_history WHERE session_id = ? AND key = ? ORDER BY seq",
+                (session_id, key),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def load_histories(self, session_id: str, keys: List[str]) -> Dict[str, List[bytes]]:
+        histories: Dict[str, List[bytes]] = {key: [] for key in keys}
+        if not keys:
+            return histories
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT key, message FROM chat_history WHERE session_id = ? AND key IN ({', '.join('?' * len(keys))}) "
+                "ORDER BY seq",
+                (session_id, *keys),
+            ).fetchall()
+        for key, message in rows:
+            histories[key].append(message)
+        return histories
+
+    def save(self, session_id: str, state: bytes, history_keys: List[str],
+             history: HistoryWrites, ttl: float) -> None:
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO chat_sessions (id, state, expires_at) VALUES (?, ?, ?)",
+                    (session_id, state, time.time() + ttl),
+                )
+                for key, (cleared, messages) in history.items():
+                    if cleared:
+                        self._db.execute(
+                            "DELETE FROM chat_history WHERE session_id = ? AND key = ?", (session_id, key)
+                        )
+                    self._db.executemany(
+                        "INSERT INTO chat_history (session_id, key, message) VALUES (?, ?, ?)",
+                        [(session_id, key, message) for message in messages],
+                    )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            self._writes_since_purge += 1
+            if self._writes_since_purge >= 1000:
+                self._purge_expired()
+                self._writes_since_purge = 0
+
+    def _purge_expired(self) -> None:
+        try:
+            now = time.time()
+            self._db.execute(
+                "DELETE FROM chat_history WHERE session_id IN "
+                "(SELECT id FROM chat_sessions WHERE expires_at <= ?)", (now,)
+            )
+            self._db.execute("DELETE FROM chat_sessions WHERE expires_at <= ?", (now,))
+        except sqlite3.Error as e:
+            logging.warning(f"Chat session purge failed: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        return {"backend": "sqlite", "path": self.path}
+
+
+class RedisSessionBackend(SessionBackend):
+    """
+    Sessions in Redis (or anything speaking its protocol), shared across
+    hosts. Keys expire with the session, so Redis does the idle cleanup.
+    """
+
+    def __init__(self, url: str, prefix: str = "chat"):
+        import redis
+
+        self.url = url
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, socket_timeout=2, socket_connect_timeout=2)
+
+    def _state_key(self, session_id: str) -> str:
+        return f"{self.prefix}:{session_id}:state"
+
+    def _history_key(self, session_id: str, key: str) -> str:
+        return f"{self.prefix}:{session_id}:history:{key}"
+
+    def load_state(self, session_id: str) -> Optional[bytes]:
+        return self._client.get(self._state_key(session_id))
+
+    def load_history(self, session_id: str, key: str) -> List[bytes]:
+        return self._client.lrange(self._history_key(session_id, key), 0, -1)
+
+    def load_histories(self, session_id: str, keys: List[str]) -> Dict[str, List[bytes]]:
+        pipe = self._client.pipeline(transaction=False)
+        for key in keys:
+            pipe.lrange(self._history_key(session_id, key), 0, -1)
+        return dict(zip(keys, pipe.execute())) if keys else {}
+
+    def save(self, session_id: str, state: bytes, history_keys: List[str],
+             history: HistoryWrites, ttl: float) -> None:
+        ttl = max(1, int(ttl))
+        # One round trip for the whole turn
+        pipe = self._client.pipeline(transaction=False)
+        pipe.set(self._state_key(session_id), state, ex=ttl)
+        for key, (cleared, messages) in history.items():
+            if cleared:
+                pipe.delete(self._history_key(session_id, key))
+            if messages:
+                pipe.rpush(self._history_key(session_id, key), *messages)
+        # Histories untouched this turn still live as long as the state
+        for key in history_keys:
+            pipe.expire(self._history_key(session_id, key), ttl)
+        pipe.execute()
+
+    def status(self) -> Dict[str, Any]:
+        kwargs = self._client.connection_pool.connection_kwargs
+        return {"backend": "redis", "host": kwargs.get("host"), "port": kwargs.get("port"), "db": kwargs.get("db")}
+
+
+def create_session_backend(url: Optional[str]) -> Optional[SessionBackend]:
+    """``sqlite:///path`` or ``redis://host:port/db``; None keeps sessions in this process only."""
+    if not url:
+        return None
+    try:
+        if url.startswith("sqlite:///"):
+            return SQLiteSessionBackend(url[len("sqlite:///"):])
+        if url.startswith(("redis://", "rediss://", "unix://")):
+            return RedisSessionBackend(url)
+        logging.error(f"Unknown chat session backend '{url}', keeping sessions in process")
+    except Exception as e:
+        logging.error(f"Chat session backend unavailable, keeping sessions in process: {e}")
+    return None
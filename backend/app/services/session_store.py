@@ -0,0 +1,431 @@
+import asyncio
+import logging
+import re
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+
+from langchain.memory import ConversationBufferMemory
+from langchain.schema import BaseChatMessageHistory
+
+from app.core.config import settings
+from app.services.session_backends import (
+    SessionBackend, create_session_backend, decode_message, decode_state, encode_message, encode_state
+)
+
+_SESSION_ID = re.compile(r"^[A-Za-z0-9_-]{1,128}$")
+
+
+class ChatSession:
+    """One conversation's agent state; ``lock`` keeps its turns in order."""
+
+    def __init__(self, session_id: str, backend: Optional[SessionBackend] = None):
+        self.session_id = session_id
+        self.backend = backend
+        self.state: Dict[str, Any] = {}
+        self.histories: Dict[str, ConversationBufferMemory] = {}
+        self.history_keys: Set[str] = set()
+        # Stored messages read ahead for memories this process hasn't opened yet
+        self.prefetched: Dict[str, List[bytes]] = {}
+        # Version of the stored state this copy matches; 0 when nothing is stored
+        self.version = 0
+        self.created_at = self.last_seen = time.time()
+        self.size = 0
+        self.lock = asyncio.Lock()
+
+    def reset(self) -> None:
+        self.state, self.histories, self.history_keys, self.version = {}, {}, set(), 0
+        self.prefetched = {}
+
+
+_current: ContextVar[Optional[ChatSession]] = ContextVar("chat_session", default=None)
+# State for code running outside any request, such as the command-line chat loop
+_local_session = ChatSession("local")
+
+
+def current_session() -> ChatSession:
+    return _current.get() or _local_session
+
+
+class SessionField:
+    """
+    Agent attribute kept in the current chat session instead of on the shared agent.
+
+    Reads and writes go to ``current_session().state``, so the agents stay
+    process-wide singletons while every conversation sees its own values.
+    ``factory`` builds mutable defaults (a set, a memory) on first use.
+    """
+
+    def __init__(self, default: Any = None, factory: Optional[Callable[[], Any]] = None):
+        self.default = default
+        self.factory = factory
+
+    def __set_name__(self, owner, name: str):
+        self.key = f"{owner.__name__}.{name}"
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        state = current_session().state
+        if self.key not in state:
+            if self.factory is None:
+                return self.default
+            state[self.key] = self.factory()
+        return state[self.key]
+
+    def __set__(self, obj, value):
+        current_session().state[self.key] = value
+
+
+class LazyChatHistory(BaseChatMessageHistory):
+    """
+    Messages of one session memory. The session store reads them ahead when
+    it checks the session out; if that failed they are read from the backend
+    the first time an agent looks at them. Additions are kept until the end
+    of the turn and then appended to the stored list, so a turn never
+    rewrites the whole history.
+    """
+
+    def __init__(self, backend: Optional[SessionBackend], session_id: str, key: str, stored: bool,
+                 prefetched: Optional[List[bytes]] = None):
+        self._backend = backend
+        self._session_id = session_id
+        self._key = key
+        if prefetched is not None:
+            self._messages: Optional[List] = [decode_message(blob) for blob in prefetched]
+        else:
+            self._messages = None if backend is not None and stored else []
+        self._pending: List = []
+        # A new session may reuse an expired id; its leftover history is replaced, not extended
+        self._cleared = backend is not None and not stored
+
+    @property
+    def messages(self) -> List:
+        if self._messages is None:
+            # Fallback when the read-ahead failed; blocking, but once per turn at most
+            try:
+                stored = [decode_message(blob) for blob in self._backend.load_history(self._session_id, self._key)]
+            except Exception as e:
+                logging.warning(f"Chat history load failed for session {self._session_id}: {e}")
+                stored = []
+            self._messages = stored + self._pending
+        return self._messages
+
+    @property
+    def cached(self) -> List:
+        return self._messages or self._pending
+
+    def add_message(self, message) -> None:
+        if self._messages is not None:
+            self._messages.append(message)
+        if self._backend is not None:
+            self._pending.append(message)
+
+    def clear(self) -> None:
+        self._messages = []
+        self._pending = []
+        self._cleared = self._backend is not None
+
+    def take_writes(self) -> Tuple[bool, List[bytes]]:
+        writes = self._cleared, [encode_message(message) for message in self._pending]
+        self._cleared, self._pending = False, []
+        return writes
+
+
+class SessionMemory:
+    """
+    Conversation memory kept in the current chat session, loaded lazily from its backend.
+    Agents that give the same ``key`` share one history; by default each attribute has its own.
+    """
+
+    def __init__(self, key: Optional[str] = None):
+        self.key = key
+
+    def __set_name__(self, owner, name: str):
+        if self.key is None:
+            self.key = f"{owner.__name__}.{name}"
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        session = current_session()
+        memory = session.histories.get(self.key)
+        if memory is None:
+            history = LazyChatHistory(
+                session.backend, session.session_id, self.key, session.version > 0,
+                session.prefetched.pop(self.key, None),
+            )
+            memory = session.histories[self.key] = ConversationBufferMemory(
+                chat_memory=history, return_messages=True
+            )
+            session.history_keys.add(self.key)
+        return memory
+
+
+def approx_size(value: Any, seen: Optional[set] = None) -> int:
+    """Rough deep size in bytes; good enough to budget sessions, not to account exactly."""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(approx_size(key, seen) + approx_size(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(approx_size(item, seen) for item in value)
+    elif hasattr(value, "__dict__"):
+        size += approx_size(vars(value), seen)
+    return size
+
+
+class SessionStore:
+    """
+    Bounded in-process store of chat sessions, keyed by session ids it issues
+    (random, and only ever handed to the client that started the session).
+
+    Sessions idle for ``idle_timeout`` are dropped by a background sweep. Past
+    ``max_sessions`` or ``max_memory_mb`` (measured after each turn) the least
+    recently used sessions go first; a session mid-turn is never evicted.
+
+    With a ``backend`` every turn starts by reading the stored state and ends
+    by writing it back, so any worker can serve the next turn; the local copy
+    is then only a cache, reused while its version matches the stored one.
+    Concurrent turns of one conversation on different workers are not
+    serialized: the later state write wins, while both turns' messages are kept.
+    """
+
+    def __init__(self, max_sessions: int = 10000, idle_timeout: float = 1800,
+                 max_memory_mb: float = 256, sweep_interval: float = 60,
+                 backend: Optional[SessionBackend] = None):
+        self.backend = backend
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_bytes = int(max_memory_mb * 1024 * 1024)
+        self.sweep_interval = sweep_interval
+        self._sessions: "OrderedDict[str, ChatSession]" = OrderedDict()
+        self._bytes = 0
+        self._loop_task: Optional[asyncio.Task] = None
+        self._counters = {"created": 0, "resumed": 0, "expired": 0, "evicted": 0, "loaded": 0,
+                          "unknown_ids": 0, "backend_errors": 0}
+
+    @asynccontextmanager
+    async def session(self, session_id: Optional[str]) -> AsyncIterator[ChatSession]:
+        """
+        Run one conversation turn against ``session_id``'s state. Ids are only
+        issued here (``session.session_id``); a missing or unknown one starts a
+        new session rather than adopting the id the client sent.
+        """
+        session, loaded = await self._checkout(session_id)
+        async with session.lock:
+            if self.backend is not None:
+                if not loaded:
+                    await self._load(session)
+                await self._prefetch(session)
+            token = _current.set(session)
+            try:
+                yield session
+            finally:
+                _current.reset(token)
+                await self._checkin(session)
+
+    async def update(self, session_id: str, apply: Callable[[], bool]) -> bool:
+        """
+        Change an existing session between turns, for background work that
+        finishes after the turn that started it. ``apply`` runs under the
+        session's lock with the session current and returns whether it changed
+        anything; changes are saved to the backend. False if the session is gone.
+        """
+        session = self._sessions.get(session_id)
+        if session is None:
+            if self.backend is None:
+                return False
+            # Served by another worker, or evicted here; change the stored copy without caching it
+            session = ChatSession(session_id, self.backend)
+        async with session.lock:
+            if self.backend is not None:
+                await self._load(session)
+                if not session.version:
+                    return False
+            token = _current.set(session)
+            try:
+                changed = apply()
+            finally:
+                _current.reset(token)
+            if changed and self.backend is not None:
+                await self._save(session)
+        return changed
+
+    def start(self) -> None:
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self) -> None:
+        if self._loop_task is not None and not self._loop_task.done():
+            self._loop_task.cancel()
+            try:
+                await self._loop_task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._loop_task = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            **self._counters,
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "memory_mb": round(self._bytes / (1024 * 1024), 2),
+            "max_memory_mb": round(self.max_bytes / (1024 * 1024), 2),
+            "backend": self.backend.status() if self.backend is not None else {"backend": "memory"},
+        }
+
+    async def _checkout(self, session_id: Optional[str]) -> Tuple[ChatSession, bool]:
+        """The session to serve, and whether its stored state was already read while finding it."""
+        now = time.time()
+        session = self._sessions.get(session_id) if session_id else None
+        if session is not None and now - session.last_seen > self.idle_timeout and not session.lock.locked():
+            self._remove(session.session_id)
+            self._counters["expired"] += 1
+            session = None
+
+        loaded = False
+        if session is None and session_id and self.backend is not None:
+            # Issued earlier, possibly by another worker; it counts as known while the backend holds it
+            stored = await self._resume(session_id)
+            # Another request for the same id may have got in while the backend was read
+            session = self._sessions.get(session_id)
+            if session is None and stored is not None:
+                session = self._sessions[session_id] = stored
+                loaded = True
+
+        if session is None:
+            if session_id:
+                self._counters["unknown_ids"] += 1
+            # Never the client's id: a client can't choose, or guess, the id of a conversation
+            new_id = uuid.uuid4().hex
+            session = self._sessions[new_id] = ChatSession(new_id, self.backend)
+            self._counters["created"] += 1
+        else:
+            self._counters["resumed"] += 1
+
+        self._sessions.move_to_end(session.session_id)
+        session.last_seen = now
+        self._evict()
+        return session, loaded
+
+    async def _resume(self, session_id: str) -> Optional[ChatSession]:
+        if not _SESSION_ID.match(session_id):
+            return None
+        session = ChatSession(session_id, self.backend)
+        await self._load(session)
+        return session if session.version else None
+
+    async def _load(self, session: ChatSession) -> None:
+        try:
+            blob = await asyncio.to_thread(self.backend.load_state, session.session_id)
+        except Exception as e:
+            # Carry on with the local copy; the turn still gets saved
+            self._counters["backend_errors"] += 1
+            logging.warning(f"Chat session load failed for {session.session_id}: {e}")
+            return
+        if blob is None:
+            if session.version:
+                # Expired in the backend, or never saved
+                session.reset()
+            return
+        version, state, history_keys = decode_state(blob)
+        if version != session.version:
+            # Another worker served a turn since this copy was made
+            session.state, session.histories = state, {}
+            session.history_keys, session.version = set(history_keys), version
+            self._counters["loaded"] += 1
+
+    async def _prefetch(self, session: ChatSession) -> None:
+        """Read stored histories not open in this process, off the event loop, before any agent asks."""
+        keys = sorted(key for key in session.history_keys if key not in session.histories)
+        if not keys:
+            session.prefetched = {}
+            return
+        try:
+            session.prefetched = await asyncio.to_thread(self.backend.load_histories, session.session_id, keys)
+        except Exception as e:
+            # Memories fall back to reading on first use
+            self._counters["backend_errors"] += 1
+            session.prefetched = {}
+            logging.warning(f"Chat history prefetch failed for {session.session_id}: {e}")
+
+    async def _save(self, session: ChatSession) -> None:
+        history = {key: memory.chat_memory.take_writes() for key, memory in session.histories.items()}
+        session.version += 1
+        blob = encode_state(session.version, session.state, sorted(session.history_keys))
+        try:
+            await asyncio.to_thread(
+                self.backend.save, session.session_id, blob, sorted(session.history_keys), history, self.idle_timeout
+            )
+        except Exception as e:
+            # The next turn reloads whatever the backend still holds
+            self._counters["backend_errors"] += 1
+            logging.error(f"Chat session save failed for {session.session_id}: {e}")
+
+    async def _checkin(self, session: ChatSession) -> None:
+        session.last_seen = time.time()
+        session.prefetched = {}
+        if self.backend is not None:
+            await self._save(session)
+        if self._sessions.get(session.session_id) is not session:
+            return
+        size = approx_size(session.state) + sum(
+            approx_size(memory.chat_memory.cached) for memory in session.histories.values()
+        )
+        self._bytes += size - session.size
+        session.size = size
+        self._evict()
+
+    def _remove(self, session_id: str) -> Optional[ChatSession]:
+        session = self._sessions.pop(session_id, None)
+        if session is not None:
+            self._bytes -= session.size
+        return session
+
+    def _evict(self) -> None:
+        if len(self._sessions) <= self.max_sessions and self._bytes <= self.max_bytes:
+            return
+        # Least recently used first
+        for session_id in list(self._sessions):
+            if len(self._sessions) <= self.max_sessions and self._bytes <= self.max_bytes:
+                break
+            if not self._sessions[session_id].lock.locked():
+                self._remove(session_id)
+                self._counters["evicted"] += 1
+
+    def _expire_idle(self) -> int:
+        cutoff = time.time() - self.idle_timeout
+        expired = [
+            session_id for session_id, session in self._sessions.items()
+            if session.last_seen < cutoff and not session.lock.locked()
+        ]
+        for session_id in expired:
+            self._remove(session_id)
+        self._counters["expired"] += len(expired)
+        return len(expired)
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                expired = self._expire_idle()
+                if expired:
+                    logging.info(f"Expired {expired} idle chat sessions")
+            except Exception as e:
+                logging.error(f"Chat session sweep error: {e}")
+
+
+session_store = SessionStore(
+    max_sessions=settings.CHAT_SESSION_MAX_SESSIONS,
+    idle_timeout=settings.CHAT_SESSION_IDLE_TIMEOUT,
+    max_memory_mb=settings.CHAT_SESSION_MAX_MEMORY_MB,
+    backend=create_session_backend(settings.CHAT_SESSION_BACKEND_URL),
+)
@@ -0,0 +1,98 @@
+"""
+Hashed TF-IDF features for book text.
+
+Terms are hashed into a fixed number of columns (crc32, so the mapping is the
+same in every process), which keeps the vocabulary out of memory and lets
+queries be vectorized without refitting.
+"""
+import re
+import unicodedata
+import zlib
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+from scipy import sparse
+
+STOPWORDS = frozenset("""
+    a an and are as at be but by for from has have in into is it its of on or
+    that the their this to was were which with you your book books novel story
+""".split())
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def book_text(book: Dict) -> str:
+    # The title counts twice so it outweighs incidental words in a long description
+    title = book.get("title") or ""
+    return " ".join([title, title, book.get("author") or "", book.get("description") or ""])
+
+
+def tokenize(text: str) -> List[str]:
+    text = unicodedata.normalize("NFKD", text or "").encode("ASCII", "ignore").decode("ASCII").lower()
+    return [token for token in _TOKEN.findall(text) if len(token) > 1 and token not in STOPWORDS]
+
+
+def term_columns(tokens: List[str], n_features: int) -> List[int]:
+    """Column per unigram plus one per adjacent pair, so "science fiction" is a feature of its own."""
+    terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    return [zlib.crc32(term.encode("utf-8")) % n_features for term in terms]
+
+
+def count_matrix(texts: Iterable[str], n_features: int) -> sparse.csr_matrix:
+    indptr = [0]
+    indices: List[int] = []
+    for text in texts:
+        indices.extend(term_columns(tokenize(text), n_features))
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.float32)
+    matrix = sparse.csr_matrix(
+        (data, np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+        shape=(len(indptr) - 1, n_features),
+    )
+    matrix.sum_duplicates()
+    return matrix
+
+
+def fit_idf(counts: sparse.csr_matrix) -> np.ndarray:
+    """Smoothed inverse document frequency per column."""
+    n_docs = counts.shape[0]
+    doc_freq = np.bincount(counts.indices, minlength=counts.shape[1]).astype(np.float32)
+    return (np.log((1 + n_docs) / (1 + doc_freq)) + 1).astype(np.float32)
+
+
+def tfidf(counts: sparse.csr_matrix, idf: np.ndarray) -> sparse.csr_matrix:
+    """Sublinear tf times idf, rows L2-normalized so a dot product is a cosine similarity."""
+    weighted = counts.copy()
+    weighted.data = (1 + np.log(weighted.data)) * idf[weighted.indices]
+    return normalize_rows(weighted)
+
+
+def normalize_rows(matrix: sparse.csr_matrix) -> sparse.csr_matrix:
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms).dot(matrix).tocsr()
+
+
+def text_vector(text: str, idf: np.ndarray) -> Optional[sparse.csr_matrix]:
+    """One normalized TF-IDF row for free text, or None when nothing in it is indexable."""
+    vector = tfidf(count_matrix([text], idf.shape[0]), idf)
+    return vector if vector.nnz else None
+
+
+@lru_cache(maxsize=4)
+def projection_matrix(n_features: int, dim: int, per_feature: int = 4, seed: int = 7) -> sparse.csr_matrix:
+    """Fixed sparse random projection (+-1 entries, ``per_feature`` per column) to ``dim`` dense dimensions."""
+    rng = np.random.default_rng(seed)
+    rows = np.repeat(np.arange(n_features, dtype=np.int32), per_feature)
+    cols = rng.integers(0, dim, size=rows.shape[0], dtype=np.int32)
+    signs = rng.choice(np.array([-1.0, 1.0], dtype=np.float32), size=rows.shape[0]) / np.sqrt(per_feature)
+    return sparse.csr_matrix((signs.astype(np.float32), (rows, cols)), shape=(n_features, dim))
+
+
+def embed(tfidf_rows: sparse.csr_matrix, dim: int) -> np.ndarray:
+    """Dense, L2-normalized float32 embeddings of TF-IDF rows; dot products approximate cosine similarity."""
+    vectors = np.asarray(tfidf_rows.dot(projection_matrix(tfidf_rows.shape[1], dim)).todense(), dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import re
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.book_cache import book_cache, normalize_title_key
+from app.services.catalog_mirror import catalog_mirror
+
+TITLE_WEIGHT = 0.8
+AUTHOR_WEIGHT = 0.2
+# Documents sharing the most trigrams with the query that get a full score
+CANDIDATES = 50
+# Placeholder Hardcover and the mirror fill in for books without an author; not an author to match
+UNKNOWN_AUTHOR = "Unknown Author"
+
+
+def normalize_title(title: str) -> str:
+    """Tidy an LLM-written title for lookup; subtitles and hyphens are kept, the index handles variants."""
+    return re.sub(r"\s+", " ", title or "").strip().strip("\"'*“”").strip()
+
+
+# "Title: Subtitle" or "Title - Subtitle"; a hyphen inside a word is not a separator
+_SUBTITLE = re.compile(r":|\s[-–—]\s")
+
+
+def title_keys(title: str) -> Set[str]:
+    """The full title and its main title, so "Dune" and "Dune: Deluxe Edition" find each other."""
+    main_title = _SUBTITLE.split(title, maxsplit=1)[0]
+    return {key for key in (normalize_title_key(title), normalize_title_key(main_title)) if key}
+
+
+def trigrams(key: str) -> Set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(a: str, b: str) -> float:
+    """Dice coefficient over the character trigrams of two normalized strings."""
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    return 2 * len(grams_a & grams_b) / (len(grams_a) + len(grams_b))
+
+
+class _TitleTable:
+    """Trigram postings over title keys; a book has one document per distinct key."""
+
+    def __init__(self):
+        self.postings: Dict[str, array] = {}
+        self.doc_rows = array("i")
+        self.doc_sizes = array("i")
+        self.book_ids = array("q")
+        self.ratings = array("f")
+        self.authors: List[str] = []
+        self.book_rows: Dict[int, int] = {}
+
+    def add(self, book: Dict) -> bool:
+        book_id, title = book.get("id"), book.get("title")
+        if book_id is None or not title or book_id in self.book_rows:
+            return False
+        row = len(self.book_ids)
+        self.book_rows[book_id] = row
+        self.book_ids.append(book_id)
+        self.ratings.append(float(book.get("rating") or 0))
+        author = book.get("author") or ""
+        self.authors.append("" if author == UNKNOWN_AUTHOR else normalize_title_key(author))
+        for key in title_keys(title):
+            doc = len(self.doc_rows)
+            grams = trigrams(key)
+            self.doc_rows.append(row)
+            self.doc_sizes.append(len(grams))
+            for gram in grams:
+                self.postings.setdefault(gram, array("i")).append(doc)
+        return True
+
+    def scores(self, key: str) -> Dict[int, float]:
+        """Best title similarity per book row among the documents closest to ``key``."""
+        grams = trigrams(key)
+        lists = [np.frombuffer(self.postings[gram], dtype=np.int32) for gram in grams if gram in self.postings]
+        if not lists:
+            return {}
+        shared = np.bincount(np.concatenate(lists))
+        # Views into the arrays must not outlive the call, or a later append can't resize them
+        del lists
+        k = min(CANDIDATES, int(np.count_nonzero(shared)))
+        docs = np.argpartition(-shared, k - 1)[:k]
+
+        best: Dict[int, float] = {}
+        for doc in docs:
+            score = 2 * shared[doc] / (len(grams) + self.doc_sizes[doc])
+            row = self.doc_rows[doc]
+            if score > best.get(row, 0.0):
+                best[row] = float(score)
+        return best
+
+
+class TitleIndex:
+    """
+    Fuzzy title resolution for LLM-written titles, entirely in memory.
+
+    Titles from the catalog mirror and the book cache are split into character
+    trigrams; a query scores the closest titles by Dice similarity, and a known
+    author breaks ties between books with similar titles. Books fetched from
+    Hardcover are added as they arrive, so the index also covers deployments
+    without a mirror; those go to a separate table holding the ``max_recent``
+    most recently seen, as postings can't shrink and the mirror-backed table
+    is rebuilt only from the mirror and the (bounded) book cache.
+    """
+
+    def __init__(self, min_confidence: float = 0.75, max_recent: int = 5000):
+        self.min_confidence = min_confidence
+        self.max_recent = max_recent
+        self.built_at: Optional[float] = None
+        self.build_seconds: Optional[float] = None
+        self._table = _TitleTable()
+        self._recent_table = _TitleTable()
+        self._recent: "OrderedDict[int, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pending: Optional[List[Dict]] = None
+        self._build_task: Optional[asyncio.Task] = None
+        self._counters = {"lookups": 0, "resolved": 0, "below_confidence": 0, "no_candidates": 0,
+                          "recent_evicted": 0}
+
+    def add(self, book: Dict, mirrored: bool = False) -> None:
+        """Index a book; ``mirrored`` ones are in the catalog mirror and survive rebuilds, others are bounded."""
+        with self._lock:
+            if mirrored:
+                self._table.add(book)
+                if self._pending is not None:
+                    self._pending.append(book)
+            else:
+                self._add_recent(book)
+
+    def add_many(self, books: Iterable[Dict], mirrored: bool = False) -> None:
+        for book in books:
+            self.add(book, mirrored)
+
+    def _add_recent(self, book: Dict) -> None:
+        book_id = book.get("id")
+        if book_id is None or not book.get("title") or book_id in self._table.book_rows:
+            return
+        if book_id in self._recent:
+            self._recent.move_to_end(book_id)
+            return
+        self._recent[book_id] = book
+        self._recent_table.add(book)
+        if len(self._recent) > self.max_recent:
+            # Drop the least recently seen quarter at once, so the rebuild is paid every few thousand adds
+            for _ in range(len(self._recent) - self.max_recent * 3 // 4):
+                self._recent.popitem(last=False)
+                self._counters["recent_evicted"] += 1
+            table = _TitleTable()
+            for recent in self._recent.values():
+                table.add(recent)
+            self._recent_table = table
+
+    def resolve(self, title: str, author: Optional[str] = None) -> Optional[Dict]:
+        """``{"id", "confidence"}`` of the best match, or None below ``min_confidence``."""
+        author_key = normalize_title_key(author or "")
+        with self._lock:
+            self._counters["lookups"] += 1
+            candidates = []
+            for table in (self._table, self._recent_table):
+                scores: Dict[int, float] = {}
+                for key in title_keys(title):
+                    for row, score in table.scores(key).items():
+                        scores[row] = max(score, scores.get(row, 0.0))
+                for row, title_score in scores.items():
+                    confidence = title_score
+                    if author_key and table.authors[row]:
+                        author_score = similarity(author_key, table.authors[row])
+                        confidence = TITLE_WEIGHT * title_score + AUTHOR_WEIGHT * author_score
+                    candidates.append((confidence, table.ratings[row], table.book_ids[row]))
+            if not candidates:
+                self._counters["no_candidates"] += 1
+                return None
+            confidence, _, book_id = max(candidates)
+
+            if confidence < self.min_confidence:
+                self._counters["below_confidence"] += 1
+                return None
+            self._counters["resolved"] += 1
+            return {"id": book_id, "confidence": round(confidence, 3)}
+
+    def build(self) -> int:
+        """Rebuild from the catalog mirror and the book cache; mirrored books added meanwhile are kept."""
+        started = time.monotonic()
+        with self._lock:
+            self._pending = []
+        table = _TitleTable()
+        try:
+            if catalog_mirror.enabled:
+                for book in catalog_mirror.iter_books():
+                    table.add(book)
+            for book in book_cache.iter_books():
+                table.add(book)
+        finally:
+            with self._lock:
+                for book in self._pending:
+                    table.add(book)
+                self._pending = None
+                self._table = table
+        self.built_at = time.time()
+        self.build_seconds = round(time.monotonic() - started, 3)
+        return len(table.book_ids)
+
+    async def ensure_built(self) -> None:
+        if self.built_at is not None:
+            return
+        if self._build_task is None or self._build_task.done():
+            self._build_task = asyncio.create_task(asyncio.to_thread(self.build))
+        try:
+            count = await asyncio.shield(self._build_task)
+            logging.info(f"Title index holds {count} books ({self.build_seconds}s)")
+        except Exception as e:
+            logging.error(f"Title index build failed: {e}")
+
+    def start(self) -> None:
+        """Build in the background; lookups use whatever has been indexed so far."""
+        asyncio.create_task(self.ensure_built())
+
+    def status(self) -> Dict:
+        with self._lock:
+            counters = dict(self._counters)
+            books = len(self._table.book_ids)
+            recent = len(self._recent)
+        return {
+            **counters,
+            "books": books,
+            "recent_books": recent,
+            "hit_rate": round(counters["resolved"] / counters["lookups"], 4) if counters["lookups"] else 0.0,
+            "built_at": self.built_at,
+            "build_seconds": self.build_seconds,
+        }
+
+
+title_index = TitleIndex(
+    min_confidence=settings.TITLE_MATCH_MIN_CONFIDENCE,
+    max_recent=settings.TITLE_INDEX_MAX_RECENT,
+)
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import time
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.services.graphql_service import graphql_service
+
+
+class TrendingSnapshot:
+    """
+    In-memory trending list rebuilt by a background task.
+
+    Readers always get the last good snapshot immediately. A stale snapshot
+    triggers at most one background rebuild (stale-while-revalidate), and a
+    failed rebuild keeps serving the previous books.
+    """
+
+    def __init__(self, refresh_interval: float = 3600, max_age: float = 3600,
+                 window_days: int = 365, limit: int = 50):
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.window_days = window_days
+        self.limit = limit
+        self.books: List[Dict] = []
+        self.built_at: Optional[float] = None
+        self.window: Optional[tuple] = None
+        self.last_error: Optional[str] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    @property
+    def is_stale(self) -> bool:
+        return self.built_at is None or time.time() - self.built_at > self.max_age
+
+    async def get(self) -> List[Dict]:
+        if not self.books:
+            # Nothing to serve yet; wait for the first build. Other requests and the
+            # refresh loop share it, so a cancelled request mustn't cancel it for them
+            await asyncio.shield(self._ensure_refresh())
+        elif self.is_stale:
+            self._ensure_refresh()
+        return self.books
+
+    async def refresh(self) -> bool:
+        to_date = date.today()
+        from_date = to_date - timedelta(days=self.window_days)
+        error = None
+        try:
+            # Random ids are only better than nothing on a cold start
+            trending_ids = await graphql_service.get_trending_books_ids(
+                from_date, to_date, self.limit, random_fallback=not self.books
+            )
+            books = await graphql_service.get_book_details_by_ids(trending_ids) if trending_ids else []
+        except Exception as e:
+            books = []
+            error = str(e)
+
+        if not books:
+            self.last_error = error or "Hardcover returned no trending books"
+            logging.warning(f"Trending refresh failed, serving previous snapshot: {self.last_error}")
+            return False
+
+        self.books = [self._to_card(book) for book in books]
+        self.built_at = time.time()
+        self.window = (from_date.isoformat(), to_date.isoformat())
+        self.last_error = None
+        return True
+
+    def start(self) -> None:
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        for task in (self._loop_task, self._refresh_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._loop_task = None
+        self._refresh_task = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "books": len(self.books),
+            "age_seconds": round(time.time() - self.built_at, 1) if self.built_at else None,
+            "stale": self.is_stale,
+            "window": self.window,
+            "refreshing": self._refresh_task is not None and not self._refresh_task.done(),
+            "last_error": self.last_error,
+        }
+
+    def _ensure_refresh(self) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh())
+        return self._refresh_task
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            refresh = self._ensure_refresh()
+            try:
+                await asyncio.shield(refresh)
+            except asyncio.CancelledError:
+                # Only the loop's own cancellation ends it; a cancelled rebuild is retried next round
+                if not refresh.cancelled():
+                    raise
+            except Exception as e:
+                logging.error(f"Trending refresh loop error: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+    @staticmethod
+    def _to_card(book: Dict) -> Dict:
+        return {
+            "id": book["id"],
+            "title": book["title"],
+            "release_year": book.get("release_year"),
+            "release_date": book.get("release_date"),
+            "image_url": book.get("image_url"),
+            "rating": book.get("rating"),
+            "pages": book.get("pages"),
+        }
+
+
+trending_snapshot = TrendingSnapshot(
+    refresh_interval=settings.TRENDING_REFRESH_INTERVAL,
+    max_age=settings.TRENDING_MAX_AGE,
+    window_days=settings.TRENDING_WINDOW_DAYS,
+    limit=settings.TRENDING_LIMIT,
+)
@@ -0,0 +1,268 @@
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.text_features import book_text, count_matrix, embed, fit_idf, tfidf
+
+META_FILE = "meta.json"
+
+
+class VectorIndex:
+    """
+    Inverted-file (IVF) nearest-neighbour index over book embeddings.
+
+    Embeddings are hashed TF-IDF rows randomly projected to ``dim`` dense
+    dimensions. Everything lives in flat files under ``path``: vectors, ids and
+    list assignments are memory-mapped, so every worker on a host shares one
+    copy through the page cache. One process writes (the build script or the
+    catalog sync); readers notice a new ``meta.json`` version and remap.
+
+    Rows are append-only: removing a book tombstones its id (-1), and
+    re-adding it appends a fresh row.
+    """
+
+    def __init__(self, path: Optional[str] = None, dim: int = 256, nprobe: int = 8):
+        self.path = path
+        self.dim = dim
+        self.nprobe = nprobe
+        self.meta: Dict = {}
+        self._lock = threading.RLock()
+        self._meta_mtime: Optional[int] = None
+        self._vectors: Optional[np.ndarray] = None
+        self._ids: Optional[np.ndarray] = None
+        self._assignments: Optional[np.ndarray] = None
+        self._centroids: Optional[np.ndarray] = None
+        self._idf: Optional[np.ndarray] = None
+        self._rows: Dict[int, int] = {}
+        self._lists: List[np.ndarray] = []
+
+    @property
+    def enabled(self) -> bool:
+        self._maybe_reload()
+        return self._vectors is not None
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    # -- reading -------------------------------------------------------------
+
+    def _maybe_reload(self) -> None:
+        if not self.path:
+            return
+        try:
+            mtime = os.stat(self._file(META_FILE)).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._meta_mtime:
+            return
+        with self._lock:
+            try:
+                self._load()
+                self._meta_mtime = mtime
+            except (OSError, ValueError) as e:
+                logging.warning(f"Vector index unavailable: {e}")
+
+    def _load(self) -> None:
+        with open(self._file(META_FILE)) as f:
+            meta = json.load(f)
+        count, capacity, dim = meta["count"], meta["capacity"], meta["dim"]
+        vectors = np.memmap(self._file("vectors.f32"), dtype=np.float32, mode="r", shape=(capacity, dim))
+        ids = np.memmap(self._file("ids.i64"), dtype=np.int64, mode="r", shape=(capacity,))
+        assignments = np.memmap(self._file("lists.i32"), dtype=np.int32, mode="r", shape=(capacity,))
+        centroids = np.fromfile(self._file("centroids.f32"), dtype=np.float32).reshape(-1, dim)
+        idf = np.fromfile(self._file("idf.f32"), dtype=np.float32)
+
+        live = np.flatnonzero(ids[:count] >= 0)
+        order = live[np.argsort(assignments[live], kind="stable")]
+        bounds = np.searchsorted(assignments[order], np.arange(len(centroids) + 1))
+
+        self.meta = meta
+        self.dim = dim
+        self._vectors, self._ids, self._assignments = vectors, ids, assignments
+        self._centroids, self._idf = centroids, idf
+        self._rows = {int(ids[row]): int(row) for row in live}
+        self._lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(centroids))]
+
+    def vector(self, book_id: int) -> Optional[np.ndarray]:
+        self._maybe_reload()
+        row = self._rows.get(book_id)
+        if row is None or self._ids[row] != book_id:
+            return None
+        return np.asarray(self._vectors[row])
+
+    def query(self, vector: np.ndarray, k: int = 10, exclude: Iterable[int] = ()) -> List[Tuple[int, float]]:
+        """Top ``k`` ``(book_id, cosine)`` pairs, probing the ``nprobe`` closest lists."""
+        self._maybe_reload()
+        if self._vectors is None or not self._lists:
+            return []
+        vector = np.asarray(vector, dtype=np.float32)
+        probe = np.argsort(-(self._centroids @ vector))[:self.nprobe]
+        rows = np.concatenate([self._lists[i] for i in probe])
+        if rows.size == 0:
+            return []
+
+        ids = np.asarray(self._ids[rows])
+        scores = np.asarray(self._vectors[rows]) @ vector
+        keep = ids >= 0
+        excluded = set(exclude)
+        if excluded:
+            keep &= ~np.isin(ids, list(excluded))
+        ids, scores = ids[keep], scores[keep]
+
+        k = min(k, len(ids))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[i]), float(scores[i])) for i in top]
+
+    def similar_to(self, book_ids: Sequence[int], k: int = 10) -> List[Tuple[int, float]]:
+        """Nearest books to the centroid of ``book_ids``, excluding the seeds themselves."""
+        vectors = [v for v in (self.vector(book_id) for book_id in book_ids) if v is not None]
+        if not vectors:
+            return []
+        seed = np.mean(vectors, axis=0)
+        norm = np.linalg.norm(seed)
+        if norm == 0:
+            return []
+        return self.query(seed / norm, k, exclude=book_ids)
+
+    def status(self) -> Dict:
+        self._maybe_reload()
+        return {
+            "enabled": self._vectors is not None,
+            "books": len(self._rows),
+            "lists": len(self._lists),
+            "version": self.meta.get("version"),
+        }
+
+    # -- writing -------------------------------------------------------------
+
+    def build(self, books: Iterable[Dict], n_features: int = 2 ** 18, iterations: int = 10) -> int:
+        """Replace the index with ``books``: fit idf, train IVF centroids, write every file."""
+        books = [book for book in books if book.get("id") is not None and book.get("title")]
+        counts = count_matrix((book_text(book) for book in books), n_features)
+        idf = fit_idf(counts)
+        vectors = embed(tfidf(counts, idf), self.dim)
+        centroids = train_centroids(vectors, iterations)
+        assignments = assign(vectors, centroids)
+
+        os.makedirs(self.path, exist_ok=True)
+        capacity = max(len(books), 1024)
+        with self._lock:
+            # Fresh files are renamed into place, so readers still mapping the old ones are unaffected
+            idf.astype(np.float32).tofile(self._file("idf.f32.new"))
+            centroids.astype(np.float32).tofile(self._file("centroids.f32.new"))
+            self._write_rows(0, capacity, vectors, np.array([b["id"] for b in books], dtype=np.int64),
+                             assignments, suffix=".new")
+            for name in ("idf.f32", "centroids.f32", "vectors.f32", "ids.i64", "lists.i32"):
+                os.replace(self._file(name + ".new"), self._file(name))
+            self._write_meta(count=len(books), capacity=capacity, n_features=n_features,
+                             version=self.meta.get("version", 0) + 1)
+        return len(books)
+
+    def upsert(self, books: Iterable[Dict]) -> int:
+        """Add or replace books using the existing idf and centroids (no retraining)."""
+        self._maybe_reload()
+        books = [book for book in books if book.get("id") is not None and book.get("title")]
+        if self._vectors is None or not books:
+            return 0
+        with self._lock:
+            self._tombstone([book["id"] for book in books])
+            counts = count_matrix((book_text(book) for book in books), len(self._idf))
+            vectors = embed(tfidf(counts, self._idf), self.dim)
+            assignments = assign(vectors, self._centroids)
+
+            count, capacity = self.meta["count"], self.meta["capacity"]
+            if count + len(books) > capacity:
+                capacity = max(capacity * 2, count + len(books))
+            self._write_rows(count, capacity, vectors, np.array([b["id"] for b in books], dtype=np.int64),
+                             assignments)
+            self._write_meta(**{**self.meta, "count": count + len(books), "capacity": capacity,
+                                "version": self.meta["version"] + 1})
+        return len(books)
+
+    def remove(self, book_ids: Iterable[int]) -> None:
+        self._maybe_reload()
+        if self._vectors is None:
+            return
+        with self._lock:
+            self._tombstone(book_ids)
+            self._write_meta(**{**self.meta, "version": self.meta["version"] + 1})
+
+    def _tombstone(self, book_ids: Iterable[int]) -> None:
+        rows = [self._rows[book_id] for book_id in book_ids if book_id in self._rows]
+        if not rows:
+            return
+        ids = np.memmap(self._file("ids.i64"), dtype=np.int64, mode="r+", shape=(self.meta["capacity"],))
+        ids[rows] = -1
+        ids.flush()
+
+    def _write_rows(self, start: int, capacity: int, vectors: np.ndarray, ids: np.ndarray,
+                    assignments: np.ndarray, suffix: str = "") -> None:
+        """Write rows ``start..`` into each file, growing it to ``capacity`` rows (never shrinking)."""
+        end = start + len(ids)
+        for name, dtype, values, width in (("vectors.f32", np.float32, vectors, self.dim),
+                                           ("ids.i64", np.int64, ids, 1),
+                                           ("lists.i32", np.int32, assignments, 1)):
+            path = self._file(name + suffix)
+            size = capacity * width * np.dtype(dtype).itemsize
+            created = suffix or not os.path.exists(path)
+            with open(path, "w+b" if created else "r+b") as f:
+                if os.fstat(f.fileno()).st_size < size:
+                    f.truncate(size)
+            shape = (capacity, width) if width > 1 else (capacity,)
+            mapped = np.memmap(path, dtype=dtype, mode="r+", shape=shape)
+            if created and name == "ids.i64":
+                mapped[:] = -1
+            mapped[start:end] = values
+            mapped.flush()
+
+    def _write_meta(self, **meta) -> None:
+        meta["dim"] = self.dim
+        tmp_path = self._file(META_FILE + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, self._file(META_FILE))
+        self._meta_mtime = None
+        self._maybe_reload()
+
+
+def train_centroids(vectors: np.ndarray, iterations: int = 10, sample_size: int = 20000,
+                    seed: int = 7) -> np.ndarray:
+    """Spherical k-means on a sample; about sqrt(n) lists, capped at 1024."""
+    rng = np.random.default_rng(seed)
+    n_lists = int(min(1024, max(1, np.sqrt(len(vectors)))))
+    if len(vectors) == 0:
+        return np.zeros((1, vectors.shape[1]), dtype=np.float32)
+    sample = vectors[rng.choice(len(vectors), min(sample_size, len(vectors)), replace=False)]
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+    for _ in range(iterations):
+        labels = np.argmax(sample @ centroids.T, axis=1)
+        for i in range(n_lists):
+            members = sample[labels == i]
+            if len(members):
+                centroid = members.sum(axis=0)
+                norm = np.linalg.norm(centroid)
+                if norm:
+                    centroids[i] = centroid / norm
+    return centroids
+
+
+def assign(vectors: np.ndarray, centroids: np.ndarray, chunk_size: int = 8192) -> np.ndarray:
+    labels = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), chunk_size):
+        labels[start:start + chunk_size] = np.argmax(vectors[start:start + chunk_size] @ centroids.T, axis=1)
+    return labels
+
+
+vector_index = VectorIndex(
+    path=settings.VECTOR_INDEX_PATH,
+    dim=settings.VECTOR_INDEX_DIM,
+    nprobe=settings.VECTOR_INDEX_NPROBE,
+)
@@ -0,0 +1,160 @@
+"""
+Hardcover GraphQL stand-in for offline load testing.
+
+Replays recorded fixtures (``fixtures/books.json`` and ``fixtures/trending.json``,
+refreshed with ``scripts/record_hardcover_fixtures.py``) for the operations the
+backend issues: ``books_trending``, ``books`` filtered by id / title ``_ilike`` /
+genre ``_or`` / year and rating ranges, including aliased batches.
+
+    uvicorn app.stand_ins.hardcover:app --port 8081
+    HARDCOVER_API_URL=http://127.0.0.1:8081/graphql
+"""
+import asyncio
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from graphql import FieldNode, OperationDefinitionNode, parse
+from graphql.utilities import value_from_ast_untyped
+
+FIXTURES_DIR = os.getenv("STAND_IN_FIXTURES_DIR") or os.path.join(os.path.dirname(__file__), "fixtures")
+LATENCY_MS = float(os.getenv("STAND_IN_HARDCOVER_LATENCY_MS", "40"))
+
+app = FastAPI(title="Hardcover stand-in")
+
+
+@lru_cache(maxsize=None)
+def load_fixture(name: str) -> Any:
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def catalog() -> List[Dict]:
+    books = load_fixture("books.json")
+    for book in books:
+        book.setdefault("image_id", book["id"] if book.get("image") else None)
+    return books
+
+
+def ilike(value: Optional[str], pattern: str) -> bool:
+    if value is None:
+        return False
+    regex = "".join(".*" if c == "%" else "." if c == "_" else re.escape(c) for c in pattern)
+    return re.fullmatch(regex, value, re.IGNORECASE | re.DOTALL) is not None
+
+
+OPERATORS = {
+    "_eq": lambda v, a: v == a,
+    "_neq": lambda v, a: v != a,
+    "_in": lambda v, a: v in a,
+    "_gt": lambda v, a: v is not None and v > a,
+    "_gte": lambda v, a: v is not None and v >= a,
+    "_lt": lambda v, a: v is not None and v < a,
+    "_lte": lambda v, a: v is not None and v <= a,
+    "_ilike": ilike,
+    "_is_null": lambda v, a: (v is None) == a,
+}
+
+
+def matches(row: Dict, where: Optional[Dict]) -> bool:
+    for key, condition in (where or {}).items():
+        if key == "_or":
+            if not any(matches(row, clause) for clause in condition):
+                return False
+        elif key == "_and":
+            if not all(matches(row, clause) for clause in condition):
+                return False
+        elif key == "_not":
+            if matches(row, condition):
+                return False
+        else:
+            value = row.get(key)
+            for op, arg in condition.items():
+                check = OPERATORS.get(op)
+                if check is None or not check(value, arg):
+                    return False
+    return True
+
+
+def project(value: Any, field: FieldNode, variables: Dict) -> Any:
+    if field.selection_set is None or value is None:
+        return value
+    if isinstance(value, list):
+        args = arguments(field, variables)
+        rows = [row for row in value if matches(row, args.get("where"))]
+        if "limit" in args:
+            rows = rows[:args["limit"]]
+        return [project(row, field, variables) for row in rows]
+    return {
+        (sub.alias or sub.name).value: project(value.get(sub.name.value), sub, variables)
+        for sub in field.selection_set.selections
+        if isinstance(sub, FieldNode)
+    }
+
+
+def arguments(field: FieldNode, variables: Dict) -> Dict:
+    return {arg.name.value: value_from_ast_untyped(arg.value, variables) for arg in field.arguments}
+
+
+def resolve_books(args: Dict) -> List[Dict]:
+    rows = [row for row in catalog() if matches(row, args.get("where"))]
+    order_by = args.get("order_by") or {}
+    # Either one object or a list of them, as Hasura takes both
+    if isinstance(order_by, list):
+        clauses = [item for clause in order_by for item in clause.items()]
+    else:
+        clauses = list(order_by.items())
+    for key, direction in reversed(clauses):
+        present = [row for row in rows if row.get(key) is not None]
+        missing = [row for row in rows if row.get(key) is None]
+        present.sort(key=lambda row: row[key], reverse=direction.startswith("desc"))
+        rows = present + missing
+    if args.get("distinct_on"):
+        seen, distinct = set(), []
+        for row in rows:
+            if row.get(args["distinct_on"]) not in seen:
+                seen.add(row.get(args["distinct_on"]))
+                distinct.append(row)
+        rows = distinct
+    offset = args.get("offset") or 0
+    limit = args.get("limit")
+    return rows[offset:offset + limit if limit is not None else None]
+
+
+def resolve_trending(args: Dict) -> Dict:
+    ids = load_fixture("trending.json")
+    offset = args.get("offset") or 0
+    return {"ids": ids[offset:offset + (args.get("limit") or len(ids))]}
+
+
+def execute(query: str, variables: Dict) -> Dict:
+    document = parse(query)
+    data = {}
+    for definition in document.definitions:
+        if not isinstance(definition, OperationDefinitionNode):
+            continue
+        for field in definition.selection_set.selections:
+            args = arguments(field, variables)
+            name = field.name.value
+            if name == "books":
+                value = resolve_books(args)
+            elif name == "books_trending":
+                value = resolve_trending(args)
+            else:
+                value = None
+            data[(field.alias or field.name).value] = project(value, field, variables)
+    return data
+
+
+@app.post("/{path:path}")
+async def graphql_endpoint(request: Request, path: str = ""):
+    payload = await request.json()
+    if LATENCY_MS:
+        await asyncio.sleep(LATENCY_MS / 1000)
+    try:
+        return {"data": execute(payload["query"], payload.get("variables") or {})}
+    except Exception as e:
+        return {"errors": [{"message": str(e)}]}
@@ -0,0 +1,120 @@
+"""
+Fake LLMs with configurable latency and canned JSON outputs.
+
+Selected with ``LLM_PROVIDER=fake``; the reply is picked from the shape of the
+prompt so every call site (initial recommendations, chat recommendations,
+intent classification, conversation) gets output it can parse. Streaming
+spreads the same latency over small chunks, the way tokens arrive.
+"""
+import asyncio
+import json
+import random
+import time
+from typing import Any, AsyncIterator, List, Optional
+
+from langchain_core.language_models.chat_models import SimpleChatModel
+from langchain_core.language_models.llms import LLM
+from langchain_core.messages import AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGenerationChunk, GenerationChunk
+
+from app.stand_ins.hardcover import load_fixture
+
+INTENT_KEYWORDS = {
+    "order_query": ["order status", "my order", "orders", "track", "history"],
+    "order_placement": ["buy", "purchase", "place an order", "checkout"],
+    "fraudulent_transactions": ["fraud", "unauthorized", "damaged", "refund"],
+}
+
+
+def canned_response(prompt: str) -> str:
+    books = load_fixture("books.json")
+
+    if "book recommendations in exactly this format" in prompt:
+        picks = random.sample(books, min(20, len(books)))
+        return json.dumps({"recommendations": [
+            {"title": book["title"], "author": book["contributions"][0]["author"]["name"]}
+            for book in picks
+        ]})
+
+    if "JSON array of objects" in prompt:
+        picks = random.sample(books, min(5, len(books)))
+        return json.dumps([
+            {
+                "Title": book["title"],
+                "ReasonForRecommendation": "A popular pick that matches what you asked for.",
+                "Price": round(random.uniform(9.99, 29.99), 2),
+            }
+            for book in picks
+        ])
+
+    if "running summary of a conversation" in prompt:
+        messages = prompt.rsplit("New messages:", 1)[-1].split("Updated summary:", 1)[0]
+        said = [line.split(": ", 1)[1] for line in messages.strip().splitlines() if line.startswith("human: ")]
+        return "The user said: " + "; ".join(said)[:600]
+
+    if "Classify the user's message" in prompt:
+        message = prompt.rsplit("User message:", 1)[-1].lower()
+        intents = [intent for intent, words in INTENT_KEYWORDS.items() if any(w in message for w in words)]
+        return ", ".join(intents or ["book_recommendation"])
+
+    return "That sounds great! Which genres or authors have you enjoyed recently?"
+
+
+STREAM_CHUNK_CHARS = 16
+
+
+async def stream_text(text: str, latency_ms: float) -> AsyncIterator[str]:
+    chunks = [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)] or [""]
+    for chunk in chunks:
+        await asyncio.sleep(latency_ms / 1000 / len(chunks))
+        yield chunk
+
+
+class FakeLLM(LLM):
+    latency_ms: float = 300
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-completion"
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> str:
+        time.sleep(self.latency_ms / 1000)
+        return canned_response(prompt)
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None,
+                     **kwargs: Any) -> str:
+        await asyncio.sleep(self.latency_ms / 1000)
+        return canned_response(prompt)
+
+    async def _astream(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None,
+                       **kwargs: Any) -> AsyncIterator[GenerationChunk]:
+        async for chunk in stream_text(canned_response(prompt), self.latency_ms):
+            yield GenerationChunk(text=chunk)
+
+
+class FakeChatModel(SimpleChatModel):
+    latency_ms: float = 300
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _call(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None,
+              **kwargs: Any) -> str:
+        time.sleep(self.latency_ms / 1000)
+        return canned_response("\n".join(str(message.content) for message in messages))
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs: Any):
+        await asyncio.sleep(self.latency_ms / 1000)
+        from langchain_core.messages import AIMessage
+        from langchain_core.outputs import ChatGeneration, ChatResult
+
+        text = canned_response("\n".join(str(message.content) for message in messages))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager: Any = None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        text = canned_response("\n".join(str(message.content) for message in messages))
+        async for chunk in stream_text(text, self.latency_ms):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=chunk))
@@ -0,0 +1,145 @@
+"""
+Redis stand-in for running shared chat sessions offline.
+
+Speaks enough of the Redis protocol (RESP2) for ``RedisSessionBackend``:
+``GET``, ``SET`` with ``EX``/``PX``, ``DEL``, ``EXPIRE``, ``TTL``,
+``RPUSH``, ``LRANGE``, ``PING`` and the handshake commands redis-py sends.
+Data lives in this process and is lost on exit.
+
+    python -m app.stand_ins.redis_server --port 6380
+    CHAT_SESSION_BACKEND_URL=redis://127.0.0.1:6380/0
+"""
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class Store:
+    def __init__(self):
+        self.data: Dict[bytes, Any] = {}
+        self.expires: Dict[bytes, float] = {}
+
+    def _live(self, key: bytes) -> Optional[Any]:
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.time():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return self.data.get(key)
+
+    def execute(self, command: bytes, args: List[bytes]) -> Any:
+        name = command.upper()
+        if name == b"PING":
+            return b"PONG" if not args else args[0]
+        if name in (b"CLIENT", b"SELECT"):
+            return "OK"
+        if name == b"GET":
+            value = self._live(args[0])
+            if isinstance(value, list):
+                raise TypeError("WRONGTYPE Operation against a key holding the wrong kind of value")
+            return value
+        if name == b"SET":
+            key, value = args[0], args[1]
+            self.data[key] = value
+            self.expires.pop(key, None)
+            options = [arg.upper() for arg in args[2:]]
+            for flag, scale in ((b"EX", 1.0), (b"PX", 0.001)):
+                if flag in options:
+                    self.expires[key] = time.time() + float(args[2 + options.index(flag) + 1]) * scale
+            return "OK"
+        if name == b"DEL":
+            removed = 0
+            for key in args:
+                if self._live(key) is not None:
+                    removed += 1
+                self.data.pop(key, None)
+                self.expires.pop(key, None)
+            return removed
+        if name == b"EXPIRE":
+            if self._live(args[0]) is None:
+                return 0
+            self.expires[args[0]] = time.time() + float(args[1])
+            return 1
+        if name == b"TTL":
+            if self._live(args[0]) is None:
+                return -2
+            deadline = self.expires.get(args[0])
+            return -1 if deadline is None else int(deadline - time.time())
+        if name == b"RPUSH":
+            values = self._live(args[0])
+            if values is None:
+                values = self.data[args[0]] = []
+            values.extend(args[1:])
+            return len(values)
+        if name == b"LRANGE":
+            values = self._live(args[0]) or []
+            start, stop = int(args[1]), int(args[2])
+            stop = len(values) if stop == -1 else stop + 1
+            return values[start:stop]
+        raise ValueError(f"ERR unknown command '{command.decode(errors='replace')}'")
+
+
+def encode(value: Any) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, str):
+        return b"+" + value.encode() + b"\r\n"
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(encode(item) for item in value)
+    raise TypeError(f"Cannot encode {type(value)}")
+
+
+async def read_command(reader: asyncio.StreamReader) -> Optional[Tuple[bytes, List[bytes]]]:
+    header = await reader.readline()
+    if not header:
+        return None
+    if not header.startswith(b"*"):
+        # Inline command, as typed into telnet
+        parts = header.split()
+        return (parts[0], parts[1:]) if parts else (b"PING", [])
+    parts = []
+    for _ in range(int(header[1:])):
+        length = int((await reader.readline())[1:])
+        parts.append((await reader.readexactly(length + 2))[:-2])
+    return parts[0], parts[1:]
+
+
+def serve(store: Store):
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                command = await read_command(reader)
+                if command is None:
+                    break
+                try:
+                    reply = encode(store.execute(*command))
+                except Exception as e:
+                    message = str(e)
+                    reply = b"-" + (message if message[:1].isupper() else f"ERR {message}").encode() + b"\r\n"
+                writer.write(reply)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def main(host: str, port: int):
+    server = await asyncio.start_server(serve(Store()), host, port)
+    print(f"Redis stand-in listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6380)
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.port))
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Build the "more like this" vector index from the local catalog mirror.
+
+Embeds every mirrored book, trains the IVF lists and writes the memory-mapped
+files to VECTOR_INDEX_PATH. Later catalog syncs add and replace books
+incrementally; re-run this script now and then to retrain the lists.
+
+    python scripts/build_vector_index.py
+"""
+import argparse
+import sys
+import os
+import time
+
+# Add the backend directory to Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from app.core.config import settings
+from app.services.catalog_mirror import catalog_mirror
+from app.services.vector_index import vector_index
+
+
+def build_index(iterations: int) -> bool:
+    try:
+        print(f"🔧 Embedding {catalog_mirror.count()} mirrored books into {settings.VECTOR_INDEX_PATH}")
+        started = time.monotonic()
+        count = vector_index.build(catalog_mirror.iter_books(), iterations=iterations)
+        status = vector_index.status()
+        print(f"✅ Indexed {count} books in {status['lists']} lists ({time.monotonic() - started:.1f}s)")
+        return True
+    except Exception as e:
+        print(f"❌ Error building vector index: {e}")
+        return False
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=10, help="k-means iterations for the IVF lists")
+    args = parser.parse_args()
+
+    if not settings.VECTOR_INDEX_PATH:
+        print("❌ VECTOR_INDEX_PATH is not set")
+        return 1
+    if not catalog_mirror.enabled:
+        print("❌ CATALOG_MIRROR_PATH is not set")
+        return 1
+
+    return 0 if build_index(args.iterations) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -13,6 +13,7 @@ sys.path.insert(0, backend_dir)
 from app.database.database import create_tables, engine
 from app.models.user import UserPreferences
 from app.models.orders import Order
+from app.models.recommendations import UserRecommendations
 from sqlalchemy import text
 
 def init_database():
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Precompute personalized recommendations for every user with saved preferences.
+
+Walks user_preferences in user_id order, chunk by chunk, and writes each
+user's list to user_recommendations. After every chunk the last user_id is
+written to the checkpoint file, so an interrupted run picks up where it
+stopped; the file is removed once the run completes. Users whose stored list
+is still fresh for their current preferences are skipped.
+
+    python scripts/precompute_recommendations.py
+    python scripts/precompute_recommendations.py --concurrency 8 --restart
+"""
+import argparse
+import asyncio
+import json
+import sys
+import os
+
+# Add the backend directory to Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from app.core.config import settings
+from app.database.database import SessionLocal, create_tables
+from app.models.user import get_user_preferences_page
+from app.models.recommendations import get_fresh_recommendations, save_user_recommendations
+from app.services.graphql_service import graphql_service
+from app.services.recommendation_cache import preference_fingerprint
+from app.services.recommendation_service import build_recommendations
+
+DEFAULT_CHECKPOINT = os.path.join(backend_dir, ".precompute_recommendations.checkpoint")
+
+
+def read_checkpoint(path: str) -> dict:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def write_checkpoint(path: str, state: dict) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+async def compute_chunk(preferences: list, concurrency: int) -> list:
+    """Recommendations for one chunk of users; ``None`` marks a user that failed."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def compute(user_preferences: dict):
+        async with semaphore:
+            try:
+                return await build_recommendations(user_preferences) or None
+            except Exception as e:
+                print(f"⚠️  {user_preferences['user_id']}: {e}")
+                return None
+
+    return await asyncio.gather(*(compute(p) for p in preferences))
+
+
+async def precompute(chunk_size: int, concurrency: int, checkpoint_path: str, max_age: float) -> bool:
+    state = read_checkpoint(checkpoint_path)
+    after = state.get("last_user_id")
+    totals = {key: state.get(key, 0) for key in ("generated", "skipped", "failed")}
+    if after is not None:
+        print(f"🔁 Resuming after user {after}")
+
+    db = SessionLocal()
+    try:
+        while True:
+            page = get_user_preferences_page(db, after, chunk_size)
+            if not page:
+                break
+
+            pending = []
+            for user_preferences in page:
+                fingerprint = preference_fingerprint(user_preferences)
+                if get_fresh_recommendations(user_preferences["user_id"], fingerprint, db, max_age):
+                    totals["skipped"] += 1
+                else:
+                    pending.append((user_preferences, fingerprint))
+
+            results = await compute_chunk([p for p, _ in pending], concurrency)
+            for (user_preferences, fingerprint), books in zip(pending, results):
+                if books:
+                    save_user_recommendations(user_preferences["user_id"], fingerprint, books, db)
+                    totals["generated"] += 1
+                else:
+                    totals["failed"] += 1
+
+            after = page[-1]["user_id"]
+            write_checkpoint(checkpoint_path, {"last_user_id": after, **totals})
+            print(f"✅ Through user {after}: {totals['generated']} generated, "
+                  f"{totals['skipped']} fresh, {totals['failed']} failed")
+
+        if os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        print("🎉 Recommendation precompute completed!")
+        return True
+    except Exception as e:
+        print(f"❌ Error precomputing recommendations: {e}")
+        return False
+    finally:
+        db.close()
+        await graphql_service.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunk-size", type=int, default=settings.PRECOMPUTE_CHUNK_SIZE)
+    parser.add_argument("--concurrency", type=int, default=settings.PRECOMPUTE_CONCURRENCY,
+                        help="users computed at once")
+    parser.add_argument("--checkpoint", default=DEFAULT_CHECKPOINT)
+    parser.add_argument("--max-age", type=float, default=settings.PRECOMPUTED_RECOMMENDATIONS_MAX_AGE,
+                        help="skip users whose stored list is younger than this many seconds")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    if args.restart and os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+
+    create_tables()
+    success = asyncio.run(precompute(args.chunk_size, args.concurrency, args.checkpoint, args.max_age))
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
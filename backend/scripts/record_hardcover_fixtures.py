@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Record Hardcover responses for the offline stand-in (app/stand_ins/hardcover.py).
+
+Fetches the current trending ids plus any extra titles and writes them to
+app/stand_ins/fixtures/{books,trending}.json. Needs real Hardcover credentials.
+
+    python scripts/record_hardcover_fixtures.py --title "Dune" --title "The Shining"
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+# Add the backend directory to Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from app.services.graphql_service import graphql_service
+
+FIXTURES_DIR = os.path.join(backend_dir, "app", "stand_ins", "fixtures")
+
+
+async def record(titles, limit: int) -> bool:
+    try:
+        trending_ids = await graphql_service.get_trending_books_ids(limit=limit, random_fallback=False)
+        if not trending_ids:
+            print("❌ Hardcover returned no trending ids")
+            return False
+
+        ids = list(trending_ids)
+        for title in titles:
+            result = await graphql_service.execute_query("BooksByTitle", {"title": title})
+            ids.extend(book["id"] for book in result.get("books", [])[:1])
+
+        result = await graphql_service.execute_query("FixtureBooks", {"ids": ids})
+        books = sorted(result.get("books", []), key=lambda book: book["id"])
+
+        with open(os.path.join(FIXTURES_DIR, "trending.json"), "w", encoding="utf-8") as f:
+            json.dump(trending_ids, f)
+        with open(os.path.join(FIXTURES_DIR, "books.json"), "w", encoding="utf-8") as f:
+            json.dump(books, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+
+        print(f"✅ Recorded {len(books)} books and {len(trending_ids)} trending ids")
+        return True
+    except Exception as e:
+        print(f"❌ Error recording fixtures: {e}")
+        return False
+    finally:
+        await graphql_service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record Hardcover fixtures for the offline stand-in")
+    parser.add_argument("--title", action="append", default=[], help="extra title to record (repeatable)")
+    parser.add_argument("--limit", type=int, default=50, help="number of trending books")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(record(args.title, args.limit)) else 1)
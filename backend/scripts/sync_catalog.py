@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Mirror Hardcover book metadata into the local catalog database.
+
+Syncs books by id range into CATALOG_MIRROR_PATH. Without --start the run
+resumes after the last range recorded by the previous sync, so the script
+can be scheduled for incremental updates.
+
+    python scripts/sync_catalog.py --start 1 --end 200000
+    python scripts/sync_catalog.py --count 20000   # continue from last sync
+"""
+import argparse
+import asyncio
+import sys
+import os
+
+# Add the backend directory to Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from app.core.config import settings
+from app.services.catalog_mirror import catalog_mirror, sync_id_range
+from app.services.graphql_service import graphql_service
+
+
+async def sync_catalog(start_id: int, end_id: int, batch_size: int) -> bool:
+    try:
+        print(f"🔧 Syncing Hardcover books {start_id}..{end_id - 1} into {settings.CATALOG_MIRROR_PATH}")
+        synced = await sync_id_range(start_id, end_id, batch_size)
+        print(f"✅ Synced {synced} books ({catalog_mirror.count()} in mirror)")
+        return True
+    except Exception as e:
+        print(f"❌ Error syncing catalog: {e}")
+        return False
+    finally:
+        await graphql_service.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--start", type=int, help="first book id (default: resume from last sync)")
+    parser.add_argument("--end", type=int, help="stop before this book id")
+    parser.add_argument("--count", type=int, default=10000, help="ids to sync when --end is omitted")
+    parser.add_argument("--batch-size", type=int, default=settings.CATALOG_SYNC_BATCH_SIZE)
+    args = parser.parse_args()
+
+    if not catalog_mirror.enabled:
+        print("❌ CATALOG_MIRROR_PATH is not set")
+        return 1
+
+    start_id = args.start if args.start is not None else int(catalog_mirror.get_state("last_synced_id") or 1)
+    end_id = args.end if args.end is not None else start_id + args.count
+    success = asyncio.run(sync_catalog(start_id, end_id, args.batch_size))
+    return 0 if success else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
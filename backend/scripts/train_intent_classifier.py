@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Train the local chat intent model from the seed examples and logged LLM labels.
+
+Reads INTENT_LOG_PATH (one JSON object per line, written while the LLM
+classifies messages the local tiers were unsure about), reports held-out
+accuracy, and writes the model to INTENT_MODEL_PATH. Workers pick it up on
+their next start.
+
+    python scripts/train_intent_classifier.py
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+# Add the backend directory to Python path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, backend_dir)
+
+from app.core.config import settings
+from app.services.intent_classifier import (
+    SEED_EXAMPLES, NaiveBayesIntentModel, read_logged_examples
+)
+
+
+def evaluate(examples, holdout: float, threshold: float) -> None:
+    """Accuracy and coverage on a random held-out slice, at the serving confidence threshold."""
+    shuffled = examples[:]
+    random.Random(7).shuffle(shuffled)
+    split = max(1, int(len(shuffled) * holdout))
+    test, train = shuffled[:split], shuffled[split:]
+    model = NaiveBayesIntentModel()
+    model.add(train)
+
+    confident = correct = 0
+    for message, intent in test:
+        prediction = model.predict(message)
+        if prediction is not None and prediction[1] >= threshold:
+            confident += 1
+            correct += prediction[0] == intent
+    print(f"📊 Held out {len(test)}: {confident / len(test):.0%} answered locally, "
+          f"{correct / confident if confident else 0:.1%} of those correct")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--log", default=settings.INTENT_LOG_PATH, help="labelled messages (JSON lines)")
+    parser.add_argument("--output", default=settings.INTENT_MODEL_PATH, help="model file (.npz)")
+    parser.add_argument("--holdout", type=float, default=0.2, help="fraction held out for the accuracy report")
+    args = parser.parse_args()
+
+    if not args.output:
+        print("❌ INTENT_MODEL_PATH is not set")
+        return 1
+
+    examples = [(message, intent) for intent, messages in SEED_EXAMPLES.items() for message in messages]
+    if args.log and os.path.exists(args.log):
+        logged = read_logged_examples(args.log)
+        print(f"🔧 {len(logged)} logged examples from {args.log}")
+        examples.extend(logged)
+
+    evaluate(examples, args.holdout, settings.INTENT_MIN_CONFIDENCE)
+
+    started = time.monotonic()
+    model = NaiveBayesIntentModel()
+    model.add(examples)
+    model.save(args.output)
+    print(f"✅ Trained on {len(examples)} examples in {time.monotonic() - started:.2f}s, saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
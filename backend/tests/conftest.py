@@ -0,0 +1,17 @@
+import os
+import sys
+
+# Run from anywhere: put the backend directory on the path, as the scripts do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings without defaults; a real .env or environment still wins. The fake provider keeps tests offline.
+for name, value in {
+    "PROJECT_NAME": "bookstore-tests",
+    "PROJECT_VERSION": "0",
+    "DATABASE_URL": "sqlite://",
+    "OPENAI_API_KEY": "test",
+    "HARDCOVER_API_URL": "http://127.0.0.1:9/graphql",
+    "HARDCOVER_API_TOKEN": "test",
+    "LLM_PROVIDER": "fake",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+from app.services.batch_loader import BatchLoader
+
+
+def test_coalesces_keys_from_one_tick():
+    batches = []
+
+    async def batch_fn(keys):
+        batches.append(sorted(keys))
+        return {key: key * 10 for key in keys}
+
+    async def main():
+        loader = BatchLoader(batch_fn)
+        return await asyncio.gather(loader.load(1), loader.load(2), loader.load(1))
+
+    assert asyncio.run(main()) == [10, 20, 10]
+    assert batches == [[1, 2]]
+
+
+def test_splits_by_max_batch_size_and_fills_missing_keys_with_none():
+    batches = []
+
+    async def batch_fn(keys):
+        batches.append(len(keys))
+        return {key: key for key in keys if key != 3}
+
+    async def main():
+        loader = BatchLoader(batch_fn, max_batch_size=2)
+        return await loader.load_many([1, 2, 3, 4, 5])
+
+    assert asyncio.run(main()) == [1, 2, None, 4, 5]
+    assert batches == [2, 2, 1]
+
+
+def test_failed_batch_resolves_to_none():
+    async def batch_fn(keys):
+        raise RuntimeError("Hardcover down")
+
+    async def main():
+        loader = BatchLoader(batch_fn)
+        return await loader.load_many(["a", "b"])
+
+    assert asyncio.run(main()) == [None, None]
+
+
+def test_cancelled_caller_does_not_fail_others():
+    release = None
+
+    async def batch_fn(keys):
+        await release.wait()
+        return {key: "value" for key in keys}
+
+    async def main():
+        nonlocal release
+        release = asyncio.Event()
+        loader = BatchLoader(batch_fn)
+        first = asyncio.ensure_future(loader.load("k"))
+        second = asyncio.ensure_future(loader.load("k"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        release.set()
+        return await second
+
+    assert asyncio.run(main()) == "value"
+
+
+def test_cancelled_batch_does_not_hang_waiters():
+    async def batch_fn(keys):
+        await asyncio.sleep(10)
+
+    async def main():
+        loader = BatchLoader(batch_fn)
+        waiter = asyncio.ensure_future(loader.load("k"))
+        await asyncio.sleep(0.01)
+        assert len(loader._tasks) == 1
+        for task in list(loader._tasks):
+            task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(waiter, timeout=1)
+        assert not loader._tasks
+
+    asyncio.run(main())
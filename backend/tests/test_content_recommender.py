@@ -0,0 +1,58 @@
+import asyncio
+
+from app.services.content_recommender import ContentRecommender
+
+BOOKS = [
+    {"id": 1, "title": "Dragon Mage", "author": "A. Writer", "description": "wizard dragon magic quest", "rating": 4.5},
+    {"id": 2, "title": "Dragon School", "author": "B. Writer", "description": "young wizard learns dragon magic"},
+    {"id": 3, "title": "Haunted House", "author": "C. Writer", "description": "ghost horror haunted mansion"},
+    {"id": 4, "title": "Murder at Noon", "author": "A. Writer", "description": "detective mystery murder"},
+]
+
+
+def _recommender():
+    recommender = ContentRecommender(n_features=2 ** 12)
+    assert recommender.build(BOOKS) == len(BOOKS)
+    return recommender
+
+
+def test_recommends_similar_books_and_skips_favorites():
+    recommender = _recommender()
+    ids = [book["id"] for book in recommender.recommend({"favorite_books": ["Dragon Mage"]})]
+    assert ids[0] == 2
+    assert 1 not in ids
+
+
+def test_author_and_genre_preferences_without_favorites():
+    recommender = _recommender()
+    ids = [book["id"] for book in recommender.recommend({"preferred_genres": ["horror"]})]
+    assert ids == [3]
+    by_author = recommender.recommend({"favorite_authors": ["A. Writer"]})
+    assert {book["id"] for book in by_author[:2]} == {1, 4}
+
+
+def test_empty_index_and_empty_profile():
+    recommender = ContentRecommender(n_features=2 ** 12)
+    assert not recommender.ready
+    assert recommender.recommend({"preferred_genres": ["horror"]}) == []
+    assert _recommender().recommend({}) == []
+
+
+def test_rebuilds_while_scoring_never_mix_indexes():
+    recommender = _recommender()
+    smaller = [book for book in BOOKS if book["id"] != 1]
+
+    def rebuild():
+        for i in range(30):
+            recommender.build(smaller if i % 2 else BOOKS)
+
+    async def main():
+        builder = asyncio.create_task(asyncio.to_thread(rebuild))
+        while not builder.done():
+            # Rows shift between the two catalogs, so a half-published build would misplace the favorite
+            books = await asyncio.to_thread(recommender.recommend, {"favorite_books": ["Dragon School"]})
+            assert books and 2 not in [book["id"] for book in books]
+        await builder
+
+    asyncio.run(main())
+    assert recommender.status()["books"] in (3, 4)
@@ -0,0 +1,67 @@
+import asyncio
+import json
+
+from app.services.intent_classifier import (
+    INTENTS,
+    IntentClassifier,
+    NaiveBayesIntentModel,
+    match_rules,
+    read_logged_examples,
+)
+
+
+def test_rules_match_clear_messages():
+    assert match_rules("I think this charge is fraud") == ["fraudulent_transactions"]
+    assert match_rules("") == []
+
+
+def test_seed_model_probabilities_sum_to_one():
+    model = NaiveBayesIntentModel.from_seed()
+    probabilities = model.probabilities("where is my order")
+    assert len(probabilities) == len(INTENTS)
+    assert abs(float(probabilities.sum()) - 1.0) < 1e-6
+    assert model.predict("where is my order")[0] == "order_query"
+
+
+def test_model_save_and_load(tmp_path):
+    model = NaiveBayesIntentModel.from_seed()
+    path = str(tmp_path / "model.npz")
+    model.save(path)
+    loaded = NaiveBayesIntentModel.load(path)
+    assert loaded.predict("tell me a joke") == model.predict("tell me a joke")
+
+
+def test_order_placement_is_never_routed_by_the_model_alone():
+    classifier = IntentClassifier(min_confidence=0.0)
+    assert match_rules("I'll take it") == []
+    assert classifier.model.predict("I'll take it")[0] == "order_placement"
+    assert classifier.classify("I'll take it") is None
+    assert classifier.classify("where is my order") == (["order_query"], "rules")
+
+
+def test_record_keeps_single_intent_labels(tmp_path):
+    path = tmp_path / "intents.jsonl"
+    classifier = IntentClassifier(log_path=str(path))
+    classifier.record("where's my stuff", ["order_query"])
+    classifier.record("two things at once", ["order_query", "book_recommendation"])
+    classifier.record("nonsense", ["not_an_intent"])
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["intent"] for line in lines] == ["order_query"]
+    assert read_logged_examples(str(path)) == [("where's my stuff", "order_query")]
+
+
+def test_record_writes_off_the_event_loop_and_keeps_order(tmp_path):
+    path = tmp_path / "intents.jsonl"
+    classifier = IntentClassifier(log_path=str(path))
+
+    async def main():
+        for i in range(50):
+            classifier.record(f"where is order {i}", ["order_query"])
+            if i % 7 == 0:
+                await asyncio.sleep(0)
+        await classifier.stop()
+
+    asyncio.run(main())
+    messages = [json.loads(line)["message"] for line in path.read_text(encoding="utf-8").splitlines()]
+    assert messages == [f"where is order {i}" for i in range(50)]
+    assert classifier.status()["logged"] == 50
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+from app.core.json_stream import JsonArrayStream, iter_json_array
+
+
+def test_yields_each_object_as_it_closes():
+    parser = JsonArrayStream()
+    assert parser.feed('{"recommendations": [{"title": "Du') == []
+    assert parser.feed('ne"}, {"title": "Emma') == [{"title": "Dune"}]
+    assert parser.feed('"}]}') == [{"title": "Emma"}]
+    assert parser.done
+
+
+def test_ignores_brackets_inside_strings_and_skips_malformed_items():
+    parser = JsonArrayStream()
+    items = parser.feed('Here you go:\n```json\n[{"title": "A [b] {c}"}, {"title": }, {"title": "D\\"e"}]\n```')
+    assert items == [{"title": "A [b] {c}"}, {"title": 'D"e'}]
+
+
+def test_stops_after_the_first_array():
+    parser = JsonArrayStream()
+    assert parser.feed('[{"a": 1}] [{"b": 2}]') == [{"a": 1}]
+
+
+async def _chunks(parts, delay=0.0):
+    for part in parts:
+        await asyncio.sleep(delay)
+        yield part
+
+
+def test_iter_json_array_collects_a_streamed_reply():
+    async def main():
+        return [item async for item in iter_json_array(_chunks(['[{"id"', ': 1}, {"id": 2', "}]"]))]
+
+    assert asyncio.run(main()) == [{"id": 1}, {"id": 2}]
+
+
+def test_iter_json_array_timeout_keeps_completed_items():
+    items = []
+
+    async def main():
+        async for item in iter_json_array(_chunks(['[{"id": 1},', ' {"id": 2},', ' {"id"'], delay=0.03), timeout=0.08):
+            items.append(item)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(main())
+    assert items == [{"id": 1}, {"id": 2}]
@@ -0,0 +1,185 @@
+import asyncio
+
+import pytest
+
+from app.services.resilience import AdaptiveLimiter, CircuitBreaker, hedged
+
+
+def test_limiter_caps_concurrency():
+    limiter = AdaptiveLimiter(initial=2, min_limit=1, max_limit=2, latency_target=1.0)
+    peak = 0
+
+    async def work():
+        nonlocal peak
+        async with limiter.slot():
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    async def main():
+        await asyncio.gather(*(work() for _ in range(10)))
+
+    asyncio.run(main())
+    assert peak <= 2
+    assert limiter.in_flight == 0
+
+
+def test_limiter_backs_off_on_failure_and_grows_on_fast_success():
+    limiter = AdaptiveLimiter(initial=4, min_limit=1, max_limit=8, latency_target=1.0, backoff=0.5)
+
+    async def fail():
+        async with limiter.slot():
+            raise RuntimeError("boom")
+
+    async def succeed():
+        async with limiter.slot():
+            pass
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            await fail()
+        assert limiter.limit == 2
+        await succeed()
+        assert limiter.limit == 2.5
+
+    asyncio.run(main())
+
+
+def test_limiter_releases_slot_when_cancelled():
+    limiter = AdaptiveLimiter(initial=1, min_limit=1, max_limit=1, latency_target=1.0)
+
+    async def hold():
+        async with limiter.slot():
+            await asyncio.sleep(10)
+
+    async def main():
+        task = asyncio.create_task(hold())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert limiter.in_flight == 0
+        async with limiter.slot():
+            pass
+
+    asyncio.run(main())
+
+
+def test_breaker_opens_on_error_rate_and_rejects():
+    breaker = CircuitBreaker(error_rate=0.5, min_requests=4, window=30, cooldown=60)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_success()
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    assert breaker.rejected == 1
+
+
+def test_breaker_half_open_allows_one_probe():
+    breaker = CircuitBreaker(min_requests=1, cooldown=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_breaker_failed_probe_reopens():
+    breaker = CircuitBreaker(min_requests=1, cooldown=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_breaker_release_frees_cancelled_probe():
+    breaker = CircuitBreaker(min_requests=1, cooldown=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+
+
+def test_hedged_fast_call_runs_once():
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        return "ok"
+
+    assert asyncio.run(hedged(call, delay=0.1)) == "ok"
+    assert calls == 1
+
+
+def test_hedged_slow_call_uses_backup():
+    delays = [1.0, 0.0]
+
+    async def call():
+        delay = delays.pop(0)
+        await asyncio.sleep(delay)
+        return delay
+
+    async def main():
+        started = asyncio.get_running_loop().time()
+        result = await hedged(call, delay=0.02)
+        return result, asyncio.get_running_loop().time() - started
+
+    result, elapsed = asyncio.run(main())
+    assert result == 0.0
+    assert elapsed < 0.5
+
+
+def test_hedged_returns_success_when_one_call_fails():
+    outcomes = ["slow-fail", "ok"]
+
+    async def call():
+        outcome = outcomes.pop(0)
+        if outcome == "slow-fail":
+            await asyncio.sleep(0.05)
+            raise RuntimeError("primary failed")
+        await asyncio.sleep(0.1)
+        return outcome
+
+    assert asyncio.run(hedged(call, delay=0.01)) == "ok"
+
+
+def test_hedged_raises_when_both_fail():
+    async def call():
+        await asyncio.sleep(0.02)
+        raise ValueError("down")
+
+    with pytest.raises(ValueError):
+        asyncio.run(hedged(call, delay=0.01))
+
+
+@pytest.mark.parametrize("cancel_after", [0.01, 0.05])
+def test_hedged_cancels_calls_when_caller_times_out(cancel_after):
+    # 0.01 lands in the wait before the backup starts, 0.05 after it
+    started, cancelled = [], []
+
+    async def call():
+        started.append(1)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    async def main():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(hedged(call, delay=0.03), timeout=cancel_after)
+        await asyncio.sleep(0.01)
+        # Checked before asyncio.run tears down, which would cancel leftovers itself
+        assert started
+        assert len(cancelled) == len(started)
+
+    asyncio.run(main())
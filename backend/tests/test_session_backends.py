@@ -0,0 +1,51 @@
+from langchain.schema.messages import AIMessage, HumanMessage, SystemMessage
+
+from app.services.session_backends import (
+    COMPRESS_OVER,
+    SQLiteSessionBackend,
+    decode_message,
+    decode_state,
+    encode_message,
+    encode_state,
+)
+
+
+def test_state_round_trips_sets():
+    state = {"recommended": {1, 2, 3}, "flags": {"ready": True}, "cursor": None}
+    version, decoded, keys = decode_state(encode_state(3, state, ["conversation"]))
+    assert version == 3
+    assert decoded == state
+    assert keys == ["conversation"]
+
+
+def test_large_state_is_compressed():
+    state = {"notes": "x" * (COMPRESS_OVER * 2)}
+    blob = encode_state(1, state, [])
+    assert blob[:1] == b"z"
+    assert len(blob) < COMPRESS_OVER
+    assert decode_state(blob)[1] == state
+
+
+def test_messages_keep_their_type_and_content():
+    for message in (HumanMessage(content="héllo"), AIMessage(content="hi"), SystemMessage(content="")):
+        decoded = decode_message(encode_message(message))
+        assert type(decoded) is type(message)
+        assert decoded.content == message.content
+
+
+def test_sqlite_backend_appends_and_clears_history(tmp_path):
+    backend = SQLiteSessionBackend(str(tmp_path / "sessions.db"))
+    first = [encode_message(HumanMessage(content="one")), encode_message(AIMessage(content="two"))]
+    backend.save("s1", b"state", ["a", "b"], {"a": (False, first), "b": (False, [b"hx"])}, ttl=60)
+    backend.save("s1", b"state2", ["a", "b"], {"a": (False, [b"hthree"]), "b": (True, [])}, ttl=60)
+
+    assert backend.load_state("s1") == b"state2"
+    assert backend.load_histories("s1", ["a", "b"]) == {"a": first + [b"hthree"], "b": []}
+    assert backend.load_history("s1", "a") == first + [b"hthree"]
+    assert backend.load_state("missing") is None
+
+
+def test_sqlite_backend_expires_idle_sessions(tmp_path):
+    backend = SQLiteSessionBackend(str(tmp_path / "sessions.db"))
+    backend.save("s1", b"state", [], {}, ttl=-1)
+    assert backend.load_state("s1") is None
@@ -0,0 +1,69 @@
+from app.services.title_index import TitleIndex, normalize_title, similarity, title_keys
+
+
+def _index():
+    index = TitleIndex(min_confidence=0.75)
+    index.add_many([
+        {"id": 1, "title": "Dune", "author": "Frank Herbert", "rating": 4.3},
+        {"id": 2, "title": "Dune Messiah", "author": "Frank Herbert", "rating": 3.9},
+        {"id": 3, "title": "The Hobbit", "author": "J.R.R. Tolkien", "rating": 4.6},
+        {"id": 4, "title": "The Hobbit", "author": "Unknown Author", "rating": 2.0},
+        {"id": 5, "title": "Emma", "author": "Jane Austen", "rating": 4.0},
+    ])
+    return index
+
+
+def test_normalize_title_strips_llm_decoration():
+    assert normalize_title('  **"The   Hobbit"**  ') == "The Hobbit"
+
+
+def test_title_keys_include_the_main_title():
+    assert len(title_keys("Dune: Deluxe Edition")) == 2
+    assert len(title_keys("Spider-Man")) == 1
+
+
+def test_similarity_is_one_for_identical_keys():
+    assert similarity("dune", "dune") == 1.0
+    assert similarity("dune", "emma") < 0.5
+
+
+def test_resolves_exact_and_subtitled_titles():
+    index = _index()
+    assert index.resolve("Dune")["id"] == 1
+    assert index.resolve("Dune: Deluxe Edition")["id"] == 1
+    assert index.resolve("Emma")["confidence"] == 1.0
+
+
+def test_author_breaks_ties_and_placeholder_author_is_ignored():
+    index = _index()
+    assert index.resolve("The Hobbit", author="J. R. R. Tolkien")["id"] == 3
+    assert index.resolve("Dune Messiah", author="Frank Herbert")["id"] == 2
+    # Without an author the better-rated duplicate wins
+    assert index.resolve("The Hobbit")["id"] == 3
+
+
+def test_unrelated_title_is_not_resolved():
+    index = _index()
+    assert index.resolve("Zzyzx Road") is None
+    assert index.status()["recent_books"] == 5
+
+
+def test_mirrored_books_are_kept_and_fetched_books_are_bounded():
+    index = TitleIndex(max_recent=8)
+    index.add({"id": 1, "title": "Dune", "author": "Frank Herbert"}, mirrored=True)
+    for i in range(20):
+        index.add({"id": 100 + i, "title": f"Fetched Title Number {i}"})
+        # Seen again after every fetch, so it stays the most recently used
+        index.add({"id": 100, "title": "Fetched Title Number 0"})
+    # Already in the mirror-backed table: not duplicated into the bounded one
+    index.add({"id": 1, "title": "Dune"})
+
+    status = index.status()
+    assert status["books"] == 1
+    assert status["recent_books"] <= 8
+    assert status["recent_evicted"] > 0
+    assert index.resolve("Dune")["id"] == 1
+    assert index.resolve("Fetched Title Number 0")["id"] == 100
+    assert index.resolve("Fetched Title Number 19")["id"] == 119
+    evicted = index.resolve("Fetched Title Number 1")
+    assert evicted is None or evicted["id"] != 101
@@ -0,0 +1,48 @@
+from app.services.vector_index import VectorIndex
+
+BOOKS = [
+    {"id": 1, "title": "Dragon Mage", "description": "a wizard and a dragon fight over magic"},
+    {"id": 2, "title": "The Dragon Wizard", "description": "magic dragon wizard school"},
+    {"id": 3, "title": "Haunted House", "description": "a ghost terrifying horror haunted mansion"},
+    {"id": 4, "title": "Ghost Night", "description": "horror ghost haunted terrifying night"},
+    {"id": 5, "title": "Murder at Noon", "description": "detective mystery murder investigation"},
+    {"id": 6, "title": "The Detective", "description": "murder mystery detective clues"},
+]
+
+
+def _index(tmp_path):
+    index = VectorIndex(path=str(tmp_path), dim=64, nprobe=8)
+    assert index.build(BOOKS, n_features=2 ** 12) == len(BOOKS)
+    return index
+
+
+def test_similar_books_share_a_topic(tmp_path):
+    index = _index(tmp_path)
+    assert index.similar_to([1], k=1)[0][0] == 2
+    assert index.similar_to([3], k=1)[0][0] == 4
+    assert 3 not in [book_id for book_id, _ in index.similar_to([3], k=5)]
+
+
+def test_upsert_and_remove(tmp_path):
+    index = _index(tmp_path)
+    index.upsert([{"id": 7, "title": "Dragon School", "description": "young wizard learns dragon magic"}])
+    assert index.status()["books"] == 7
+    assert 7 in [book_id for book_id, _ in index.similar_to([2], k=3)]
+
+    index.remove([7])
+    assert index.vector(7) is None
+    assert 7 not in [book_id for book_id, _ in index.similar_to([2], k=6)]
+
+
+def test_a_second_reader_sees_the_writers_changes(tmp_path):
+    writer = _index(tmp_path)
+    reader = VectorIndex(path=str(tmp_path), dim=64)
+    assert reader.enabled
+    writer.remove([2])
+    assert reader.vector(2) is None
+
+
+def test_disabled_without_files(tmp_path):
+    index = VectorIndex(path=str(tmp_path / "missing"))
+    assert not index.enabled
+    assert index.similar_to([1]) == []
@@ -3,14 +3,12 @@ import { FontAwesomeIcon } from "@fortawesome/react-fontawesome";
 import { faRobot } from "@fortawesome/free-solid-svg-icons";
 import { useUser } from "@clerk/clerk-react";
 import axios from "axios";
-import { API_ENDPOINTS } from "../../config/api";
+import { API_ENDPOINTS, getChatSessionId, setChatSessionId } from "../../config/api";
 
 const BookCard = ({ book, onAddToCart }) => (
   <div className="flex bg-white rounded-lg shadow-md overflow-hidden mb-4 hover:shadow-lg transition-shadow duration-300">
     <img
-      src={
-        book.image_url || "https://via.placeholder.com/100x150?text=No+Image"
-      }
+      src={book.image_url || "/placeholder-cover.svg"}
       alt={book.title || "Book"}
       className="w-20 h-30 object-cover"
     />
@@ -575,6 +573,7 @@ const Chatbot = () => {
         API_ENDPOINTS.CHATBOT_CHAT,
         {
           message: `view order details ${orderId}`,
+          session_id: getChatSessionId(),
           metadata: {
             type: "order_info", // Changed from order_details to order_info
             order_id: orderId,
@@ -582,6 +581,7 @@ const Chatbot = () => {
         }
       );
       const data = response.data;
+      setChatSessionId(data.session_id);
 
       if (data.type === "order_info") {
         // Changed this check to order_info
@@ -606,10 +606,11 @@ const Chatbot = () => {
     try {
       const response = await axios.post(
         API_ENDPOINTS.CHATBOT_CHAT,
-        { message }
+        { message, session_id: getChatSessionId() }
       );
   
       const data = response.data;
+      setChatSessionId(data.session_id);
   
       if (!data || !data.type || !data.response) {
         console.error("Invalid backend response format:", data);
@@ -634,9 +635,7 @@ const Chatbot = () => {
             ReasonForRecommendation:
               book.ReasonForRecommendation ||
               "No recommendation reason provided.",
-            image_url:
-              book.image_url ||
-              "https://via.placeholder.com/100x150?text=No+Image",
+            image_url: book.image_url || "/placeholder-cover.svg",
           }));
           addMessage(
             "Based on our conversation, here are some book recommendations for you:",
@@ -5,12 +5,16 @@ const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 export const API_ENDPOINTS = {
   // Chatbot endpoints
   CHATBOT_CHAT: `${API_BASE_URL}/api/chatbot/chat`,
+  CHATBOT_CHAT_STREAM: `${API_BASE_URL}/api/chatbot/chat/stream`,
   CHATBOT_PLACE_ORDER: `${API_BASE_URL}/api/chatbot/place-order`,
   
   // Recommendations endpoints
   TRENDING_BOOKS: `${API_BASE_URL}/api/recommendations/trending-books`,
   INITIAL_RECOMMENDATIONS: `${API_BASE_URL}/api/recommendations/initial-recommendations`,
+  INITIAL_RECOMMENDATIONS_STREAM: `${API_BASE_URL}/api/recommendations/initial-recommendations/stream`,
   USER_PREFERENCES: `${API_BASE_URL}/api/recommendations/preferences`,
+  BOOK_DETAILS: (id) => `${API_BASE_URL}/api/recommendations/books/${id}`,
+  SIMILAR_BOOKS: (id) => `${API_BASE_URL}/api/recommendations/books/${id}/similar`,
   
   // User endpoints (placeholder - these seem to be from old API)
   USER_INFO: `${API_BASE_URL}/api/v1/get-user-information`,
@@ -23,4 +27,38 @@ export const API_ENDPOINTS = {
   ALL_BOOKS: `${API_BASE_URL}/api/v1/get-all-books`
 };
 
+// Chat conversation id issued by the server with each reply, kept for the browser tab so a
+// reload continues the same conversation; the first message goes without one
+export const getChatSessionId = () => sessionStorage.getItem("chatSessionId") || undefined;
+
+export const setChatSessionId = (sessionId) => {
+  if (sessionId) sessionStorage.setItem("chatSessionId", sessionId);
+};
+
+// POST `body` and call `onEvent` for every line of an NDJSON streaming response
+export const streamNdjson = async (url, body, onEvent, signal) => {
+  const response = await fetch(url, {
+    method: "POST",
+    headers: { "Content-Type": "application/json" },
+    body: JSON.stringify(body),
+    signal,
+  });
+  if (!response.ok) {
+    throw new Error(`Request failed with status ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split("\n");
+    buffer = lines.pop();
+    lines.filter((line) => line.trim()).forEach((line) => onEvent(JSON.parse(line)));
+  }
+  if (buffer.trim()) onEvent(JSON.parse(buffer));
+};
+
 export default API_BASE_URL;
@@ -4,7 +4,9 @@ import { FaCartShopping } from "react-icons/fa6";
 import { GoHeartFill } from "react-icons/go";
 import { GrLanguage } from "react-icons/gr";
 import { MdDelete } from "react-icons/md";
+import axios from "axios";
 import Loader from "./Loader";
+import { API_ENDPOINTS } from "../config/api";
 
 const ViewBookDetails = () => {
   // const { id } = useParams();
@@ -23,6 +25,24 @@ const ViewBookDetails = () => {
     }
   }, [location.state?.book, id, navigate]);
 
+  useEffect(() => {
+    // List views only carry card fields; pull the description when the page opens
+    const bookId = Book?.id || id;
+    if (!bookId || Book?.description) return;
+    let cancelled = false;
+    axios
+      .get(API_ENDPOINTS.BOOK_DETAILS(bookId))
+      .then((response) => {
+        if (!cancelled) {
+          setBook((current) => ({ ...response.data, ...current, description: response.data.description }));
+        }
+      })
+      .catch((error) => console.error("Error fetching book details:", error));
+    return () => {
+      cancelled = true;
+    };
+  }, [Book?.id, id]);
+
   // Function to round rating to one decimal if it's present
   const roundedRating = Book?.rating ? Book.rating.toFixed(1) : null;
 